@@ -8,6 +8,8 @@ from .models import (
 )
 
 from .admin_utils import (
+    MediaPreviewAdminMixin,
+    image_preview,
     signed_image_preview,
     signed_audio_preview,
     signed_file_link,
@@ -30,15 +32,20 @@ class ArtistAdmin(admin.ModelAdmin):
 # ─────────────────────────────────────────────
 
 @admin.register(Song)
-class SongAdmin(admin.ModelAdmin):
+class SongAdmin(MediaPreviewAdminMixin, admin.ModelAdmin):
     list_display = (
         "title",
         "artist",
         "language",
-        "cover_preview",
-        "audio_preview",
+        "cover_list_preview",
+        "audio_list_preview",
         "duration",
     )
+    list_select_related = ("artist",)
+    list_per_page = 50
+
+    signed_list_fields = ("cover_image",)
+    lazy_media_fields = ("audio_file",)
 
     readonly_fields = (
         "cover_preview",
@@ -58,10 +65,21 @@ class SongAdmin(admin.ModelAdmin):
         "audio_preview",
         "lrc_file",
         "lrc_preview",
+        "melody_file",
     )
 
     # ──────────────── PREVIEWS ────────────────
 
+    def cover_list_preview(self, obj):
+        return image_preview(self.page_signed_url(obj, "cover_image"), width=60)
+
+    cover_list_preview.short_description = "Cover"
+
+    def audio_list_preview(self, obj):
+        return self.lazy_audio_preview(obj, "audio_file")
+
+    audio_list_preview.short_description = "Audio"
+
     def cover_preview(self, obj):
         return signed_image_preview(obj.cover_image)
 
@@ -143,14 +161,20 @@ class SongLyricLineAdmin(admin.ModelAdmin):
 # ─────────────────────────────────────────────
 
 @admin.register(Recording)
-class RecordingAdmin(admin.ModelAdmin):
+class RecordingAdmin(MediaPreviewAdminMixin, admin.ModelAdmin):
     list_display = (
         "user",
         "song",
         "created_at",
         "duration",
-        "audio_preview",
+        "audio_list_preview",
     )
+    list_select_related = ("user", "song")
+    list_per_page = 50
+    # Skip the unfiltered COUNT(*) over every recording on each page
+    show_full_result_count = False
+
+    lazy_media_fields = ("audio_file",)
 
     readonly_fields = (
         "audio_preview",
@@ -166,6 +190,11 @@ class RecordingAdmin(admin.ModelAdmin):
         "created_at",
     )
 
+    def audio_list_preview(self, obj):
+        return self.lazy_audio_preview(obj, "audio_file")
+
+    audio_list_preview.short_description = "Recording"
+
     def audio_preview(self, obj):
         return signed_audio_preview(obj.audio_file)
 
@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from app.models import Recording
+from app.utils.alignment import store_alignment
+from app.utils.pitch import store_score
+
+
+class Command(BaseCommand):
+    help = (
+        "Align and score recordings that lack an offset or score (uploads "
+        "whose background analysis never ran, or songs that have since got "
+        "a melody reference)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--song", type=int, action="append", help="Only this song (repeatable)")
+        parser.add_argument(
+            "--rescore",
+            action="store_true",
+            help="Score recordings that already have a score again",
+        )
+        parser.add_argument("--limit", type=int, default=None)
+
+    def handle(self, *args, **options):
+        scorable = ~Q(song__melody_file="")
+        if not options["rescore"]:
+            scorable &= Q(score__isnull=True)
+
+        # Mixdowns contain the backing track and aren't analysed
+        qs = (
+            Recording.objects
+            .exclude(audio_file="")
+            .filter(mixed_from__isnull=True)
+            .filter(Q(alignment_offset__isnull=True) | scorable)
+            .select_related("song")
+            .order_by("pk")
+        )
+        if options["song"]:
+            qs = qs.filter(song_id__in=options["song"])
+        if options["limit"]:
+            qs = qs[:options["limit"]]
+
+        done = failed = 0
+        for recording in qs.iterator():
+            try:
+                if recording.alignment_offset is None:
+                    store_alignment(recording)
+                result = store_score(recording) if recording.song.melody_file else None
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"✗ Recording {recording.pk}: {exc}")
+                continue
+
+            done += 1
+            score = result[0] if result else "unscored"
+            self.stdout.write(f"✓ Recording {recording.pk} → {score}")
+
+        self.stdout.write(self.style.SUCCESS(f"{done} analysed, {failed} failed"))
@@ -0,0 +1,51 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Song, Recording
+from app.utils.peaks import store_peaks
+
+
+class Command(BaseCommand):
+    help = "Generate waveform peak files for songs and recordings that lack them."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--model",
+            choices=["song", "recording", "all"],
+            default="all",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate even if a peaks file already exists",
+        )
+        parser.add_argument("--limit", type=int, default=None)
+
+    def handle(self, *args, **options):
+        models = {
+            "song": [Song],
+            "recording": [Recording],
+            "all": [Song, Recording],
+        }[options["model"]]
+
+        for model in models:
+            qs = model.objects.exclude(audio_file="").order_by("pk")
+            if not options["force"]:
+                qs = qs.filter(peaks_file="")
+            if options["limit"]:
+                qs = qs[:options["limit"]]
+
+            done = failed = 0
+            for instance in qs.iterator():
+                try:
+                    name = store_peaks(instance)
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"✗ {model.__name__} {instance.pk}: {exc}")
+                    continue
+
+                done += 1
+                self.stdout.write(f"✓ {model.__name__} {instance.pk} → {name}")
+
+            self.stdout.write(self.style.SUCCESS(
+                f"{model.__name__}: {done} generated, {failed} failed"
+            ))
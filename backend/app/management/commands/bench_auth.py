@@ -0,0 +1,97 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from base.authentication import (
+    CookiesJWTAuthentication,
+    CookiesJWTClaimsAuthentication,
+    token_cache,
+    user_cache,
+)
+from base.serializers import CustomTokenObtainPairSerializer
+
+
+MODES = {
+    # label → (authentication class, use the user cache)
+    "db": (CookiesJWTAuthentication, False),
+    "cached": (CookiesJWTAuthentication, True),
+    "claims": (CookiesJWTClaimsAuthentication, False),
+}
+
+
+class Command(BaseCommand):
+    help = "Measure requests/sec on an API endpoint with each JWT user resolution mode."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username to authenticate as (default: first user)")
+        parser.add_argument("--path", default=None, help="Endpoint (default: /api/songs/popular/)")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+        parser.add_argument(
+            "--no-token-cache",
+            action="store_true",
+            help="Fully decode and verify the JWT on every request",
+        )
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.order_by("pk")
+        if options["user"]:
+            users = users.filter(username=options["user"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No user to authenticate as")
+
+        path = options["path"] or reverse("song-popular")
+        view_class = resolve(path).func.view_class
+        access = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+
+        original = view_class.authentication_classes
+        original_ttl = user_cache.ttl
+        original_tokens = token_cache.max_entries
+        if options["no_token_cache"]:
+            token_cache.max_entries = 0
+        try:
+            for mode in options["modes"]:
+                auth_class, cached = MODES[mode]
+                view_class.authentication_classes = [auth_class]
+                user_cache.ttl = original_ttl if cached else 0
+                user_cache.clear()
+                token_cache.clear()
+                self.report(mode, path, access, options["requests"])
+        finally:
+            view_class.authentication_classes = original
+            user_cache.ttl = original_ttl
+            token_cache.max_entries = original_tokens
+            user_cache.clear()
+            token_cache.clear()
+
+        self.stdout.write(f"token cache: {token_cache.metrics()}")
+        self.stdout.write(f"user cache:  {user_cache.metrics()}")
+
+    def report(self, mode, path, access, count):
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            client = Client()
+            client.cookies["access_token"] = access
+
+            # Warm-up (URL resolver, serializer fields, cache fill)
+            response = client.get(path)
+            if response.status_code != 200:
+                raise CommandError(f"{path} returned {response.status_code} in {mode} mode")
+
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                for _ in range(count):
+                    client.get(path)
+                elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{mode:>7}: {count / elapsed:8.1f} req/s  "
+            f"{elapsed / count * 1000:6.2f} ms/req  "
+            f"{len(queries) / count:4.1f} queries/req"
+        )
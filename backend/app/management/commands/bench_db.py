@@ -0,0 +1,80 @@
+import copy
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db.utils import ConnectionHandler
+
+
+MODES = ("per-request", "persistent", "pool")
+
+
+def settings_for(mode, base):
+    db = copy.deepcopy(base)
+    options = db.setdefault("OPTIONS", {})
+    options.pop("pool", None)
+
+    if mode == "per-request":
+        db["CONN_MAX_AGE"] = 0
+        db["CONN_HEALTH_CHECKS"] = False
+    elif mode == "persistent":
+        db["CONN_MAX_AGE"] = 60
+        db["CONN_HEALTH_CHECKS"] = True
+    else:
+        db["CONN_MAX_AGE"] = 0
+        db["CONN_HEALTH_CHECKS"] = False
+        options["pool"] = base.get("OPTIONS", {}).get("pool") or {"min_size": 1, "max_size": 4}
+    return db
+
+
+class Command(BaseCommand):
+    help = (
+        "Latency of request-shaped database work (connect if needed, query, "
+        "end-of-request cleanup) per connection lifecycle mode."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--query", default="SELECT 1")
+        parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+
+    def handle(self, *args, **options):
+        base = settings.DATABASES["default"]
+
+        for mode in options["modes"]:
+            if mode == "pool" and "postgresql" not in base["ENGINE"]:
+                self.stdout.write(f"{mode:>12}: skipped (pooling needs PostgreSQL + psycopg 3)")
+                continue
+
+            handler = ConnectionHandler({"default": settings_for(mode, base)})
+            connection = handler["default"]
+            try:
+                timings = self.run(connection, options["query"], options["requests"])
+            finally:
+                connection.close()
+                if getattr(connection, "pool", None) is not None:
+                    connection.close_pool()
+
+            quantiles = statistics.quantiles(timings, n=100)
+            self.stdout.write(
+                f"{mode:>12}: p50 {quantiles[49]:7.2f} ms  "
+                f"p99 {quantiles[98]:7.2f} ms  mean {statistics.fmean(timings):7.2f} ms"
+            )
+
+    def run(self, connection, query, count):
+        timings = []
+        # One warm-up request (imports, DNS, pool fill)
+        for i in range(count + 1):
+            started = time.perf_counter()
+
+            # What request_started / request_finished do (close_old_connections)
+            connection.close_if_unusable_or_obsolete()
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                cursor.fetchall()
+            connection.close_if_unusable_or_obsolete()
+
+            if i:
+                timings.append((time.perf_counter() - started) * 1000)
+        return timings
@@ -0,0 +1,85 @@
+import json
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from app.models import Song
+from base.middleware import brotli, compress
+from base.renderers import ORJSONRenderer
+from base.serializers import CustomTokenObtainPairSerializer
+
+
+RENDERERS = {
+    "stdlib": JSONRenderer(),
+    "orjson": ORJSONRenderer(),
+}
+
+
+class Command(BaseCommand):
+    help = "Measure JSON render time and bytes on the wire for the song list and song detail."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username to authenticate as (default: first user)")
+        parser.add_argument("--song", type=int, help="Song id for the detail endpoint (default: most lyric lines)")
+        parser.add_argument("--repeat", type=int, default=200, help="Renders per measurement")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.order_by("pk")
+        if options["user"]:
+            users = users.filter(username=options["user"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No user to authenticate as")
+
+        song_id = options["song"] or (
+            Song.objects
+            .annotate(lines=Count("lyrics"))
+            .order_by("-lines")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if song_id is None:
+            raise CommandError("No songs to benchmark")
+
+        access = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+        paths = [reverse("song-list"), reverse("song-detail", args=[song_id])]
+
+        with override_settings(ALLOWED_HOSTS=["testserver"]):
+            client = Client()
+            client.cookies["access_token"] = access
+            for path in paths:
+                self.report(client, path, options["repeat"])
+
+    def report(self, client, path, repeat):
+        response = client.get(path, HTTP_ACCEPT_ENCODING="identity")
+        if response.status_code != 200:
+            raise CommandError(f"{path} returned {response.status_code}")
+        data = json.loads(response.content)
+
+        self.stdout.write(f"{path}")
+        for label, renderer in RENDERERS.items():
+            started = time.perf_counter()
+            for _ in range(repeat):
+                body = renderer.render(data)
+            elapsed = (time.perf_counter() - started) / repeat
+            self.stdout.write(f"  render {label:>6}: {elapsed * 1000:8.3f} ms  {len(body):9d} bytes")
+
+        raw = response.content
+        sizes = {"identity": len(raw), "gzip": len(compress(raw, "gzip"))}
+        if brotli is not None:
+            sizes["br"] = len(compress(raw, "br"))
+        for encoding, size in sizes.items():
+            self.stdout.write(f"  wire {encoding:>8}: {size:9d} bytes  ({size / len(raw):6.1%})")
+
+        # What the middleware actually sends a browser
+        served = client.get(path, HTTP_ACCEPT_ENCODING="gzip, deflate, br")
+        self.stdout.write(
+            f"  served: {served.get('Content-Encoding', 'identity')}, "
+            f"{len(served.content)} bytes"
+        )
@@ -0,0 +1,167 @@
+import http.client
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from base.serializers import CustomTokenObtainPairSerializer
+
+
+SERVERS = {
+    # label → (workers, port) → command line
+    "gunicorn": lambda workers, port: [
+        sys.executable, "-m", "gunicorn", "project.wsgi:application",
+        "--workers", str(workers), "--bind", f"127.0.0.1:{port}",
+    ],
+    "uvicorn": lambda workers, port: [
+        sys.executable, "-m", "uvicorn", "project.asgi:application",
+        "--workers", str(workers), "--host", "127.0.0.1", "--port", str(port),
+        "--no-access-log",
+    ],
+}
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))
+    return sorted_values[index]
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test an endpoint under gunicorn sync workers and uvicorn (ASGI) "
+        "workers, started locally with the current settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username to authenticate as (default: first user)")
+        parser.add_argument("--path", action="append", help="Endpoint(s) (default: /api/songs/)")
+        parser.add_argument("--servers", nargs="+", choices=list(SERVERS), default=list(SERVERS))
+        parser.add_argument("--workers", type=int, default=2)
+        parser.add_argument("--concurrency", type=int, default=16, help="Keep-alive client connections")
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per endpoint")
+        parser.add_argument("--port", type=int, default=8765)
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.order_by("pk")
+        if options["user"]:
+            users = users.filter(username=options["user"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No user to authenticate as")
+
+        access = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+        paths = options["path"] or [reverse("song-list")]
+
+        for server in options["servers"]:
+            process = self.start(server, options["workers"], options["port"])
+            try:
+                for path in paths:
+                    self.report(server, options, path, access)
+            finally:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+
+    # ─────────────────────────────────────────────
+    # SERVER PROCESS
+    # ─────────────────────────────────────────────
+
+    def start(self, server, workers, port):
+        # Each server with the views it would be deployed with
+        env = {**os.environ, "ASYNC_VIEWS": "true" if server == "uvicorn" else "false"}
+        process = subprocess.Popen(
+            SERVERS[server](workers, port),
+            cwd=settings.BASE_DIR,
+            env=env,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"{server} exited with {process.returncode}")
+            try:
+                conn = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+                conn.request("GET", "/")
+                conn.getresponse().read()
+                conn.close()
+                return process
+            except OSError:
+                time.sleep(0.2)
+
+        process.kill()
+        raise CommandError(f"{server} did not start on port {port}")
+
+    # ─────────────────────────────────────────────
+    # LOAD
+    # ─────────────────────────────────────────────
+
+    def report(self, server, options, path, access):
+        port = options["port"]
+        headers = {"Cookie": f"access_token={access}"}
+
+        # Warm-up (imports, URL resolver, connection pool in every worker)
+        for _ in range(options["workers"] * 4):
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+            conn.request("GET", path, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            if response.status != 200:
+                raise CommandError(f"{path} returned {response.status} under {server}")
+
+        latencies = []
+        errors = [0]
+        lock = threading.Lock()
+        deadline = time.monotonic() + options["duration"]
+
+        def client():
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+            mine, failed = [], 0
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                try:
+                    conn.request("GET", path, headers=headers)
+                    response = conn.getresponse()
+                    response.read()
+                    if response.status != 200:
+                        failed += 1
+                    if response.will_close:
+                        conn.close()
+                except (OSError, http.client.HTTPException):
+                    failed += 1
+                    conn.close()
+                    continue
+                mine.append(time.perf_counter() - started)
+            conn.close()
+            with lock:
+                latencies.extend(mine)
+                errors[0] += failed
+
+        started = time.monotonic()
+        threads = [threading.Thread(target=client) for _ in range(options["concurrency"])]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        latencies.sort()
+        self.stdout.write(
+            f"{server:>8} {path}: {len(latencies) / elapsed:8.1f} req/s  "
+            f"p50 {percentile(latencies, 50) * 1000:6.1f} ms  "
+            f"p99 {percentile(latencies, 99) * 1000:6.1f} ms  "
+            f"errors {errors[0]}"
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from app.utils.stats import check_stats, rebuild_stats
+
+
+class Command(BaseCommand):
+    help = "Rebuild song/user/leaderboard aggregates from scratch and compare with the stored ones."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--fix",
+            action="store_true",
+            help="Replace the stored aggregates with the rebuilt ones",
+        )
+
+    def handle(self, *args, **options):
+        problems = check_stats()
+
+        for problem in problems:
+            self.stdout.write(f"✗ {problem}")
+
+        if not problems:
+            self.stdout.write(self.style.SUCCESS("Aggregates are consistent"))
+            return
+
+        self.stdout.write(self.style.WARNING(f"{len(problems)} mismatches"))
+
+        if options["fix"]:
+            rebuild_stats()
+            self.stdout.write(self.style.SUCCESS("Aggregates rebuilt"))
@@ -0,0 +1,63 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from app.utils.media_gc import MANAGED_PREFIXES, collect_garbage
+
+
+class Command(BaseCommand):
+    help = "Delete stored media that no Song/Recording references (dry run unless --delete)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prefix",
+            action="append",
+            dest="prefixes",
+            help=f"Storage prefix to scan (repeatable; default: {', '.join(MANAGED_PREFIXES)})",
+        )
+        parser.add_argument(
+            "--grace-hours",
+            type=float,
+            default=24,
+            help="Keep unreferenced objects younger than this (in-flight uploads)",
+        )
+        parser.add_argument(
+            "--delete",
+            action="store_true",
+            help="Actually delete; without it only a report is printed",
+        )
+        parser.add_argument("--samples", type=int, default=20, help="Orphans to list in the report")
+        parser.add_argument("--workdir", help="Directory for the temporary key index")
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        report = collect_garbage(
+            prefixes=options["prefixes"] or MANAGED_PREFIXES,
+            grace=timedelta(hours=options["grace_hours"]),
+            dry_run=not options["delete"],
+            sample_size=options["samples"],
+            workdir=options["workdir"],
+        )
+
+        self.stdout.write(f"Referenced names in DB: {report.referenced_names}")
+        self.stdout.write(f"Scanned: {report.scanned} objects ({mb(report.scanned_bytes)})")
+        self.stdout.write(f"Unreferenced within grace period: {report.too_recent}")
+        self.stdout.write(f"Orphaned: {report.orphaned} objects ({mb(report.orphaned_bytes)})")
+        for name in report.samples:
+            self.stdout.write(f"  {name}")
+
+        elapsed = time.monotonic() - started
+        if not options["delete"]:
+            self.stdout.write(self.style.WARNING(
+                f"Dry run, nothing deleted ({elapsed:.1f}s). Re-run with --delete."
+            ))
+            return
+
+        if report.failed:
+            self.stderr.write(f"✗ {report.failed} deletions failed (see log)")
+        self.stdout.write(self.style.SUCCESS(f"Deleted {report.deleted} objects ({elapsed:.1f}s)"))
+
+
+def mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from app.models import Song
+from app.utils.hls import package_song
+
+
+class Command(BaseCommand):
+    help = (
+        "Package song audio into multi-bitrate HLS renditions (songs whose "
+        "background packaging failed or never ran)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("song_ids", nargs="*", type=int)
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Repackage songs that already have an HLS package",
+        )
+
+    def handle(self, *args, **options):
+        qs = Song.objects.exclude(audio_file="").order_by("pk")
+        if options["song_ids"]:
+            qs = qs.filter(pk__in=options["song_ids"])
+        if not options["force"]:
+            qs = qs.exclude(hls_status=Song.HLS_READY)
+
+        done = failed = 0
+        for song in qs.iterator():
+            try:
+                prefix = package_song(song)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"✗ Song {song.pk}: {exc}")
+                continue
+
+            if prefix is None:
+                self.stdout.write(f"- Song {song.pk}: audio changed, skipped")
+                continue
+
+            done += 1
+            self.stdout.write(f"✓ Song {song.pk} → {prefix}")
+
+        self.stdout.write(self.style.SUCCESS(f"{done} packaged, {failed} failed"))
@@ -0,0 +1,221 @@
+import json
+import os
+import re
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import Song
+from app.utils.audio import ffmpeg_input
+from app.utils.hls import BITRATES, SEGMENT_SECONDS, package_to_dir
+
+
+PROGRESSIVE_CHUNK = 64 * 1024
+EXTINF = re.compile(r"#EXTINF:([\d.]+)")
+MAP_URI = re.compile(r'#EXT-X-MAP:URI="([^"]+)"')
+
+
+class Network:
+    """
+    Piecewise-constant bandwidth trace (kbit/s per `interval` seconds,
+    cycling) plus a fixed round-trip time per request.
+    """
+
+    def __init__(self, kbps, interval, rtt):
+        self.kbps = kbps
+        self.interval = interval
+        self.rtt = rtt
+
+    def transfer(self, t, size, rtt=None):
+        """
+        Time at which `size` bytes requested at `t` have fully arrived.
+        """
+        t += self.rtt if rtt is None else rtt
+        remaining = size * 8 / 1000  # kbit
+        while remaining > 0:
+            slot = int(t // self.interval)
+            rate = self.kbps[slot % len(self.kbps)]
+            slot_end = (slot + 1) * self.interval
+            capacity = rate * (slot_end - t)
+            if capacity >= remaining:
+                return t + remaining / rate
+            remaining -= capacity
+            t = slot_end
+        return t
+
+
+class Player:
+    """
+    Plays once `startup` seconds are buffered; a stall is any moment the
+    playhead catches up with the buffer before the media has ended.
+    """
+
+    def __init__(self, startup):
+        self.startup = startup
+        self.buffered = 0.0
+        self.position = 0.0
+        self.clock = 0.0
+        self.started_at = None
+        self.stalls = 0
+        self.stall_time = 0.0
+        self.stalled = False
+
+    def arrive(self, t, seconds):
+        if self.started_at is not None:
+            elapsed = t - self.clock
+            playable = self.buffered - self.position
+            if elapsed > playable:
+                if not self.stalled:
+                    self.stalls += 1
+                self.stall_time += elapsed - playable
+                self.position = self.buffered
+                self.stalled = True
+            else:
+                self.position += elapsed
+        self.clock = t
+        self.buffered += seconds
+
+        if self.stalled and self.buffered - self.position >= self.startup:
+            self.stalled = False
+
+        if self.started_at is None and self.buffered >= self.startup:
+            self.started_at = t
+
+    def result(self, name):
+        return {
+            "strategy": name,
+            "startup_ms": round((self.started_at or self.clock) * 1000),
+            "stalls": self.stalls,
+            "stall_seconds": round(self.stall_time, 2),
+        }
+
+
+def simulate_progressive(size, duration, network, startup):
+    player = Player(startup)
+    t = network.transfer(0.0, 0)  # gateway call for the signed URL
+    t += network.rtt              # then one streamed GET
+
+    for offset in range(0, size, PROGRESSIVE_CHUNK):
+        chunk = min(PROGRESSIVE_CHUNK, size - offset)
+        t = network.transfer(t, chunk, rtt=0)
+        player.arrive(t, duration * chunk / size)
+    return player
+
+
+def simulate_hls(variants, network, startup, adaptive=False):
+    """
+    `variants` is [(bitrate_kbps, init_size, [(seg_size, seconds), ...])],
+    lowest bitrate first. Adaptive playback starts low and then picks the
+    best variant under 80% of the last measured segment throughput.
+    """
+    player = Player(startup)
+    current = 0
+    t = network.transfer(0.0, 0)       # master playlist
+    t = network.transfer(t, 0)         # media playlist
+    t = network.transfer(t, variants[current][1])  # init segment
+
+    for index in range(len(variants[current][2])):
+        size, seconds = variants[current][2][index]
+        started = t
+        t = network.transfer(t, size)
+        player.arrive(t, seconds)
+
+        if adaptive:
+            throughput = size * 8 / 1000 / max(t - started, 1e-6)
+            best = max(
+                (i for i, v in enumerate(variants) if v[0] <= 0.8 * throughput),
+                default=0,
+            )
+            if best != current:
+                current = best
+                t = network.transfer(t, variants[current][1])
+    return player
+
+
+def load_variants(out_dir):
+    variants = []
+    for index, bitrate in enumerate(BITRATES):
+        folder = os.path.join(out_dir, f"v{index}")
+        with open(os.path.join(folder, "index.m3u8")) as fh:
+            lines = fh.read().splitlines()
+
+        segments = []
+        seconds = None
+        init_size = 0
+        for line in lines:
+            info, init = EXTINF.match(line), MAP_URI.match(line)
+            if info:
+                seconds = float(info.group(1))
+            elif init:
+                init_size = os.path.getsize(os.path.join(folder, init.group(1)))
+            elif line and not line.startswith("#"):
+                segments.append((os.path.getsize(os.path.join(folder, line)), seconds))
+
+        variants.append((int(bitrate.rstrip("k")), init_size, segments))
+    return variants
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate startup latency and stalls for progressive vs HLS playback "
+        "of one audio file over a synthetic network."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("source", nargs="?", help="Local audio file path")
+        parser.add_argument("--song", type=int, help="Use a Song's audio_file instead")
+        parser.add_argument(
+            "--bandwidth",
+            default="512",
+            help="Comma-separated kbit/s trace, e.g. 1024,128,256",
+        )
+        parser.add_argument("--interval", type=float, default=10.0,
+                            help="Seconds per bandwidth trace step")
+        parser.add_argument("--rtt", type=float, default=0.1, help="Round trip in seconds")
+        parser.add_argument("--startup", type=float, default=2.0,
+                            help="Seconds of audio buffered before playback starts")
+        parser.add_argument("--json", dest="json_path", help="Also write results here")
+
+    def handle(self, *args, **options):
+        if options["song"]:
+            audio_file = Song.objects.get(pk=options["song"]).audio_file
+            source = ffmpeg_input(audio_file)
+            size = audio_file.size
+        elif options["source"]:
+            source = options["source"]
+            size = os.path.getsize(source)
+        else:
+            raise CommandError("Pass a file path or --song")
+
+        network = Network(
+            kbps=[float(x) for x in options["bandwidth"].split(",")],
+            interval=options["interval"],
+            rtt=options["rtt"],
+        )
+
+        with tempfile.TemporaryDirectory() as out_dir:
+            package_to_dir(source, out_dir)
+            variants = load_variants(out_dir)
+
+        duration = sum(seconds for _, seconds in variants[0][2])
+        startup = options["startup"]
+
+        results = [simulate_progressive(size, duration, network, startup).result("progressive")]
+        for index, (bitrate, _, _) in enumerate(variants):
+            fixed = simulate_hls(variants[index:index + 1], network, startup)
+            results.append(fixed.result(f"hls {bitrate}k"))
+        results.append(simulate_hls(variants, network, startup, adaptive=True).result("hls adaptive"))
+
+        self.stdout.write(
+            f"{duration:.1f}s audio, {SEGMENT_SECONDS}s segments, "
+            f"bandwidth {options['bandwidth']} kbit/s, rtt {network.rtt * 1000:.0f} ms"
+        )
+        for row in results:
+            self.stdout.write(
+                f"  {row['strategy']:<14} startup {row['startup_ms']:>6} ms   "
+                f"stalls {row['stalls']:>3}   stalled {row['stall_seconds']:>6.2f} s"
+            )
+
+        if options["json_path"]:
+            with open(options["json_path"], "w") as fh:
+                json.dump(results, fh, indent=2)
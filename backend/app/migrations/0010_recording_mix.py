@@ -0,0 +1,24 @@
+# Generated by Django 6.1.2 on 2026-10-19 15:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0009_alter_song_artist_alter_song_genre'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recording',
+            name='mix_hash',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='recording',
+            name='mixed_from',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='mixes', to='app.recording'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-19 15:09
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0010_recording_mix'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recording',
+            name='peaks_file',
+            field=models.FileField(blank=True, upload_to='recordings/peaks/'),
+        ),
+        migrations.AddField(
+            model_name='song',
+            name='peaks_file',
+            field=models.FileField(blank=True, upload_to='songs/peaks/'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 6.1.2 on 2026-10-19 15:09
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0011_peaks_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recording',
+            name='alignment_confidence',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='recording',
+            name='alignment_offset',
+            field=models.FloatField(blank=True, help_text='Seconds into the song where the recording starts', null=True),
+        ),
+        migrations.CreateModel(
+            name='SongAnalysis',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('audio_name', models.CharField(max_length=255)),
+                ('onset_envelope', models.BinaryField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('song', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='analysis', to='app.song')),
+            ],
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 6.1.2 on 2026-10-19 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0012_alignment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recording',
+            name='line_scores',
+            field=models.JSONField(blank=True, default=list),
+        ),
+        migrations.AddField(
+            model_name='recording',
+            name='score',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='songanalysis',
+            name='melody_contour',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.1.2 on 2026-10-19 15:12
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0013_scoring'),
+        ('base', '0004_alter_user_role'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('recording_count', models.PositiveIntegerField(default=0)),
+                ('scored_count', models.PositiveIntegerField(default=0)),
+                ('score_total', models.FloatField(default=0)),
+                ('best_score', models.FloatField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SongStats',
+            fields=[
+                ('song', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='app.song')),
+                ('recording_count', models.PositiveIntegerField(default=0)),
+                ('scored_count', models.PositiveIntegerField(default=0)),
+                ('score_total', models.FloatField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-recording_count'], name='songstats_popular_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='SongLeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('best_score', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('recording', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='app.recording')),
+                ('song', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard', to='app.song')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='leaderboard_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['song', '-best_score'], name='leaderboard_top_idx')],
+                'constraints': [models.UniqueConstraint(fields=('song', 'user'), name='unique_song_user_entry')],
+            },
+        ),
+    ]
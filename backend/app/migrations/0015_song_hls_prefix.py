@@ -0,0 +1,18 @@
+# Generated by Django 6.1.2 on 2026-10-19 15:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0014_stats_aggregates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='song',
+            name='hls_prefix',
+            field=models.CharField(blank=True, help_text='Versioned storage prefix of the HLS package', max_length=255),
+        ),
+    ]
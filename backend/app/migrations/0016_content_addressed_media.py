@@ -0,0 +1,52 @@
+# Generated by Django 6.1.2 on 2026-10-19 15:26
+
+import app.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0015_song_hls_prefix'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MediaBlob',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('refcount', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='recording',
+            name='audio_file',
+            field=models.FileField(storage=app.storage.content_addressed_storage, upload_to='recordings/'),
+        ),
+        migrations.AlterField(
+            model_name='recording',
+            name='peaks_file',
+            field=models.FileField(blank=True, storage=app.storage.content_addressed_storage, upload_to='recordings/peaks/'),
+        ),
+        migrations.AlterField(
+            model_name='song',
+            name='audio_file',
+            field=models.FileField(storage=app.storage.content_addressed_storage, upload_to='songs/audio/'),
+        ),
+        migrations.AlterField(
+            model_name='song',
+            name='cover_image',
+            field=models.ImageField(storage=app.storage.content_addressed_storage, upload_to='song_covers/'),
+        ),
+        migrations.AlterField(
+            model_name='song',
+            name='lrc_file',
+            field=models.FileField(storage=app.storage.content_addressed_storage, upload_to='songs/lyrics/'),
+        ),
+        migrations.AlterField(
+            model_name='song',
+            name='peaks_file',
+            field=models.FileField(blank=True, storage=app.storage.content_addressed_storage, upload_to='songs/peaks/'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 6.1.2 on 2026-10-19 15:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0016_content_addressed_media'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='recording',
+            index=models.Index(fields=['user', '-created_at'], name='recording_user_created_idx'),
+        ),
+    ]
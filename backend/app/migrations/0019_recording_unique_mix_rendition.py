@@ -0,0 +1,19 @@
+# Generated by Django 6.1.2 on 2026-10-19 16:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0018_catalog_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='recording',
+            constraint=models.UniqueConstraint(condition=models.Q(('mix_hash', ''), _negated=True), fields=('mixed_from', 'mix_hash'), name='unique_mix_rendition'),
+        ),
+    ]
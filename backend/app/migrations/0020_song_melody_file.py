@@ -0,0 +1,24 @@
+# Generated by Django 6.1.2 on 2026-10-19 16:06
+
+import app.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0019_recording_unique_mix_rendition'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='song',
+            name='melody_file',
+            field=models.FileField(blank=True, storage=app.storage.content_addressed_storage, upload_to='songs/melody/'),
+        ),
+        migrations.AddField(
+            model_name='songanalysis',
+            name='melody_name',
+            field=models.CharField(blank=True, max_length=255),
+        ),
+    ]
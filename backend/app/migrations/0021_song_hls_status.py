@@ -0,0 +1,24 @@
+# Generated by Django 6.1.2 on 2026-10-19 16:11
+
+from django.db import migrations, models
+
+
+def mark_packaged_songs(apps, schema_editor):
+    Song = apps.get_model("app", "Song")
+    Song.objects.exclude(hls_prefix="").update(hls_status="ready")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0020_song_melody_file'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='song',
+            name='hls_status',
+            field=models.CharField(blank=True, choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=20),
+        ),
+        migrations.RunPython(mark_packaged_songs, migrations.RunPython.noop),
+    ]
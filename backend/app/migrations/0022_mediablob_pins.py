@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-19 16:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0021_song_hls_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mediablob',
+            name='pinned_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='mediablob',
+            name='pins',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
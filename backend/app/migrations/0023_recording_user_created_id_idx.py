@@ -0,0 +1,23 @@
+# Generated by Django 6.1.2 on 2026-10-19 16:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0022_mediablob_pins'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='recording',
+            name='recording_user_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='recording',
+            index=models.Index(fields=['user', '-created_at', '-id'], name='recording_user_created_idx'),
+        ),
+    ]
@@ -1,5 +1,10 @@
+import os
+import tempfile
+
+from django.conf import settings
 from django.db import models
 from base.models import User   # adjust import based on your structure
+from .storage import content_addressed_storage
 
 class Artist(models.Model):
     name = models.CharField(max_length=200)
@@ -13,10 +18,39 @@ class Song(models.Model):
     artist = models.ForeignKey(Artist, on_delete=models.SET_NULL, null=True, blank = True)
     language = models.CharField(max_length=100)
     genre = models.CharField(max_length=100, blank = True)
-    cover_image = models.ImageField(upload_to="song_covers/")
-    audio_file = models.FileField(upload_to="songs/audio/")
-    lrc_file = models.FileField(upload_to="songs/lyrics/")
+    cover_image = models.ImageField(upload_to="song_covers/", storage=content_addressed_storage)
+    audio_file = models.FileField(upload_to="songs/audio/", storage=content_addressed_storage)
+    lrc_file = models.FileField(upload_to="songs/lyrics/", storage=content_addressed_storage)
     duration = models.PositiveIntegerField(help_text="Duration in seconds")
+    peaks_file = models.FileField(
+        upload_to="songs/peaks/",
+        storage=content_addressed_storage,
+        blank=True
+    )
+    # Isolated vocal / guide melody: the reference recordings are scored
+    # against (app.utils.pitch). The mixed audio_file is polyphonic, so
+    # songs without one are not scored.
+    melody_file = models.FileField(
+        upload_to="songs/melody/",
+        storage=content_addressed_storage,
+        blank=True
+    )
+    hls_prefix = models.CharField(
+        max_length=255,
+        blank=True,
+        help_text="Versioned storage prefix of the HLS package"
+    )
+    # Packaging runs on the media worker after the upload (app.utils.hls);
+    # hls_prefix keeps serving the previous package until it is "ready".
+    HLS_PENDING = "pending"
+    HLS_READY = "ready"
+    HLS_FAILED = "failed"
+    HLS_STATUS_CHOICES = [
+        (HLS_PENDING, "Pending"),
+        (HLS_READY, "Ready"),
+        (HLS_FAILED, "Failed"),
+    ]
+    hls_status = models.CharField(max_length=20, choices=HLS_STATUS_CHOICES, blank=True)
 
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL,
                                     null=True, related_name="uploaded_songs")
@@ -32,22 +66,49 @@ class SongLyricLine(models.Model):
 
     def __str__(self):
         return f"[{self.timestamp}] {self.text}"
-    
 
 
-from django.db import models
-from django.conf import settings
-from pydub import AudioSegment
-from django.db import models
-from django.conf import settings
-from pydub import AudioSegment
-from tempfile import NamedTemporaryFile
+class SongAnalysis(models.Model):
+    """
+    Cached audio features for a song, tied to the files they came from:
+    the onset envelope to audio_file, the melody contour to melody_file.
+    """
+    song = models.OneToOneField(Song, on_delete=models.CASCADE, related_name="analysis")
+    audio_name = models.CharField(max_length=255)
+    onset_envelope = models.BinaryField(null=True, blank=True)
+    melody_name = models.CharField(max_length=255, blank=True)
+    melody_contour = models.BinaryField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
-import os
-import tempfile
-from django.db import models
-from django.conf import settings
-from pydub import AudioSegment
+    @classmethod
+    def for_song(cls, song):
+        """
+        The song's analysis row, with features from files that have changed
+        since emptied.
+        """
+        analysis, created = cls.objects.get_or_create(
+            song=song,
+            defaults={"audio_name": song.audio_file.name, "melody_name": song.melody_file.name},
+        )
+        if created:
+            return analysis
+
+        changed = []
+        if analysis.audio_name != song.audio_file.name:
+            analysis.audio_name = song.audio_file.name
+            analysis.onset_envelope = None
+            changed += ["audio_name", "onset_envelope"]
+        if analysis.melody_name != song.melody_file.name:
+            analysis.melody_name = song.melody_file.name
+            analysis.melody_contour = None
+            changed += ["melody_name", "melody_contour"]
+        if changed:
+            analysis.save(update_fields=changed + ["updated_at"])
+        return analysis
+
+    def __str__(self):
+        return f"Analysis: {self.song}"
+    
 
 
 class Recording(models.Model):
@@ -61,13 +122,62 @@ class Recording(models.Model):
         on_delete=models.CASCADE,
         related_name="recordings"
     )
-    audio_file = models.FileField(upload_to="recordings/")
+    audio_file = models.FileField(upload_to="recordings/", storage=content_addressed_storage)
+    peaks_file = models.FileField(
+        upload_to="recordings/peaks/",
+        storage=content_addressed_storage,
+        blank=True
+    )
     duration = models.FloatField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Server-side mixdowns (vocal + backing) point back at the source take
+    mixed_from = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="mixes"
+    )
+    mix_hash = models.CharField(max_length=64, blank=True, db_index=True)
+
+    # Estimated start position within the song, from onset cross-correlation.
+    # Below ALIGNMENT_MIN_CONFIDENCE it is a guess (e.g. a repeated chorus
+    # matched almost as well) and is not applied; the frontend uses the same
+    # threshold (RecordingDetails.jsx).
+    ALIGNMENT_MIN_CONFIDENCE = 0.3
+
+    alignment_offset = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="Seconds into the song where the recording starts"
+    )
+    alignment_confidence = models.FloatField(null=True, blank=True)
+
+    # Pitch accuracy against the song's reference melody (0–100)
+    score = models.FloatField(null=True, blank=True)
+    line_scores = models.JSONField(default=list, blank=True)
+
+    class Meta:
+        constraints = [
+            # One stored mixdown per source take and mix parameters
+            models.UniqueConstraint(
+                fields=["mixed_from", "mix_hash"],
+                condition=~models.Q(mix_hash=""),
+                name="unique_mix_rendition",
+            ),
+        ]
+        indexes = [
+            # "My recordings", newest first (keyset pagination; id breaks ties)
+            models.Index(fields=["user", "-created_at", "-id"], name="recording_user_created_idx"),
+        ]
+
     def save(self, *args, **kwargs):
         # Calculate duration BEFORE saving
         if self.audio_file and not self.duration:
+            # Imported on upload only: pydub probes for ffmpeg on import
+            from pydub import AudioSegment
+
             # Create temp file safely on Windows
             with tempfile.NamedTemporaryFile(
                 suffix=".webm",
@@ -86,5 +196,127 @@ class Recording(models.Model):
 
         super().save(*args, **kwargs)
 
+    @property
+    def start_offset(self):
+        """
+        alignment_offset if it is confident enough to apply, else None.
+        """
+        if self.alignment_offset is None:
+            return None
+        if (self.alignment_confidence or 0) < self.ALIGNMENT_MIN_CONFIDENCE:
+            return None
+        return self.alignment_offset
+
     def __str__(self):
         return f"{self.user} - {self.song.title}"
+
+
+# ─────────────────────────────────────────────
+# AGGREGATES (maintained by app.utils.stats)
+# ─────────────────────────────────────────────
+
+class SongStats(models.Model):
+    song = models.OneToOneField(
+        Song,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats"
+    )
+    recording_count = models.PositiveIntegerField(default=0)
+    scored_count = models.PositiveIntegerField(default=0)
+    score_total = models.FloatField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["-recording_count"], name="songstats_popular_idx"),
+        ]
+
+    @property
+    def average_score(self):
+        return round(self.score_total / self.scored_count, 1) if self.scored_count else None
+
+    def __str__(self):
+        return f"{self.song}: {self.recording_count} recordings"
+
+
+class UserStats(models.Model):
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stats"
+    )
+    recording_count = models.PositiveIntegerField(default=0)
+    scored_count = models.PositiveIntegerField(default=0)
+    score_total = models.FloatField(default=0)
+    best_score = models.FloatField(null=True, blank=True)
+
+    @property
+    def average_score(self):
+        return round(self.score_total / self.scored_count, 1) if self.scored_count else None
+
+    def __str__(self):
+        return f"{self.user}: {self.recording_count} recordings"
+
+
+class SongLeaderboardEntry(models.Model):
+    """
+    A user's best score on a song; one row per (song, user).
+    """
+    song = models.ForeignKey(Song, on_delete=models.CASCADE, related_name="leaderboard")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="leaderboard_entries"
+    )
+    recording = models.ForeignKey(Recording, on_delete=models.CASCADE, related_name="+")
+    best_score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["song", "user"], name="unique_song_user_entry"),
+        ]
+        indexes = [
+            models.Index(fields=["song", "-best_score"], name="leaderboard_top_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.song} – {self.user}: {self.best_score}"
+
+
+# ─────────────────────────────────────────────
+# CONTENT-ADDRESSED BLOBS (maintained by app.utils.blobs)
+# ─────────────────────────────────────────────
+
+class MediaBlob(models.Model):
+    """
+    How many model file fields point at a content-addressed storage key.
+    The object is deleted only once nothing references it.
+    """
+    key = models.CharField(max_length=255, primary_key=True)
+    refcount = models.PositiveIntegerField(default=0)
+    # Uploads in flight (app.utils.blobs.pin): an upload may find the
+    # object already stored and skip the PUT, so it is protected until the
+    # new row acquires it, or the pin goes stale
+    pins = models.PositiveIntegerField(default=0)
+    pinned_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.key} ({self.refcount})"
+
+
+# ─────────────────────────────────────────────
+# CATALOG VERSION (maintained by app.utils.catalog)
+# ─────────────────────────────────────────────
+
+class CatalogVersion(models.Model):
+    """
+    Single row, bumped on every catalog write. Catalog responses are
+    tagged with it, so clients revalidate with one cached lookup.
+    """
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"catalog v{self.version}"
@@ -0,0 +1,73 @@
+import hmac
+
+from django.conf import settings
+from django.db.models import Q
+from rest_framework.permissions import BasePermission
+
+from .models import Song, Recording
+from .utils.cache import namespace
+from .utils.catalog import catalog_cache
+
+
+# Ownership of recording keys, per user (short-lived; uploads are new keys)
+media_acl_cache = namespace("media-acl", ttl=60)
+
+
+def song_media_q(key):
+    return (
+        Q(audio_file=key)
+        | Q(cover_image=key)
+        | Q(lrc_file=key)
+        | Q(peaks_file=key)
+    )
+
+
+def recording_media_q(key):
+    return Q(audio_file=key) | Q(peaks_file=key)
+
+
+def can_access_media(user, key):
+    """
+    Media ACL (anti-IDOR): song files are shared across authenticated
+    users, recording files are private to their owner.
+    """
+    return (
+        # Songs (shared across authenticated users); cached per catalog version
+        catalog_cache.get_or_set(
+            f"song-media:{key}",
+            lambda: Song.objects.filter(song_media_q(key)).exists(),
+        )
+
+        # Recordings (PRIVATE per user)
+        or media_acl_cache.get_or_set(
+            f"{user.id}:{key}",
+            lambda: Recording.objects.filter(recording_media_q(key), user_id=user.id).exists(),
+        )
+    )
+
+
+async def acan_access_media(user, key):
+    """
+    can_access_media() for async views.
+    """
+    return (
+        await catalog_cache.aget_or_set(
+            f"song-media:{key}",
+            lambda: Song.objects.filter(song_media_q(key)).aexists(),
+        )
+        or await media_acl_cache.aget_or_set(
+            f"{user.id}:{key}",
+            lambda: Recording.objects.filter(recording_media_q(key), user_id=user.id).aexists(),
+        )
+    )
+
+
+class HasMetricsToken(BasePermission):
+    """
+    Scrapers authenticate with "Authorization: Bearer <METRICS_TOKEN>".
+    """
+
+    def has_permission(self, request, view):
+        token = getattr(settings, "METRICS_TOKEN", "")
+        header = request.META.get("HTTP_AUTHORIZATION", "")
+        return bool(token) and hmac.compare_digest(header, f"Bearer {token}")
@@ -1,5 +1,15 @@
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Song, SongLyricLine, Artist, Recording
+from .models import (
+    Song,
+    SongLyricLine,
+    Artist,
+    Recording,
+    SongStats,
+    UserStats,
+    SongLeaderboardEntry,
+)
+from .utils.catalog import bump_catalog_version
 
 
 # ─────────────────────────────────────────────
@@ -33,6 +43,8 @@ class SongSerializer(serializers.ModelSerializer):
     cover_key = serializers.SerializerMethodField()
     audio_key = serializers.SerializerMethodField()
     lrc_key = serializers.SerializerMethodField()
+    peaks_key = serializers.SerializerMethodField()
+    hls_url = serializers.SerializerMethodField()
 
     class Meta:
         model = Song
@@ -46,6 +58,9 @@ class SongSerializer(serializers.ModelSerializer):
             "cover_key",
             "audio_key",
             "lrc_key",
+            "peaks_key",
+            "hls_url",
+            "hls_status",
             "lyrics",
         ]
 
@@ -58,6 +73,14 @@ class SongSerializer(serializers.ModelSerializer):
     def get_lrc_key(self, obj):
         return obj.lrc_file.name if obj.lrc_file else None
 
+    def get_peaks_key(self, obj):
+        return obj.peaks_file.name if obj.peaks_file else None
+
+    def get_hls_url(self, obj):
+        if not obj.hls_prefix:
+            return None
+        return reverse("song-hls", args=[obj.pk, "master.m3u8"])
+
 
 # ─────────────────────────────────────────────
 # Song (UPLOAD)
@@ -74,6 +97,7 @@ class SongUploadSerializer(serializers.ModelSerializer):
             "cover_image",
             "audio_file",
             "lrc_file",
+            "melody_file",
             "duration",
         ]
 
@@ -83,13 +107,14 @@ class SongUploadSerializer(serializers.ModelSerializer):
 
         lrc_file = validated_data.get("lrc_file")
 
-        # Save song first (uploads to R2)
-        song = Song.objects.create(**validated_data)
-
-        # Read and reset pointer
+        # Read before the upload, which leaves the pointer at the end
+        lrc_file.seek(0)
         lrc_text = lrc_file.read().decode("utf-8")
         lrc_file.seek(0)
 
+        # Save song (uploads to R2)
+        song = Song.objects.create(**validated_data)
+
         parsed_lines = parse_lrc(lrc_text)
 
         SongLyricLine.objects.bulk_create([
@@ -100,6 +125,8 @@ class SongUploadSerializer(serializers.ModelSerializer):
             )
             for line in parsed_lines
         ])
+        # bulk_create sends no signals
+        bump_catalog_version()
 
         return song
 
@@ -108,9 +135,27 @@ class SongUploadSerializer(serializers.ModelSerializer):
 # Recording (READ – SECURE)
 # ─────────────────────────────────────────────
 
+# Columns RecordingSerializer reads, for .only() on list querysets
+RECORDING_LIST_FIELDS = (
+    "id",
+    "song",
+    "song__title",
+    "audio_file",
+    "peaks_file",
+    "duration",
+    "alignment_offset",
+    "alignment_confidence",
+    "score",
+    "line_scores",
+    "mixed_from",
+    "created_at",
+)
+
+
 class RecordingSerializer(serializers.ModelSerializer):
     song_title = serializers.CharField(source="song.title", read_only=True)
     audio_key = serializers.SerializerMethodField()
+    peaks_key = serializers.SerializerMethodField()
 
     class Meta:
         model = Recording
@@ -119,13 +164,22 @@ class RecordingSerializer(serializers.ModelSerializer):
             "song",
             "song_title",
             "audio_key",
+            "peaks_key",
             "duration",
+            "alignment_offset",
+            "alignment_confidence",
+            "score",
+            "line_scores",
+            "mixed_from",
             "created_at",
         ]
 
     def get_audio_key(self, obj):
         return obj.audio_file.name if obj.audio_file else None
 
+    def get_peaks_key(self, obj):
+        return obj.peaks_file.name if obj.peaks_file else None
+
 
 # ─────────────────────────────────────────────
 # Recording (UPLOAD)
@@ -140,6 +194,37 @@ class RecordingUploadSerializer(serializers.ModelSerializer):
         ]
 
 
+# ─────────────────────────────────────────────
+# Recording (SERVER-SIDE MIXDOWN)
+# ─────────────────────────────────────────────
+
+class RecordingMixSerializer(serializers.Serializer):
+    recording = serializers.PrimaryKeyRelatedField(queryset=Recording.objects.all())
+    song = serializers.PrimaryKeyRelatedField(
+        queryset=Song.objects.all(),
+        required=False,
+    )
+    vocal_gain = serializers.FloatField(min_value=0, max_value=2, default=1.0)
+    backing_gain = serializers.FloatField(min_value=0, max_value=2, default=0.7)
+    offset = serializers.FloatField(
+        min_value=0,
+        required=False,
+        help_text="Seconds into the song where the recording starts "
+                  "(default: the detected offset when confident, else 0)",
+    )
+
+    def validate_recording(self, value):
+        # Same 404-style answer whether it doesn't exist or isn't yours
+        if value.user_id != self.context["request"].user.id:
+            raise serializers.ValidationError("Recording not found.")
+        return value
+
+    def validate(self, attrs):
+        if "offset" not in attrs:
+            attrs["offset"] = attrs["recording"].start_offset or 0.0
+        return attrs
+
+
 class SongListSerializer(serializers.ModelSerializer):
     artist = ArtistSerializer(read_only=True)
     cover_url = serializers.SerializerMethodField()
@@ -165,3 +250,51 @@ class SongListSerializer(serializers.ModelSerializer):
             key=obj.cover_image.name,
             expires=600  # 10 minutes (perfect for list pages)
         )
+
+
+# ─────────────────────────────────────────────
+# Leaderboards / Stats (READ FROM AGGREGATES)
+# ─────────────────────────────────────────────
+
+class LeaderboardEntrySerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source="user.username", read_only=True)
+
+    class Meta:
+        model = SongLeaderboardEntry
+        fields = [
+            "username",
+            "best_score",
+            "updated_at",
+        ]
+
+
+class PopularSongSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source="song_id", read_only=True)
+    title = serializers.CharField(source="song.title", read_only=True)
+    artist = ArtistSerializer(source="song.artist", read_only=True)
+    cover_key = serializers.SerializerMethodField()
+
+    class Meta:
+        model = SongStats
+        fields = [
+            "id",
+            "title",
+            "artist",
+            "cover_key",
+            "recording_count",
+            "average_score",
+        ]
+
+    def get_cover_key(self, obj):
+        return obj.song.cover_image.name if obj.song.cover_image else None
+
+
+class UserStatsSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserStats
+        fields = [
+            "recording_count",
+            "scored_count",
+            "average_score",
+            "best_score",
+        ]
@@ -1,48 +1,110 @@
-from django.db.models.signals import post_delete, pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
-from django.core.files.storage import default_storage
-from .models import Song, Recording
+from .models import Artist, Song, SongLyricLine, Recording
+from .storage import stored_name
+from .utils import stats
+from .utils.blobs import acquire, release, unpin
+from .utils.catalog import bump_catalog_version
+from .utils.deletion import delete_on_commit
+from .utils.hls import package_song_safely
+from .utils.tasks import enqueue_on_commit
+
+
+SONG_FILE_FIELDS = ["cover_image", "audio_file", "lrc_file", "peaks_file", "melody_file"]
+RECORDING_FILE_FIELDS = ["audio_file", "peaks_file"]
+
+
+def stored_names(instance, fields):
+    return [getattr(instance, field).name for field in fields if getattr(instance, field)]
+
+
+def same_file(old, new):
+    """
+    Whether FieldFile `new` is the file `old` already points at. A
+    re-upload of the same bytes gets the same content-addressed key, so
+    nothing derived from it needs recomputing.
+    """
+    if old.name == new.name:
+        return True
+    return bool(old) and stored_name(new) == old.name
 
 
 # ─────────────────────────────────────────────
 # DELETE FILES WHEN MODEL IS DELETED
 # ─────────────────────────────────────────────
+# Files are queued for batched deletion after commit (utils.deletion):
+# no storage round trips inside the request or transaction. Uploads are
+# content-addressed and may be shared, so references are counted
+# (utils.blobs) and shared blobs survive until their last row goes.
 
 @receiver(post_delete, sender=Song)
 def delete_song_files(sender, instance, **kwargs):
-    for field in ["cover_image", "audio_file", "lrc_file"]:
-        file = getattr(instance, field, None)
-        if file and default_storage.exists(file.name):
-            default_storage.delete(file.name)
+    names = stored_names(instance, SONG_FILE_FIELDS)
+    release(names)
+    delete_on_commit(names=names, prefixes=[instance.hls_prefix])
 
 
 @receiver(post_delete, sender=Recording)
 def delete_recording_file(sender, instance, **kwargs):
-    if instance.audio_file and default_storage.exists(instance.audio_file.name):
-        default_storage.delete(instance.audio_file.name)
+    names = stored_names(instance, RECORDING_FILE_FIELDS)
+    release(names)
+    delete_on_commit(names=names)
 
 
 # ─────────────────────────────────────────────
 # DELETE OLD FILES WHEN FILE IS REPLACED
 # ─────────────────────────────────────────────
 
+def replace_files(old, instance, fields):
+    """
+    Release and schedule deletion of `old`'s files that `instance` replaces;
+    post_save acquires the new ones (their final key is only known then).
+    """
+    changed = [
+        field for field in fields
+        if not same_file(getattr(old, field), getattr(instance, field))
+    ]
+    names = stored_names(old, changed)
+    release(names)
+    delete_on_commit(names=names)
+    instance._replaced_file_fields = changed
+    # Same bytes uploaded again: stored under the same key, which the
+    # upload pinned but nothing new acquires
+    instance._reuploaded_file_fields = [
+        field for field in fields
+        if field not in changed and not getattr(instance, field)._committed
+    ]
+
+
+def acquire_files(instance, created, fields):
+    if not created:
+        unpin(stored_names(instance, getattr(instance, "_reuploaded_file_fields", [])))
+        instance._reuploaded_file_fields = []
+        fields = getattr(instance, "_replaced_file_fields", [])
+        instance._replaced_file_fields = []
+    acquire(stored_names(instance, fields))
+
+
 @receiver(pre_save, sender=Song)
 def replace_song_files(sender, instance, **kwargs):
     if not instance.pk:
-        return  # New object
+        # New object: packaged after commit (analyze_song_audio)
+        if instance.audio_file:
+            instance.hls_status = Song.HLS_PENDING
+        return
 
     try:
         old = Song.objects.get(pk=instance.pk)
     except Song.DoesNotExist:
         return
 
-    for field in ["cover_image", "audio_file", "lrc_file"]:
-        old_file = getattr(old, field)
-        new_file = getattr(instance, field)
+    # New audio → old peaks are stale, HLS needs repackaging; both are
+    # regenerated after commit
+    if not same_file(old.audio_file, instance.audio_file):
+        instance.peaks_file = ""
+        instance.hls_status = Song.HLS_PENDING if instance.audio_file else ""
 
-        if old_file and old_file != new_file:
-            if default_storage.exists(old_file.name):
-                default_storage.delete(old_file.name)
+    replace_files(old, instance, SONG_FILE_FIELDS)
 
 
 @receiver(pre_save, sender=Recording)
@@ -55,9 +117,120 @@ def replace_recording_file(sender, instance, **kwargs):
     except Recording.DoesNotExist:
         return
 
-    if old.audio_file and old.audio_file != instance.audio_file:
-        if default_storage.exists(old.audio_file.name):
-            default_storage.delete(old.audio_file.name)
+    if not same_file(old.audio_file, instance.audio_file):
+        instance.peaks_file = ""
+        instance.alignment_offset = None
+        instance.alignment_confidence = None
+        instance.score = None
+        instance.line_scores = []
+        # Uncounted in post_save, once the row no longer holds the score
+        instance._replaced_score = (old, old.score)
+
+    replace_files(old, instance, RECORDING_FILE_FIELDS)
+
+
+@receiver(post_save, sender=Song)
+def acquire_song_files(sender, instance, created, **kwargs):
+    acquire_files(instance, created, SONG_FILE_FIELDS)
+
+
+@receiver(post_save, sender=Recording)
+def acquire_recording_files(sender, instance, created, **kwargs):
+    acquire_files(instance, created, RECORDING_FILE_FIELDS)
+
+
+# ─────────────────────────────────────────────
+# CATALOG VERSION (HTTP VALIDATORS)
+# ─────────────────────────────────────────────
+# Lyric lines are only deleted alongside a Song save/delete, so they get
+# no post_delete receiver (which would disable fast cascade deletes).
+
+@receiver(post_save, sender=Song)
+@receiver(post_delete, sender=Song)
+@receiver(post_save, sender=Artist)
+@receiver(post_delete, sender=Artist)
+@receiver(post_save, sender=SongLyricLine)
+def catalog_changed(sender, **kwargs):
+    bump_catalog_version()
+
+
+# ─────────────────────────────────────────────
+# LEADERBOARD / STATS AGGREGATES
+# ─────────────────────────────────────────────
+
+# Registered before the analysis receivers so a recording is counted
+# before its score can arrive.
+@receiver(post_save, sender=Recording)
+def count_new_recording(sender, instance, created, **kwargs):
+    if created:
+        stats.recording_added(instance)
+
+
+@receiver(post_delete, sender=Recording)
+def uncount_deleted_recording(sender, instance, **kwargs):
+    stats.recording_removed(instance)
+
+
+@receiver(post_save, sender=Recording)
+def uncount_replaced_score(sender, instance, created, **kwargs):
+    # New audio cleared the score (replace_recording_file); best scores and
+    # the leaderboard entry are recomputed from the row as now stored
+    replaced = getattr(instance, "_replaced_score", None)
+    if replaced:
+        instance._replaced_score = None
+        old, score = replaced
+        stats.score_changed(old, score, None)
+
+
+# ─────────────────────────────────────────────
+# PROCESS NEW AUDIO (PEAKS, ALIGNMENT, SCORING, HLS)
+# ─────────────────────────────────────────────
+# The analysis modules (numpy) are imported when there is audio to
+# process, not when the app loads. Every step decodes a whole file, so
+# they run on the media worker (utils.tasks) after the upload request has
+# returned, in the order they are queued.
+
+@receiver(post_save, sender=Song)
+def analyze_song_audio(sender, instance, **kwargs):
+    # peaks_file is cleared whenever the audio changes
+    if not instance.audio_file or instance.peaks_file:
+        return
+
+    from .utils.alignment import cache_song_envelope_safely
+    from .utils.peaks import store_peaks_safely
+    from .utils.pitch import cache_song_melody_safely
+
+    enqueue_on_commit(store_peaks_safely, instance)
+    enqueue_on_commit(cache_song_envelope_safely, instance)
+    enqueue_on_commit(cache_song_melody_safely, instance)
+    if instance.hls_status == Song.HLS_PENDING:
+        enqueue_on_commit(package_song_safely, instance)
+    # peaks_file / hls_prefix are written with update(); queued behind the
+    # peaks, so the bump lands once they are stored
+    enqueue_on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Recording)
+def analyze_recording_audio(sender, instance, **kwargs):
+    if not instance.audio_file:
+        return
+
+    # Decide up front, from the row as saved
+    needs_peaks = not instance.peaks_file
+    # Mixdowns already contain the backing track
+    needs_alignment = instance.alignment_offset is None and not instance.mixed_from_id
+
+    from .utils.alignment import store_alignment_safely
+    from .utils.peaks import store_peaks_safely
+    from .utils.pitch import store_score_safely
+
+    if needs_peaks:
+        enqueue_on_commit(store_peaks_safely, instance)
+    if needs_alignment:
+        # Scoring reads the offset: queued after alignment. Songs without a
+        # melody reference leave the take unscored.
+        enqueue_on_commit(store_alignment_safely, instance)
+        enqueue_on_commit(store_score_safely, instance)
 
 
 
@@ -93,3 +266,4 @@ def reparse_lrc_on_change(sender, instance, **kwargs):
             )
             for line in parse_lrc(lrc_text)
         ])
+
@@ -0,0 +1,24 @@
+// Changelist audio placeholders: fetch a signed URL only when clicked.
+document.addEventListener("click", async (event) => {
+  const button = event.target.closest("button.lazy-media");
+  if (!button) return;
+
+  event.preventDefault();
+  button.disabled = true;
+
+  try {
+    const response = await fetch(button.dataset.mediaUrl, { credentials: "same-origin" });
+    if (!response.ok) throw new Error(response.statusText);
+    const { url } = await response.json();
+
+    const audio = document.createElement("audio");
+    audio.controls = true;
+    audio.autoplay = true;
+    audio.style.width = "250px";
+    audio.src = url;
+    button.replaceWith(audio);
+  } catch (error) {
+    button.disabled = false;
+    button.textContent = "Retry";
+  }
+});
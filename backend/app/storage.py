@@ -0,0 +1,125 @@
+import hashlib
+import os
+import posixpath
+import re
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage, storages
+from django.db import transaction
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from base.instrumentation import instrument_s3_client
+
+
+HASH_CHUNK = 1024 * 1024
+
+# <upload_to dir>/<sha256><ext>
+CONTENT_KEY = re.compile(r"(^|/)[0-9a-f]{64}(\.[A-Za-z0-9]+)*$")
+
+
+def is_content_addressed(name):
+    return bool(name and CONTENT_KEY.search(name))
+
+
+def content_digest(content):
+    """
+    SHA-256 of `content`'s bytes. Remembered on the file object: the
+    replace signals and _save() both need it for the same upload.
+    """
+    cached = getattr(content, "_content_sha256", None)
+    if cached:
+        return cached
+
+    digest = hashlib.sha256()
+    if hasattr(content, "seek"):
+        content.seek(0)
+    for chunk in content.chunks(HASH_CHUNK):
+        digest.update(chunk)
+    if hasattr(content, "seek"):
+        content.seek(0)
+
+    content._content_sha256 = digest.hexdigest()
+    return content._content_sha256
+
+
+def content_key(name, content):
+    """
+    Key for `content` uploaded as `name`: the upload_to directory, the
+    SHA-256 of the bytes and the original (lowercased) extension.
+    """
+    directory, filename = posixpath.split(name)
+    ext = os.path.splitext(filename)[1].lower()
+    return posixpath.join(directory, content_digest(content) + ext)
+
+
+def stored_name(field_file):
+    """
+    The name `field_file` has in storage, or will have once its model is
+    saved: an upload to content-addressed storage is keyed by its bytes.
+    None when that can't be known before saving.
+    """
+    if not field_file or field_file._committed:
+        return field_file.name
+    if not isinstance(field_file.storage, ContentAddressedMixin):
+        return None
+    name = field_file.field.generate_filename(field_file.instance, field_file.name)
+    return content_key(name, field_file.file)
+
+
+class ContentAddressedMixin:
+    """
+    Stores uploads under a key derived from their content, so the same
+    cover art or audio uploaded twice is one object.
+
+    When the key already exists the upload is skipped. Several rows can
+    then point at one object, so the file-cleanup signals reference-count
+    keys (app.utils.blobs) and only delete blobs nobody uses.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final key depends on the content; chosen in _save()
+        return name
+
+    def _save(self, name, content):
+        from .utils.blobs import pin
+
+        key = content_key(name, content)
+        # Pinned under the MediaBlob row lock before the existence check:
+        # a concurrent claim_unreferenced() either finishes deleting the
+        # object first (and the PUT below restores it) or sees the pin
+        with transaction.atomic():
+            pin(key)
+            if self.exists(key):
+                return key
+        return super()._save(key, content)
+
+
+class InstrumentedS3Storage(S3Boto3Storage):
+    """
+    S3Boto3Storage whose client calls are timed per request
+    (base.instrumentation).
+    """
+
+    @property
+    def connection(self):
+        connection = super().connection
+        instrument_s3_client(connection.meta.client)
+        return connection
+
+
+class ContentAddressedS3Storage(ContentAddressedMixin, InstrumentedS3Storage):
+    pass
+
+
+class ContentAddressedFileSystemStorage(ContentAddressedMixin, FileSystemStorage):
+    pass
+
+
+def content_addressed_storage():
+    """
+    Storage for user/admin uploaded media (STORAGES["content_addressed"],
+    falling back to the default storage when it isn't configured).
+    """
+    if "content_addressed" in settings.STORAGES:
+        return storages["content_addressed"]
+    return default_storage
@@ -1,3 +1,1249 @@
-from django.test import TestCase
+import io
+import logging
+import math
+import os
+import re
+import tempfile
+from contextlib import contextmanager
+from datetime import timedelta
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import numpy as np
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import QuerySet
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from base.authentication import user_cache
+from base.serializers import CustomTokenObtainPairSerializer
+
+from . import models, views_async
+from .models import Artist, MediaBlob, Recording, Song, SongLyricLine, UserStats
+from .storage import ContentAddressedFileSystemStorage, ContentAddressedS3Storage
+from .utils import hls, media_proxy
+from .utils.cache import CacheNamespace
+from .utils.alignment import ENVELOPE_RATE, ENVELOPE_SAMPLE_RATE, estimate_offset, onset_envelope
+from .utils.blobs import PIN_TTL, acquire, claim_unreferenced, release
+from .utils.deletion import delete_unreferenced
+from .utils.media_gc import FILE_FIELDS, collect_garbage
+from .utils.mixdown import create_mix_rendition, mix_hash
+from .utils.peaks import compute_peaks, decode_peaks, encode_peaks
+from .utils.pitch import CONTOUR_RATE, PITCH_SAMPLE_RATE, pitch_contour, score_contours, store_score
+from .utils.pitch import FRAME as PITCH_FRAME, HOP as PITCH_HOP
+from .utils.r2 import get_r2_client
+from .utils.stats import check_stats, rebuild_stats
+from .views_media import Unsatisfiable, parse_range_header, resolve_ranges
+
+try:
+    import boto3
+    from moto import mock_aws
+except ImportError:  # moto is a test-only dependency (requirements-dev.txt)
+    mock_aws = None
+
+
+# ─────────────────────────────────────────────
+# SYNTHETIC CATALOG
+# ─────────────────────────────────────────────
+# Big enough that an N+1 in any serializer (artist, song title, lyric
+# lines, cover lookup) overshoots the per-endpoint bounds below by far.
+
+GENRES = ["pop", "rock", "jazz", "hip-hop", "folk", "classical"]
+ARTISTS = 12
+SONGS = 60
+LYRIC_LINES = 40
+MY_RECORDINGS = 45
+OTHER_RECORDINGS = 30
+MIXES = 5
+HLS_SEGMENTS = 50
+
+BUCKET = "query-count-tests"
+
+
+def key(directory, n, ext):
+    return f"{directory}{n:064x}{ext}"
+
+
+def seed_catalog():
+    User = get_user_model()
+    me = User.objects.create_user(username="singer", password="pw")
+    other = User.objects.create_user(username="other", password="pw")
+    admin = User.objects.create_superuser(username="admin", password="pw")
+
+    artists = Artist.objects.bulk_create(
+        [Artist(name=f"Artist {n}") for n in range(ARTISTS)]
+    )
+    # bulk_create: no post_save, so no audio analysis / HLS packaging
+    songs = Song.objects.bulk_create([
+        Song(
+            title=f"Song {n}",
+            artist=artists[n % ARTISTS],
+            language="en",
+            genre=GENRES[n % len(GENRES)],
+            cover_image=key("song_covers/", n, ".jpg"),
+            audio_file=key("songs/audio/", n, ".mp3"),
+            lrc_file=key("songs/lyrics/", n, ".lrc"),
+            peaks_file=key("songs/peaks/", n, ".json"),
+            duration=180 + n,
+        )
+        for n in range(SONGS)
+    ])
+    SongLyricLine.objects.bulk_create([
+        SongLyricLine(song=song, timestamp=line * 4.5, text=f"{song.title}, line {line}")
+        for song in songs
+        for line in range(LYRIC_LINES)
+    ], batch_size=1000)
+
+    def takes(user, count, offset):
+        return [
+            Recording(
+                user=user,
+                song=songs[(offset + n) % SONGS],
+                audio_file=key("recordings/", offset + n, ".webm"),
+                peaks_file=key("recordings/peaks/", offset + n, ".json"),
+                duration=60.0,
+                score=(n * 7) % 100,
+            )
+            for n in range(count)
+        ]
+
+    mine = Recording.objects.bulk_create(takes(me, MY_RECORDINGS, 0))
+    Recording.objects.bulk_create(takes(other, OTHER_RECORDINGS, 1000))
+    Recording.objects.bulk_create([
+        Recording(
+            user=me,
+            song=take.song,
+            audio_file=key("recordings/", 2000 + n, ".m4a"),
+            mixed_from=take,
+            mix_hash=mix_hash(take, take.song, 1.0, 0.7, 0.0),
+        )
+        for n, take in enumerate(mine[:MIXES])
+    ])
+
+    rebuild_stats()
+    return me, other, admin, songs
+
+
+def hls_package(song):
+    """
+    A packaged rendition for `song`: master + one media playlist with
+    HLS_SEGMENTS segments (signed per request, read once from storage).
+    """
+    prefix = f"songs/hls/{song.pk}/abcdef012345/"
+    media = ["#EXTM3U", '#EXT-X-MAP:URI="init.mp4"']
+    for n in range(HLS_SEGMENTS):
+        media += ["#EXTINF:6.0,", f"seg_{n:05d}.m4s"]
+    media.append("#EXT-X-ENDLIST")
+    return prefix, {
+        f"{prefix}{hls.MASTER_PLAYLIST}": "#EXTM3U\n#EXT-X-STREAM-INF:BANDWIDTH=128000\nv0/index.m3u8\n",
+        f"{prefix}v0/index.m3u8": "\n".join(media) + "\n",
+    }
+
+
+# ─────────────────────────────────────────────
+# HARNESS
+# ─────────────────────────────────────────────
+
+S3_SETTINGS = {
+    "STORAGES": {
+        "default": {"BACKEND": "app.storage.InstrumentedS3Storage"},
+        "content_addressed": {"BACKEND": "app.storage.ContentAddressedS3Storage"},
+        "staticfiles": settings.STORAGES["staticfiles"],
+    },
+    "AWS_ACCESS_KEY_ID": "testing",
+    "AWS_SECRET_ACCESS_KEY": "testing",
+    "AWS_STORAGE_BUCKET_NAME": BUCKET,
+    "AWS_S3_ENDPOINT_URL": None,
+    "AWS_S3_REGION_NAME": "us-east-1",
+}
+
+# Per-test cache, whatever CACHE_BACKEND the environment points at
+LOCAL_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+R2_CALLS = re.compile(r'r2;[^,]*desc="(\d+) calls"')
+
+
+@skipUnless(mock_aws, "needs moto (in-process S3)")
+@override_settings(ALLOWED_HOSTS=["testserver"], CACHES=LOCAL_CACHE, **S3_SETTINGS)
+class QueryBudgetTestCase(TestCase):
+    """
+    Requests through the full middleware stack against a seeded catalog,
+    with R2 replaced by an in-process S3 (moto). Subclasses inherit the
+    settings overrides.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.me, cls.other, cls.admin, cls.songs = seed_catalog()
+
+    def setUp(self):
+        cache.clear()
+        hls._playlists.clear()
+        # Each test starts with the user row uncached
+        user_cache.clear()
+
+        # Per-request and slow-request log lines (base.instrumentation)
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+        aws = mock_aws()
+        aws.start()
+        self.addCleanup(aws.stop)
+        get_r2_client.cache_clear()
+        self.addCleanup(get_r2_client.cache_clear)
+
+        self.s3 = boto3.client("s3", region_name="us-east-1")
+        self.s3.create_bucket(Bucket=BUCKET)
+
+        self.login(self.me)
+
+    def login(self, user):
+        token = CustomTokenObtainPairSerializer.get_token(user)
+        self.client.cookies["access_token"] = str(token.access_token)
+
+    @contextmanager
+    def budget(self, queries, r2_calls=0):
+        """
+        Fail if the requests made in the block run more than `queries`
+        queries or `r2_calls` storage calls in total.
+        """
+        responses = []
+        with CaptureQueriesContext(connection) as captured:
+            yield responses
+
+        self.assertLessEqual(
+            len(captured), queries,
+            f"{len(captured)} queries (budget {queries}):\n"
+            + "\n".join(query["sql"] for query in captured.captured_queries),
+        )
+        calls = sum(
+            int(R2_CALLS.search(response["Server-Timing"]).group(1))
+            for response in responses
+        )
+        self.assertLessEqual(calls, r2_calls, f"{calls} R2 calls (budget {r2_calls})")
+
+    def get(self, responses, path, status=200, **extra):
+        response = self.client.get(path, **extra)
+        self.assertEqual(response.status_code, status, None if response.streaming else response.content[:500])
+        responses.append(response)
+        return response
+
+
+# ─────────────────────────────────────────────
+# CATALOG
+# ─────────────────────────────────────────────
+
+class CatalogQueryTests(QueryBudgetTestCase):
+
+    def test_song_list(self):
+        # catalog version + songs with artists
+        with self.budget(queries=2) as responses:
+            response = self.get(responses, reverse("song-list"))
+        self.assertEqual(len(response.json()), SONGS)
+
+    def test_song_detail(self):
+        # catalog version + song with artist + lyric lines
+        with self.budget(queries=3) as responses:
+            response = self.get(responses, reverse("song-detail", args=[self.songs[0].pk]))
+        self.assertEqual(len(response.json()["lyrics"]), LYRIC_LINES)
+
+    def test_song_detail_missing(self):
+        with self.budget(queries=2) as responses:
+            self.get(responses, reverse("song-detail", args=[10 ** 6]), status=404)
+
+    def test_genres(self):
+        # catalog version + counts per genre + one query for every cover
+        with self.budget(queries=3) as responses:
+            response = self.get(responses, reverse("genre-list"))
+        self.assertEqual(len(response.json()), len(GENRES))
+
+    def test_songs_by_genre(self):
+        with self.budget(queries=2) as responses:
+            response = self.get(responses, reverse("songs-by-genre", args=["rock"]))
+        self.assertEqual(len(response.json()), SONGS // len(GENRES))
+
+    def test_popular_songs(self):
+        with self.budget(queries=1) as responses:
+            response = self.get(responses, reverse("song-popular") + "?limit=50")
+        self.assertEqual(len(response.json()), 50)
+
+    def test_leaderboard(self):
+        song = self.songs[0]
+        with self.budget(queries=1) as responses:
+            response = self.get(responses, reverse("song-leaderboard", args=[song.pk]))
+        singers = song.recordings.filter(score__isnull=False).values("user").distinct()
+        self.assertEqual(len(response.json()), singers.count())
+
+    def test_warm_catalog_runs_no_queries(self):
+        paths = [
+            reverse("song-list"),
+            reverse("song-detail", args=[self.songs[0].pk]),
+            reverse("genre-list"),
+            reverse("songs-by-genre", args=["rock"]),
+        ]
+        with self.budget(queries=20) as responses:
+            for path in paths:
+                self.get(responses, path)
+
+        # Catalog version and rendered bodies both come from the cache
+        with self.budget(queries=0) as responses:
+            for path in paths:
+                self.get(responses, path)
+
+    def test_not_modified(self):
+        path = reverse("song-detail", args=[self.songs[0].pk])
+        etag = self.client.get(path)["ETag"]
+        cache.clear()
+
+        # The version lookup is the only work behind a 304
+        with self.budget(queries=1) as responses:
+            self.get(responses, path, status=304, HTTP_IF_NONE_MATCH=etag)
+
+
+# ─────────────────────────────────────────────
+# RECORDINGS / STATS
+# ─────────────────────────────────────────────
+
+class RecordingQueryTests(QueryBudgetTestCase):
+
+    def test_my_recordings_pages(self):
+        # Per page: user, recordings with songs, recording_count
+        path = reverse("my-recordings")
+        seen = 0
+        pages = 0
+        while path:
+            with self.budget(queries=3) as responses:
+                body = self.get(responses, path).json()
+            seen += len(body["results"])
+            pages += 1
+            path = body["next"]
+
+        # Mixdowns are neither listed nor counted
+        self.assertEqual(seen, MY_RECORDINGS)
+        self.assertEqual(pages, 3)
+        self.assertEqual(body["recording_count"], MY_RECORDINGS)
+
+    def test_my_recordings_pages_with_equal_timestamps(self):
+        mine = Recording.objects.filter(user=self.me, mixed_from__isnull=True)
+        mine.update(created_at=timezone.now())
+
+        path, seen = reverse("my-recordings") + "?page_size=7", []
+        while path:
+            body = self.client.get(path).json()
+            seen += [take["id"] for take in body["results"]]
+            path = body["next"]
+
+        self.assertEqual(sorted(seen), sorted(mine.values_list("pk", flat=True)))
+
+    def test_my_stats(self):
+        with self.budget(queries=2) as responses:
+            response = self.get(responses, reverse("my-stats"))
+        self.assertEqual(response.json()["recording_count"], MY_RECORDINGS)
+
+    def test_existing_mix_is_not_rendered_again(self):
+        take = Recording.objects.filter(user=self.me, mix_hash="").order_by("pk").first()
+        # Lookups only: no decode, render or upload
+        with self.budget(queries=6) as responses:
+            response = self.client.post(
+                reverse("recording-mix"),
+                {"recording": take.pk},
+                content_type="application/json",
+            )
+            responses.append(response)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()["mixed_from"], take.pk)
+
+    @override_settings(MEDIA_DELETE_ASYNC=False)
+    def test_lost_mix_race_drops_the_upload(self):
+        winner = Recording.objects.filter(user=self.me).exclude(mix_hash="").order_by("pk").first()
+        take = winner.mixed_from
+
+        def render_mix(*args):
+            fd, path = tempfile.mkstemp(suffix=".m4a")
+            with os.fdopen(fd, "wb") as fh:
+                fh.write(b"losing render")
+            return path, 60.0
+
+        # Both requests missed the rendition before either stored one
+        field = Recording._meta.get_field("audio_file")
+        with mock.patch.object(field, "storage", ContentAddressedS3Storage()), \
+                mock.patch("app.utils.mixdown.render_mix", render_mix), \
+                mock.patch.object(QuerySet, "first", return_value=None), \
+                self.captureOnCommitCallbacks(execute=True):
+            rendition, created = create_mix_rendition(take, take.song, 1.0, 0.7, 0.0)
+
+        self.assertFalse(created)
+        self.assertEqual(rendition.pk, winner.pk)
+        self.assertNotIn("Contents", self.s3.list_objects_v2(Bucket=BUCKET, Prefix="recordings/"))
+        self.assertFalse(MediaBlob.objects.exists())
+
+# ─────────────────────────────────────────────
+# MEDIA (ACL + STORAGE CALLS)
+# ─────────────────────────────────────────────
+
+class MediaQueryTests(QueryBudgetTestCase):
+
+    def secure(self, key):
+        return reverse("secure-media") + f"?key={key}"
+
+    def test_song_media(self):
+        # User row + catalog version + one EXISTS; presigning never calls R2
+        with self.budget(queries=3) as responses:
+            response = self.get(responses, self.secure(self.songs[3].cover_image.name))
+        self.assertIn("url", response.json())
+
+    def test_own_recording_media(self):
+        take = Recording.objects.filter(user=self.me).first()
+        with self.budget(queries=4) as responses:
+            self.get(responses, self.secure(take.audio_file.name))
+
+    def test_other_users_recording_is_forbidden(self):
+        take = Recording.objects.filter(user=self.other).first()
+        with self.budget(queries=4) as responses:
+            self.get(responses, self.secure(take.audio_file.name), status=403)
+
+    def test_deactivated_user_loses_media_access(self):
+        key = self.songs[3].cover_image.name
+        get_user_model().objects.filter(pk=self.me.pk).update(is_active=False)
+
+        # The access token is still valid; both gateways load the user row
+        self.assertEqual(self.client.get(self.secure(key)).status_code, 401)
+
+        request = RequestFactory().get(self.secure(key))
+        request.COOKIES["access_token"] = self.client.cookies["access_token"].value
+        response = async_to_sync(views_async.SecureMediaView.as_view())(request)
+        self.assertEqual(response.status_code, 401)
+
+    def test_hls_playlists(self):
+        song = self.songs[0]
+        prefix, objects = hls_package(song)
+        for name, body in objects.items():
+            self.s3.put_object(Bucket=BUCKET, Key=name, Body=body.encode())
+        Song.objects.filter(pk=song.pk).update(hls_prefix=prefix)
+
+        media = reverse("song-hls", args=[song.pk, "v0/index.m3u8"])
+
+        # One read for the playlist; its segments are signed locally
+        with self.budget(queries=2, r2_calls=1) as responses:
+            response = self.get(responses, media)
+        self.assertEqual(response.content.decode().count("X-Amz-Signature"), HLS_SEGMENTS + 1)
+
+        # Then served from the worker's playlist cache
+        with self.budget(queries=2, r2_calls=0) as responses:
+            self.get(responses, media)
+
+
+# ─────────────────────────────────────────────
+# STATS (INCREMENTAL AGGREGATES)
+# ─────────────────────────────────────────────
+
+class IncrementalStatsTests(TestCase):
+    """
+    Aggregates kept by the signals and store_score alone (never rebuilt)
+    must agree with check_stats() after every change.
+    """
+    melody = np.full(30 * CONTOUR_RATE, 220.0, dtype=np.float32)
+
+    def setUp(self):
+        User = get_user_model()
+        self.singer = User.objects.create_user(username="singer", password="pw")
+        self.rival = User.objects.create_user(username="rival", password="pw")
+        artist = Artist.objects.create(name="Artist")
+        # bulk_create: no post_save, so no audio analysis / HLS packaging
+        self.song, self.other_song = Song.objects.bulk_create([
+            Song(title=f"Song {n}", artist=artist, duration=180) for n in range(2)
+        ])
+
+    def record(self, user, song, n):
+        return Recording.objects.create(
+            user=user, song=song, audio_file=key("recordings/", n, ".webm"), duration=30.0,
+        )
+
+    def score(self, recording, semitones):
+        """
+        Run the scorer on a take sung `semitones` off the melody.
+        """
+        sung = self.melody * SEMITONE ** semitones
+        with mock.patch("app.utils.pitch.song_melody_contour", return_value=self.melody), \
+                mock.patch("app.utils.pitch.pitch_contour", return_value=sung), \
+                mock.patch("app.utils.pitch.ffmpeg_input"):
+            return store_score(recording)
+
+    def assertConsistent(self):
+        self.assertEqual(check_stats(), [])
+
+    def test_create_rescore_replace_delete(self):
+        first = self.record(self.singer, self.song, 1)
+        second = self.record(self.singer, self.song, 2)
+        theirs = self.record(self.rival, self.song, 3)
+        elsewhere = self.record(self.singer, self.other_song, 4)
+        self.assertConsistent()
+
+        self.assertEqual(self.score(first, 1)[0], 80.0)
+        self.score(second, 0)
+        self.score(theirs, 3)
+        self.score(elsewhere, 1)
+        self.assertConsistent()
+
+        # Best take drops below the other one, then the other goes away
+        self.score(second, 1)
+        self.score(first, 0)
+        self.assertConsistent()
+        second.delete()
+        self.assertConsistent()
+
+        # New audio clears the score until it is scored again
+        first.refresh_from_db()
+        first.audio_file = key("recordings/", 5, ".webm")
+        first.save()
+        self.assertIsNone(first.score)
+        self.assertConsistent()
+        self.score(first, 1)
+        self.assertConsistent()
+
+        # Mixdowns aren't counted
+        Recording.objects.create(
+            user=self.singer, song=self.song, mixed_from=first, mix_hash="f" * 64,
+            audio_file=key("recordings/", 6, ".m4a"), duration=30.0,
+        )
+        self.assertConsistent()
+
+        theirs.delete()
+        elsewhere.delete()
+        first.delete()
+        self.assertConsistent()
+        self.assertEqual(UserStats.objects.get(pk=self.singer.pk).recording_count, 0)
+
+
+# ─────────────────────────────────────────────
+# MEDIA STREAM (R2 PROXY MODE)
+# ─────────────────────────────────────────────
+
+class MediaProxyTests(QueryBudgetTestCase):
+    body = bytes(range(256)) * 1200  # 300 KiB
+
+    def setUp(self):
+        super().setUp()
+        media_proxy._metadata.clear()
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        proxy_settings = self.settings(
+            MEDIA_STREAM_SOURCE="r2",
+            MEDIA_PROXY_CACHE_DIR=directory.name,
+            MEDIA_PROXY_CACHE_HEAD_BYTES=64 * 1024,
+            MEDIA_PROXY_CACHE_MAX_BYTES=1024 * 1024,
+        )
+        proxy_settings.enable()
+        self.addCleanup(proxy_settings.disable)
+
+        self.key = self.songs[0].audio_file.name
+        self.s3.put_object(Bucket=BUCKET, Key=self.key, Body=self.body, ContentType="audio/mpeg")
+        self.path = f"/media/{self.key}"
+
+    def content(self, response):
+        return b"".join(response.streaming_content) if response.streaming else response.content
+
+    def test_full_get(self):
+        # User + song ACL lookups; the HEAD (the GET runs as the body
+        # streams, after Server-Timing is written)
+        with self.budget(queries=3, r2_calls=1) as responses:
+            response = self.get(responses, self.path)
+
+        self.assertEqual(response["Content-Length"], str(len(self.body)))
+        self.assertEqual(response["Content-Type"], "audio/mpeg")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(response["Cache-Control"], "private, max-age=300")
+        self.assertTrue(response.has_header("ETag"))
+        self.assertEqual(self.content(response), self.body)
+
+    def test_single_range(self):
+        with self.budget(queries=3, r2_calls=1) as responses:
+            response = self.get(responses, self.path, status=206, HTTP_RANGE="bytes=70000-70999")
+
+        self.assertEqual(response["Content-Range"], f"bytes 70000-70999/{len(self.body)}")
+        self.assertEqual(response["Content-Length"], "1000")
+        self.assertEqual(self.content(response), self.body[70000:71000])
+
+    def test_range_from_cached_head(self):
+        self.content(self.client.get(self.path))
+        # Served without R2 from here on
+        self.s3.delete_object(Bucket=BUCKET, Key=self.key)
+
+        # User, ACL and HEAD cached by the first request, bytes from the
+        # head on local disk
+        with self.budget(queries=0, r2_calls=0) as responses:
+            response = self.get(responses, self.path, status=206, HTTP_RANGE="bytes=100-199")
+
+        self.assertEqual(response["Content-Range"], f"bytes 100-199/{len(self.body)}")
+        self.assertEqual(self.content(response), self.body[100:200])
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get(self.path, HTTP_RANGE=f"bytes={len(self.body)}-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], f"bytes */{len(self.body)}")
+
+    def test_if_none_match(self):
+        etag = self.s3.head_object(Bucket=BUCKET, Key=self.key)["ETag"]
+
+        with self.budget(queries=3, r2_calls=1) as responses:
+            response = self.get(responses, self.path, status=304, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response["ETag"], etag)
+        self.assertEqual(self.content(response), b"")
+
+    def test_access(self):
+        self.get([], f"/media/recordings/{'f' * 64}.webm", status=403)
+        self.client.cookies.clear()
+        self.get([], self.path, status=401)
+
+
+# ─────────────────────────────────────────────
+# WRITES (UPLOAD, REPLACE, DELETE)
+# ─────────────────────────────────────────────
+# Analysis, packaging and file cleanup run after commit (never, in a
+# TestCase), so these count the request's own queries.
+
+def png():
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new("RGB", (4, 4)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+@contextmanager
+def probe(seconds):
+    """
+    Recording.save() measures uploads with pydub, which needs ffprobe.
+    """
+    audio = mock.MagicMock()
+    audio.__len__.return_value = seconds * 1000
+    with mock.patch("pydub.AudioSegment.from_file", return_value=audio):
+        yield
+
+
+class WriteQueryTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # File fields resolve their storage at import: point them at moto
+        storage = ContentAddressedS3Storage()
+        for model, fields in FILE_FIELDS.items():
+            for name in fields:
+                field = getattr(models, model)._meta.get_field(name)
+                patcher = mock.patch.object(field, "storage", storage)
+                patcher.start()
+                self.addCleanup(patcher.stop)
+
+    def test_song_upload(self):
+        self.login(self.admin)
+        lrc = "\n".join(f"[00:{line:02d}.00]Line {line}" for line in range(LYRIC_LINES))
+
+        # Admin user + artist, a pin per file (UPDATE, INSERT and their
+        # savepoints), the song, an acquire per file, one INSERT for all
+        # the lyric lines and the catalog version bump; an existence check
+        # per file on R2 (moto's PUTs aren't counted)
+        with self.budget(queries=25, r2_calls=3) as responses:
+            response = self.client.post(reverse("song-upload"), {
+                "title": "New song",
+                "artist": self.songs[0].artist_id,
+                "language": "en",
+                "genre": "pop",
+                "cover_image": SimpleUploadedFile("cover.png", png()),
+                "audio_file": SimpleUploadedFile("song.mp3", b"song audio"),
+                "lrc_file": SimpleUploadedFile("song.lrc", lrc.encode()),
+                "duration": 180,
+            })
+            responses.append(response)
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(SongLyricLine.objects.filter(song__title="New song").count(), LYRIC_LINES)
+
+    def test_recording_upload(self):
+        # User + song, the pin, the row, its acquire and the two stats rows
+        # (get_or_create, then the increment)
+        with self.budget(queries=14, r2_calls=1) as responses, probe(seconds=60):
+            response = self.client.post(reverse("recording-upload"), {
+                "song": self.songs[0].pk,
+                "audio_file": SimpleUploadedFile("take.webm", b"take audio"),
+            })
+            responses.append(response)
+        self.assertEqual(response.status_code, 201, response.content)
+
+    def test_recording_replace(self):
+        take = Recording.objects.filter(user=self.me, mix_hash="").first()
+        take.audio_file = ContentFile(b"another take", name="take.webm")
+        # Old row, release of both old files, the pin, the UPDATE, the
+        # acquire, and the old score uncounted (stats + leaderboard)
+        with self.assertNumQueries(17):
+            take.save()
+
+    def test_recording_delete(self):
+        take = Recording.objects.filter(user=self.me, mix_hash="").first()
+        # The cascade, releases of both files, stats and leaderboard
+        with self.assertNumQueries(13):
+            take.delete()
+
+
+# ─────────────────────────────────────────────
+# AUTH (REFRESH, LOGOUT) x CLAIMS-ONLY READS
+# ─────────────────────────────────────────────
+# Budgets of the auth endpoints themselves are in base.tests; these
+# follow the cookies they set into the claims-authenticated catalog.
+
+@override_settings(TOKEN_BLACKLIST_COMPACT_INTERVAL=0)
+class ClaimsAuthQueryTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        refresh = CustomTokenObtainPairSerializer.get_token(self.me)
+        self.client.cookies["refresh_token"] = str(refresh)
+
+    def post(self, name, status=200):
+        response = self.client.post(reverse(name), {}, content_type="application/json")
+        self.assertEqual(response.status_code, status, response.content[:500])
+        return response
+
+    def test_refreshed_token_reads_without_user_row(self):
+        self.post("token_refresh")
+
+        # The rotated access token still carries the claims: the same
+        # budgets as CatalogQueryTests, no user lookup
+        with self.budget(queries=2) as responses:
+            self.get(responses, reverse("song-list"))
+        with self.budget(queries=3) as responses:
+            self.get(responses, reverse("song-detail", args=[self.songs[0].pk]))
+
+    def test_logout(self):
+        self.post("logout")
+
+        # Cookies cleared: turned away before any query
+        with self.budget(queries=0) as responses:
+            self.get(responses, reverse("song-list"), status=401)
+        self.post("token_refresh", status=401)
+
+
+# ─────────────────────────────────────────────
+# OPERATIONS
+# ─────────────────────────────────────────────
+
+class OpsQueryTests(QueryBudgetTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.login(self.admin)
+
+    def test_ops_endpoints(self):
+        # The admin lookup (+ ops-db's connection probe)
+        for name in ("ops-db", "ops-cache", "ops-metrics"):
+            with self.subTest(name), self.budget(queries=2) as responses:
+                self.get(responses, reverse(name))
+
+    def test_metrics_include_auth_caches(self):
+        with self.budget(queries=2) as responses:
+            body = self.get(responses, reverse("ops-metrics")).content.decode()
+        self.assertIn('auth_cache_lookups_total{cache="user",result="hits"}', body)
+        self.assertIn('auth_cache_entries{cache="token"}', body)
+
+
+# ─────────────────────────────────────────────
+# RANGE REQUESTS (RFC 7233)
+# ─────────────────────────────────────────────
+
+class RangeHeaderTests(SimpleTestCase):
+
+    def test_single_range(self):
+        self.assertEqual(parse_range_header("bytes=0-99", 1000), [(0, 99)])
+        self.assertEqual(parse_range_header("bytes=900-", 1000), [(900, 999)])
+        self.assertEqual(parse_range_header("bytes=900-5000", 1000), [(900, 999)])
+
+    def test_suffix_range(self):
+        self.assertEqual(parse_range_header("bytes=-100", 1000), [(900, 999)])
+        # A suffix longer than the file is the whole file
+        self.assertEqual(parse_range_header("bytes=-5000", 1000), [(0, 999)])
+
+    def test_multiple_ranges_are_sorted_and_coalesced(self):
+        self.assertEqual(
+            parse_range_header("bytes=500-599, 0-99, 100-199, -10", 1000),
+            [(0, 199), (500, 599), (990, 999)],
+        )
+        self.assertEqual(parse_range_header("bytes=0-499,250-749", 1000), [(0, 749)])
+
+    def test_ignored_headers(self):
+        for header in (
+            "",
+            "items=0-1",
+            "bytes=",
+            "bytes=abc-def",
+            "bytes=5-1",
+            "bytes=-",
+            "bytes=1",
+            "bytes=" + ",".join(f"{i * 10}-{i * 10 + 1}" for i in range(17)),
+        ):
+            with self.subTest(header):
+                self.assertIsNone(parse_range_header(header, 1000))
+
+    def test_unsatisfiable(self):
+        for header in ("bytes=1000-", "bytes=2000-3000", "bytes=-0", "bytes=1000-,1500-1600"):
+            with self.subTest(header), self.assertRaises(Unsatisfiable):
+                parse_range_header(header, 1000)
+
+        # Unsatisfiable parts are dropped when another part overlaps
+        self.assertEqual(parse_range_header("bytes=2000-,0-9", 1000), [(0, 9)])
+
+    def test_empty_file(self):
+        with self.assertRaises(Unsatisfiable):
+            parse_range_header("bytes=-10", 0)
+
+
+class ResolveRangesTests(SimpleTestCase):
+    etag = '"abc-3e8"'
+    last_modified = 1_700_000_000
+
+    def resolve(self, **headers):
+        request = RequestFactory().get("/media/x", headers=headers)
+        return resolve_ranges(request, 1000, self.etag, self.last_modified)
+
+    def test_range_without_if_range(self):
+        self.assertEqual(self.resolve(Range="bytes=0-9"), ([(0, 9)], None))
+
+    def test_unsatisfiable_is_416(self):
+        ranges, response = self.resolve(Range="bytes=5000-")
+        self.assertIsNone(ranges)
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */1000")
+
+    def test_if_range_etag(self):
+        self.assertEqual(self.resolve(Range="bytes=0-9", **{"If-Range": self.etag}), ([(0, 9)], None))
+        # A changed file sends the whole body instead
+        self.assertEqual(self.resolve(Range="bytes=0-9", **{"If-Range": '"other"'}), (None, None))
+        # Weak validators never match
+        self.assertEqual(self.resolve(Range="bytes=0-9", **{"If-Range": f"W/{self.etag}"}), (None, None))
+
+    def test_if_range_date(self):
+        current = http_date(self.last_modified)
+        older = http_date(self.last_modified - 60)
+        self.assertEqual(self.resolve(Range="bytes=0-9", **{"If-Range": current}), ([(0, 9)], None))
+        self.assertEqual(self.resolve(Range="bytes=0-9", **{"If-Range": older}), (None, None))
+        self.assertEqual(self.resolve(Range="bytes=0-9", **{"If-Range": "not a date"}), (None, None))
+
+    def test_if_range_does_not_turn_a_stale_range_into_416(self):
+        self.assertEqual(self.resolve(Range="bytes=5000-", **{"If-Range": '"other"'}), (None, None))
+
+
+# ─────────────────────────────────────────────
+# WAVEFORM PEAKS
+# ─────────────────────────────────────────────
+
+def pcm_blocks(signal, block_frames=1000):
+    """
+    Stand-in for audio.iter_pcm_blocks: `signal` as mono float32 blocks.
+    """
+    def iter_blocks(source, **kwargs):
+        for start in range(0, len(signal), block_frames):
+            yield signal[start:start + block_frames, np.newaxis]
+    return iter_blocks
+
+
+class PeaksTests(SimpleTestCase):
+    # Three full 4096-sample bins and a partial one; 1.5x full scale
+    signal = (1.5 * np.sin(np.arange(3 * 4096 + 100) / 50)).astype(np.float32)
+
+    def compute(self):
+        with mock.patch("app.utils.peaks.iter_pcm_blocks", pcm_blocks(self.signal)):
+            return compute_peaks(None)
+
+    def test_levels(self):
+        levels = self.compute()
+
+        self.assertEqual(sorted(levels), [256, 1024, 4096])
+        for resolution, pairs in levels.items():
+            with self.subTest(resolution):
+                self.assertEqual(pairs.dtype, np.int8)
+                self.assertEqual(pairs.shape, (math.ceil(len(self.signal) / resolution), 2))
+
+                # Coarse levels folded from the finest match min/max per bin
+                expected = [
+                    (chunk.min(), chunk.max())
+                    for chunk in (
+                        self.signal[start:start + resolution]
+                        for start in range(0, len(self.signal), resolution)
+                    )
+                ]
+                expected = np.round(np.clip(expected, -1.0, 1.0) * 127).astype(np.int8)
+                np.testing.assert_array_equal(pairs, expected)
+
+    def test_clipped_to_full_scale(self):
+        pairs = self.compute()[4096]
+        self.assertEqual(pairs.min(), -127)
+        self.assertEqual(pairs.max(), 127)
+
+    def test_round_trip(self):
+        levels = self.compute()
+
+        sample_rate, decoded = decode_peaks(encode_peaks(levels, sample_rate=22050))
+
+        self.assertEqual(sample_rate, 22050)
+        self.assertEqual(sorted(decoded), sorted(levels))
+        for resolution, pairs in levels.items():
+            np.testing.assert_array_equal(decoded[resolution], pairs)
+
+    def test_not_a_peaks_file(self):
+        with self.assertRaises(ValueError):
+            decode_peaks(b"RIFF" + bytes(16))
+
+
+# ─────────────────────────────────────────────
+# ALIGNMENT (ONSET CROSS-CORRELATION)
+# ─────────────────────────────────────────────
+
+class AlignmentTests(SimpleTestCase):
+    rate = ENVELOPE_SAMPLE_RATE
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        # 30 s of irregularly spaced clicks, so no lag but the true one
+        # lines them all up
+        rng = np.random.default_rng(7)
+        cls.song = np.zeros(30 * cls.rate, dtype=np.float32)
+        for at in rng.uniform(0, 29.9, 60):
+            start = int(at * cls.rate)
+            cls.song[start:start + 200] += rng.uniform(0.3, 1.0) * np.sin(np.arange(200) * 0.9)
+        cls.song_envelope = cls.envelope(cls.song)
+
+    @staticmethod
+    def envelope(signal):
+        with mock.patch("app.utils.alignment.iter_pcm_blocks", pcm_blocks(signal, 4096)):
+            return onset_envelope(None)
+
+    def test_envelope_rate(self):
+        self.assertEqual(len(self.song_envelope), 30 * ENVELOPE_RATE)
+
+    def test_delayed_take(self):
+        for lag in (0.0, 2.5, 7.33, 15.0):
+            with self.subTest(lag):
+                start = int(lag * self.rate)
+                take = self.envelope(self.song[start:start + 12 * self.rate])
+
+                offset, confidence = estimate_offset(self.song_envelope, take)
+
+                self.assertAlmostEqual(offset, lag, delta=1 / ENVELOPE_RATE)
+                self.assertGreaterEqual(confidence, Recording.ALIGNMENT_MIN_CONFIDENCE)
+
+    def test_silence_and_noise_are_not_confident(self):
+        rng = np.random.default_rng(3)
+        for name, take in (
+            ("silence", np.zeros(12 * self.rate, dtype=np.float32)),
+            ("noise", rng.normal(0, 0.3, 12 * self.rate).astype(np.float32)),
+        ):
+            with self.subTest(name):
+                _, confidence = estimate_offset(self.song_envelope, self.envelope(take))
+                self.assertLess(confidence, Recording.ALIGNMENT_MIN_CONFIDENCE)
+
+
+# ─────────────────────────────────────────────
+# PITCH SCORING (YIN + CONTOUR COMPARISON)
+# ─────────────────────────────────────────────
+
+SEMITONE = 2 ** (1 / 12)
+
+
+class PitchTests(SimpleTestCase):
+
+    def contour(self, signal):
+        with mock.patch("app.utils.pitch.iter_pcm_blocks", pcm_blocks(signal, 4096)):
+            return pitch_contour(None)
+
+    def test_sine_f0(self):
+        t = np.arange(2 * PITCH_SAMPLE_RATE) / PITCH_SAMPLE_RATE
+        for f0 in (110.0, 220.0, 440.0, 880.0):
+            with self.subTest(f0):
+                contour = self.contour((0.5 * np.sin(2 * np.pi * f0 * t)).astype(np.float32))
+
+                self.assertEqual(len(contour), (len(t) - PITCH_FRAME) // PITCH_HOP + 1)
+                # Within 5 cents on every frame
+                np.testing.assert_allclose(contour, f0, rtol=0.003)
+
+    def test_silence_is_unvoiced(self):
+        contour = self.contour(np.zeros(PITCH_SAMPLE_RATE, dtype=np.float32))
+        self.assertFalse(contour.any())
+
+    def test_identical_contours(self):
+        reference = np.full(10 * CONTOUR_RATE, 220.0, dtype=np.float32)
+
+        overall, lines = score_contours(reference, reference, 0.0, [0.0, 5.0])
+
+        self.assertEqual(overall, 100.0)
+        self.assertEqual(lines, [
+            {"timestamp": 0.0, "score": 100.0},
+            {"timestamp": 5.0, "score": 100.0},
+        ])
+
+    def test_shifted_contours(self):
+        reference = np.full(10 * CONTOUR_RATE, 220.0, dtype=np.float32)
+        for shift, expected in ((1, 80.0), (-1, 80.0), (3, 0.0), (6, 0.0)):
+            with self.subTest(semitones=shift):
+                overall, _ = score_contours(reference * SEMITONE ** shift, reference, 0.0, [0.0])
+                self.assertEqual(overall, expected)
+
+        # Sung an octave off (another voice range): pitch class only
+        overall, _ = score_contours(reference * 2, reference, 0.0, [0.0])
+        self.assertEqual(overall, 100.0)
+        overall, _ = score_contours(reference * 2 * SEMITONE, reference, 0.0, [0.0])
+        self.assertEqual(overall, 80.0)
+
+    def test_lines_split_on_lyric_times(self):
+        reference = np.full(12 * CONTOUR_RATE, 220.0, dtype=np.float32)
+        # The take starts 2 s in: on pitch until 6 s, a semitone sharp after
+        sung = reference[2 * CONTOUR_RATE:].copy()
+        sung[4 * CONTOUR_RATE:] *= SEMITONE
+
+        overall, lines = score_contours(sung, reference, 2.0, [0.0, 4.0, 6.0, 11.9])
+
+        # The last line has fewer than MIN_LINE_FRAMES frames
+        self.assertEqual(lines, [
+            {"timestamp": 0.0, "score": 100.0},
+            {"timestamp": 4.0, "score": 100.0},
+            {"timestamp": 6.0, "score": 80.0},
+        ])
+        # Weighted by the frames of the scored lines: 4 s on pitch, 5.9 s sharp
+        self.assertEqual(overall, 88.1)
+
+
+# ─────────────────────────────────────────────
+# CONTENT-ADDRESSED BLOBS (REFCOUNTS)
+# ─────────────────────────────────────────────
+
+class BlobRefcountTests(TestCase):
+    key = "songs/audio/" + "a" * 64 + ".mp3"
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = ContentAddressedFileSystemStorage(location=directory.name)
+
+    def refcount(self, key):
+        return MediaBlob.objects.filter(key=key).values_list("refcount", flat=True).first()
+
+    def test_acquire_and_release(self):
+        acquire([self.key, self.key])
+        self.assertEqual(self.refcount(self.key), 2)
+
+        release([self.key])
+        self.assertEqual(self.refcount(self.key), 1)
+        self.assertEqual(claim_unreferenced([self.key]), [])
+
+        release([self.key])
+        release([self.key])  # Never goes below zero
+        self.assertEqual(self.refcount(self.key), 0)
+        self.assertEqual(claim_unreferenced([self.key]), [self.key])
+        self.assertIsNone(self.refcount(self.key))
+
+    def test_plain_names_are_not_counted(self):
+        acquire(["songs/audio/original.mp3"])
+        self.assertFalse(MediaBlob.objects.exists())
+        self.assertEqual(claim_unreferenced(["songs/audio/original.mp3"]), ["songs/audio/original.mp3"])
+
+    def test_uncounted_key_is_claimed_without_leaving_a_row(self):
+        self.assertEqual(claim_unreferenced([self.key, self.key]), [self.key])
+        self.assertFalse(MediaBlob.objects.exists())
+
+    def test_skipped_upload_pins_the_blob(self):
+        key = self.storage.save("songs/audio/take.mp3", ContentFile(b"take"))
+        acquire([key])
+        release([key])
+
+        # Same bytes again: no PUT, and the unreferenced blob survives a
+        # delete that runs before the new row acquires it
+        self.assertEqual(self.storage.save("songs/audio/again.mp3", ContentFile(b"take")), key)
+        self.assertEqual(delete_unreferenced([key], self.storage), ([], 0))
+        self.assertTrue(self.storage.exists(key))
+
+        acquire([key])
+        self.assertEqual(self.refcount(key), 1)
+
+    def test_acquire_takes_over_the_pin(self):
+        key = self.storage.save("songs/audio/take.mp3", ContentFile(b"take"))
+        acquire([key])
+        release([key])
+
+        self.assertEqual(delete_unreferenced([key], self.storage), ([key], 0))
+        self.assertFalse(self.storage.exists(key))
+
+    def test_stale_pin_expires(self):
+        key = self.storage.save("songs/audio/take.mp3", ContentFile(b"take"))
+        MediaBlob.objects.filter(key=key).update(pinned_at=timezone.now() - PIN_TTL - timedelta(seconds=1))
+
+        self.assertEqual(delete_unreferenced([key], self.storage), ([key], 0))
+        self.assertFalse(self.storage.exists(key))
+
+    def test_upload_after_delete_writes_the_object_again(self):
+        key = self.storage.save("songs/audio/take.mp3", ContentFile(b"take"))
+        acquire([key])
+        release([key])
+        delete_unreferenced([key], self.storage)
+
+        self.assertEqual(self.storage.save("songs/audio/again.mp3", ContentFile(b"take")), key)
+        with open(os.path.join(self.storage.location, key), "rb") as fh:
+            self.assertEqual(fh.read(), b"take")
+
+
+# ─────────────────────────────────────────────
+# MEDIA GC
+# ─────────────────────────────────────────────
+
+class MediaGcTests(TestCase):
+    referenced = "songs/audio/" + "a" * 64 + ".mp3"
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.location = directory.name
+        self.storage = ContentAddressedFileSystemStorage(location=self.location)
+
+        # bulk_create: no post_save, so no audio analysis / HLS packaging
+        artist = Artist.objects.create(name="Artist")
+        song, = Song.objects.bulk_create([
+            Song(title="Song", artist=artist, audio_file=self.referenced, duration=180),
+        ])
+        self.package = f"songs/hls/{song.pk}/abcdef012345/"
+        Song.objects.filter(pk=song.pk).update(hls_prefix=self.package)
+
+    def put(self, name, age=timedelta(days=2)):
+        path = os.path.join(self.location, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as fh:
+            fh.write(b"media")
+        modified = (timezone.now() - age).timestamp()
+        os.utime(path, (modified, modified))
+        return name
+
+    def collect(self, **kwargs):
+        return collect_garbage(
+            prefixes=("songs/", "recordings/"),
+            grace=timedelta(days=1),
+            workdir=self.location,
+            storage=self.storage,
+            **kwargs,
+        )
+
+    def test_referenced_names_are_kept(self):
+        names = [
+            self.put(self.referenced),
+            self.put(self.package + "master.m3u8"),
+            self.put(self.package + "v0/segment_00001.ts"),
+        ]
+
+        report = self.collect(dry_run=False)
+
+        self.assertEqual((report.scanned, report.orphaned, report.deleted), (3, 0, 0))
+        self.assertTrue(all(self.storage.exists(name) for name in names))
+
+    def test_recent_orphan_is_only_too_recent(self):
+        name = self.put("songs/audio/stray.mp3", age=timedelta(hours=1))
+
+        report = self.collect(dry_run=False)
+
+        self.assertEqual(report.too_recent, 1)
+        self.assertEqual((report.orphaned, report.deleted), (0, 0))
+        self.assertTrue(self.storage.exists(name))
+
+    def test_old_orphans_are_deleted_only_without_dry_run(self):
+        names = [
+            self.put("songs/audio/stray.mp3"),
+            self.put("songs/hls/999/abcdef012345/master.m3u8"),
+        ]
+
+        report = self.collect(dry_run=True)
+        self.assertEqual((report.orphaned, report.deleted), (2, 0))
+        self.assertEqual(sorted(report.samples), sorted(names))
+        self.assertTrue(all(self.storage.exists(name) for name in names))
+
+        report = self.collect(dry_run=False)
+        self.assertEqual((report.orphaned, report.deleted, report.failed), (2, 2, 0))
+        self.assertFalse(any(self.storage.exists(name) for name in names))
+
+    def test_counted_blobs_are_skipped(self):
+        acquired = self.put("recordings/" + "b" * 64 + ".webm")
+        pinned = self.put("recordings/" + "c" * 64 + ".webm")
+        MediaBlob.objects.create(key=acquired, refcount=1)
+        MediaBlob.objects.create(key=pinned, pins=1, pinned_at=timezone.now())
+
+        report = self.collect(dry_run=False)
+
+        # Orphaned as far as the rows go, but delete_unreferenced keeps them
+        self.assertEqual((report.orphaned, report.deleted, report.failed), (2, 0, 0))
+        self.assertTrue(self.storage.exists(acquired))
+        self.assertTrue(self.storage.exists(pinned))
+        self.assertEqual(MediaBlob.objects.count(), 2)
+
+
+# ─────────────────────────────────────────────
+# CACHE-ASIDE (BACKEND ERRORS)
+# ─────────────────────────────────────────────
+
+class FlakyCache:
+    """
+    Reads miss; add() and the wait loop's reads fail as configured.
+    """
+
+    def __init__(self, add=ConnectionError, get_after_miss=None):
+        self.add_result = add
+        self.get_after_miss = get_after_miss
+        self.gets = 0
+
+    def _answer(self, result):
+        if isinstance(result, type) and issubclass(result, Exception):
+            raise result("cache down")
+        return result
+
+    def get(self, key, default=None):
+        self.gets += 1
+        return None if self.gets == 1 else self._answer(self.get_after_miss)
+
+    def add(self, key, value, timeout=None):
+        return self._answer(self.add_result)
+
+    async def aget(self, key, default=None):
+        return self.get(key, default)
+
+    async def aadd(self, key, value, timeout=None):
+        return self.add(key, value, timeout)
+
+
+class CacheNamespaceErrorTests(SimpleTestCase):
+
+    def namespace(self, flaky):
+        ns = CacheNamespace("flaky", version=lambda: 1)
+        patcher = mock.patch.object(CacheNamespace, "cache", new_callable=mock.PropertyMock, return_value=flaky)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return ns
+
+    def test_lock_error_computes(self):
+        ns = self.namespace(FlakyCache(add=ConnectionError))
+        with self.assertLogs("app.utils.cache", "ERROR"):
+            self.assertEqual(ns.get_or_set("k", lambda: "value"), "value")
+            self.assertEqual(async_to_sync(ns.aget_or_set)("k", self.acompute), "value")
+        self.assertEqual(ns.errors, 2)
+
+    def test_wait_loop_error_computes(self):
+        ns = self.namespace(FlakyCache(add=False, get_after_miss=ConnectionError))
+        with self.assertLogs("app.utils.cache", "ERROR"):
+            self.assertEqual(ns.get_or_set("k", lambda: "value"), "value")
+            ns.cache.gets = 0
+            self.assertEqual(async_to_sync(ns.aget_or_set)("k", self.acompute), "value")
+        self.assertEqual(ns.errors, 2)
+
+    async def acompute(self):
+        return "value"
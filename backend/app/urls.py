@@ -1,29 +1,50 @@
+from django.conf import settings
 from django.urls import path
+from . import views, views_async
 from .views import (
     SongUploadView,
-    SongListView,
-    SongDetailView,
     RecordingUploadView,
     MyRecordingsView,
-    SecureMediaView,
-    GenresListView,
+    RecordingMixView,
+    SongHlsView,
     SongsByGenreView,
+    SongLeaderboardView,
+    PopularSongsView,
+    MyStatsView,
+    DatabaseStatsView,
+    CacheStatsView,
+    MetricsView,
 )
 
+# Hot read paths: DRF views under WSGI, async twins under ASGI
+hot = views_async if settings.ASYNC_VIEWS else views
+
 urlpatterns = [
     # ───────────── Songs ─────────────
     path("songs/upload/", SongUploadView.as_view(), name="song-upload"),
-    path("songs/", SongListView.as_view(), name="song-list"),
-    path("songs/<int:pk>/", SongDetailView.as_view(), name="song-detail"),
+    path("songs/", hot.SongListView.as_view(), name="song-list"),
+    path("songs/<int:pk>/", hot.SongDetailView.as_view(), name="song-detail"),
+    path("songs/popular/", PopularSongsView.as_view(), name="song-popular"),
+    path("songs/<int:pk>/leaderboard/", SongLeaderboardView.as_view(), name="song-leaderboard"),
 
     # ─────────── Genres ───────────
-    path("genres/", GenresListView.as_view(), name="genre-list"),
+    path("genres/", hot.GenresListView.as_view(), name="genre-list"),
     path("genres/<str:genre>/songs/", SongsByGenreView.as_view(), name="songs-by-genre"),
 
     # ─────────── Recordings ───────────
     path("recordings/upload/", RecordingUploadView.as_view(), name="recording-upload"),
     path("recordings/", MyRecordingsView.as_view(), name="my-recordings"),
+    path("recordings/mix/", RecordingMixView.as_view(), name="recording-mix"),
+
+    # ─────────── Stats ───────────
+    path("stats/me/", MyStatsView.as_view(), name="my-stats"),
 
     # ─────────── Secure Media ─────────
-    path("media/secure/", SecureMediaView.as_view(), name="secure-media"),
+    path("media/secure/", hot.SecureMediaView.as_view(), name="secure-media"),
+    path("media/hls/<int:pk>/<path:name>", SongHlsView.as_view(), name="song-hls"),
+
+    # ─────────── Operations ───────────
+    path("ops/db/", DatabaseStatsView.as_view(), name="ops-db"),
+    path("ops/cache/", CacheStatsView.as_view(), name="ops-cache"),
+    path("ops/metrics/", MetricsView.as_view(), name="ops-metrics"),
 ]
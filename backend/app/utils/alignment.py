@@ -0,0 +1,132 @@
+import logging
+
+import numpy as np
+
+from .audio import ffmpeg_input, iter_pcm_blocks
+
+logger = logging.getLogger(__name__)
+
+
+ENVELOPE_SAMPLE_RATE = 8000
+HOP = 80  # 10 ms → 100 envelope frames per second
+ENVELOPE_RATE = ENVELOPE_SAMPLE_RATE // HOP
+
+# Second-best peak must be this far from the best one to count as a rival
+RIVAL_EXCLUSION = ENVELOPE_RATE // 2
+
+
+def onset_envelope(source):
+    """
+    Onset strength of `source` at ENVELOPE_RATE frames per second: the
+    half-wave rectified rise in log RMS energy between 10 ms frames.
+
+    Decoded in blocks at a low sample rate, so a 5 minute track costs
+    ~30k floats however long the source is.
+    """
+    carry = np.zeros(0, dtype=np.float32)
+    energies = []
+
+    for block in iter_pcm_blocks(source, sample_rate=ENVELOPE_SAMPLE_RATE, channels=1):
+        samples = np.concatenate([carry, block[:, 0]])
+        usable = len(samples) - len(samples) % HOP
+        frames = samples[:usable].reshape(-1, HOP)
+        energies.append(np.sqrt(np.mean(frames * frames, axis=1)))
+        carry = samples[usable:]
+
+    if not energies:
+        return np.zeros(0, dtype=np.float32)
+
+    log_energy = np.log1p(1000 * np.concatenate(energies))
+    onset = np.maximum(np.diff(log_energy, prepend=log_energy[:1]), 0)
+    return onset.astype(np.float32)
+
+
+def estimate_offset(song_envelope, recording_envelope):
+    """
+    Where in the song (seconds) the recording starts, plus a 0–1 confidence.
+
+    FFT cross-correlation of the z-scored envelopes over non-negative lags
+    that keep at least half the recording overlapping the song. Confidence
+    is how much the best peak beats the best rival peak elsewhere.
+    """
+    s = _zscore(song_envelope)
+    r = _zscore(recording_envelope)
+    if not len(s) or not len(r):
+        return 0.0, 0.0
+
+    n = 1 << (len(s) + len(r) - 1).bit_length()
+    corr = np.fft.irfft(np.fft.rfft(s, n) * np.conj(np.fft.rfft(r, n)), n)
+
+    # corr[k] = sum_i s[i + k] * r[i] for k >= 0
+    max_lag = max(len(s) - len(r) // 2, 1)
+    corr = corr[:max_lag]
+
+    best = int(np.argmax(corr))
+    peak = corr[best]
+    if peak <= 0:
+        return 0.0, 0.0
+
+    rivals = corr.copy()
+    rivals[max(best - RIVAL_EXCLUSION, 0):best + RIVAL_EXCLUSION + 1] = -np.inf
+    rival = max(rivals.max(), 0.0) if len(corr) > 2 * RIVAL_EXCLUSION + 1 else 0.0
+
+    offset = round(best / ENVELOPE_RATE, 2)
+    confidence = round(float(np.clip(1 - rival / peak, 0.0, 1.0)), 3)
+    return offset, confidence
+
+
+def _zscore(x):
+    if not len(x):
+        return x
+    std = x.std()
+    return (x - x.mean()) / std if std > 0 else x - x.mean()
+
+
+# ─────────────────────────────────────────────
+# CACHED SONG ENVELOPES + RECORDING ANALYSIS
+# ─────────────────────────────────────────────
+
+def song_onset_envelope(song):
+    """
+    Song envelope from SongAnalysis, computed once per audio_file.
+    """
+    from ..models import SongAnalysis
+
+    analysis = SongAnalysis.for_song(song)
+    if analysis.onset_envelope:
+        return np.frombuffer(analysis.onset_envelope, dtype=np.float32)
+
+    envelope = onset_envelope(ffmpeg_input(song.audio_file))
+    analysis.onset_envelope = envelope.tobytes()
+    analysis.save(update_fields=["onset_envelope", "updated_at"])
+    return envelope
+
+
+def store_alignment(recording):
+    song_envelope = song_onset_envelope(recording.song)
+    recording_envelope = onset_envelope(ffmpeg_input(recording.audio_file))
+
+    offset, confidence = estimate_offset(song_envelope, recording_envelope)
+
+    type(recording).objects.filter(
+        pk=recording.pk,
+        audio_file=recording.audio_file.name,
+    ).update(
+        alignment_offset=offset,
+        alignment_confidence=confidence,
+    )
+    return offset, confidence
+
+
+def store_alignment_safely(recording):
+    try:
+        store_alignment(recording)
+    except Exception:
+        logger.exception("Alignment failed for Recording %s", recording.pk)
+
+
+def cache_song_envelope_safely(song):
+    try:
+        song_onset_envelope(song)
+    except Exception:
+        logger.exception("Onset envelope failed for Song %s", song.pk)
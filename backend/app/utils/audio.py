@@ -0,0 +1,176 @@
+import os
+import subprocess
+import tempfile
+
+import numpy as np
+from django.conf import settings
+
+from .r2 import generate_signed_url
+
+
+SAMPLE_RATE = 44100
+CHANNELS = 2
+BLOCK_FRAMES = 65536  # ~1.5s of stereo audio per block
+
+
+def ffmpeg_binary():
+    return getattr(settings, "FFMPEG_BINARY", "ffmpeg")
+
+
+def ffmpeg_input(file_field, expires=3600):
+    """
+    Path or URL ffmpeg can read a stored file from.
+
+    Local storages expose a filesystem path; R2 objects are read through a
+    signed URL so ffmpeg streams them with HTTP range requests instead of
+    us downloading the whole object first.
+    """
+    try:
+        return file_field.path
+    except NotImplementedError:
+        return generate_signed_url(key=file_field.name, expires=expires)
+
+
+# ─────────────────────────────────────────────
+# DECODE
+# ─────────────────────────────────────────────
+
+def iter_pcm_blocks(
+    source,
+    sample_rate=SAMPLE_RATE,
+    channels=CHANNELS,
+    block_frames=BLOCK_FRAMES,
+    start=0.0,
+):
+    """
+    Decode `source` with ffmpeg and yield float32 arrays of shape
+    (frames, channels), at most `block_frames` frames each.
+
+    Only one block is held in memory at a time, regardless of track length.
+    Raises RuntimeError once the stream ends if ffmpeg exited with an
+    error.
+    """
+    cmd = [ffmpeg_binary(), "-nostdin", "-v", "error"]
+    if start > 0:
+        cmd += ["-ss", f"{start:.3f}"]
+    cmd += [
+        "-i", source,
+        "-f", "f32le",
+        "-ac", str(channels),
+        "-ar", str(sample_rate),
+        "pipe:1",
+    ]
+
+    frame_bytes = 4 * channels
+    # A file, not a pipe: nobody reads stderr while stdout is streaming
+    errors = tempfile.TemporaryFile()
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=errors)
+
+    try:
+        while True:
+            data = proc.stdout.read(block_frames * frame_bytes)
+            usable = len(data) - len(data) % frame_bytes
+            if usable <= 0:
+                break
+            yield np.frombuffer(data[:usable], dtype=np.float32).reshape(-1, channels)
+
+        # A failed or truncated decode must not pass for a short track
+        if proc.wait() != 0:
+            errors.seek(0)
+            raise RuntimeError(f"ffmpeg decode failed: {errors.read().decode(errors='replace')}")
+    finally:
+        proc.stdout.close()
+        proc.kill()
+        proc.wait()
+        errors.close()
+
+
+def iter_fixed_blocks(blocks, block_frames, channels=CHANNELS):
+    """
+    Re-chunk a decoded stream into exactly `block_frames` frames per block,
+    padding with silence forever once the source is exhausted.
+    """
+    pending = np.zeros((0, channels), dtype=np.float32)
+    blocks = iter(blocks)
+
+    while True:
+        while len(pending) < block_frames:
+            block = next(blocks, None)
+            if block is None:
+                break
+            pending = np.concatenate([pending, block])
+
+        if len(pending) < block_frames:
+            pad = np.zeros((block_frames - len(pending), channels), dtype=np.float32)
+            pending = np.concatenate([pending, pad])
+
+        yield pending[:block_frames]
+        pending = pending[block_frames:]
+
+
+# ─────────────────────────────────────────────
+# ENCODE
+# ─────────────────────────────────────────────
+
+class PcmEncoder:
+    """
+    Pipe float32 PCM blocks into ffmpeg and encode them to a temp file.
+
+        with PcmEncoder(suffix=".m4a") as enc:
+            for block in blocks:
+                enc.write(block)
+        path = enc.path  # caller removes it
+    """
+
+    CODECS = {
+        ".m4a": ["-c:a", "aac", "-b:a", "192k", "-movflags", "+faststart"],
+        ".mp3": ["-c:a", "libmp3lame", "-b:a", "192k"],
+        ".wav": ["-c:a", "pcm_s16le"],
+    }
+
+    def __init__(self, suffix=".m4a", sample_rate=SAMPLE_RATE, channels=CHANNELS):
+        self.suffix = suffix
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.frames = 0
+        self.path = None
+        self.proc = None
+
+    def __enter__(self):
+        fd, self.path = tempfile.mkstemp(suffix=self.suffix)
+        os.close(fd)
+
+        self.proc = subprocess.Popen(
+            [
+                ffmpeg_binary(), "-nostdin", "-v", "error", "-y",
+                "-f", "f32le",
+                "-ac", str(self.channels),
+                "-ar", str(self.sample_rate),
+                "-i", "pipe:0",
+                *self.CODECS[self.suffix],
+                self.path,
+            ],
+            stdin=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+        )
+        return self
+
+    def write(self, block):
+        self.proc.stdin.write(np.ascontiguousarray(block, dtype=np.float32).tobytes())
+        self.frames += len(block)
+
+    @property
+    def duration(self):
+        return round(self.frames / self.sample_rate, 2)
+
+    def __exit__(self, exc_type, exc, tb):
+        self.proc.stdin.close()
+        stderr = self.proc.stderr.read()
+        self.proc.stderr.close()
+        code = self.proc.wait()
+
+        if exc_type is not None or code != 0:
+            os.remove(self.path)
+            if exc_type is None:
+                raise RuntimeError(f"ffmpeg encode failed: {stderr.decode(errors='replace')}")
+        return False
@@ -0,0 +1,132 @@
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from ..storage import is_content_addressed
+
+
+# A pin outlives the save that set it by far; older pins belong to saves
+# that failed before their row acquired the blob
+PIN_TTL = timedelta(minutes=10)
+
+
+def acquire(names):
+    """
+    Count one more reference to each content-addressed name.
+    """
+    from ..models import MediaBlob
+
+    # The upload that stored the file pinned it; the reference takes over
+    counted = {"refcount": F("refcount") + 1, "pins": Greatest(F("pins") - 1, 0)}
+
+    for name in filter(is_content_addressed, names):
+        if MediaBlob.objects.filter(key=name).update(**counted):
+            continue
+        try:
+            with transaction.atomic():
+                MediaBlob.objects.create(key=name, refcount=1)
+        except IntegrityError:
+            # Created concurrently
+            MediaBlob.objects.filter(key=name).update(**counted)
+
+
+def release(names):
+    """
+    Drop one reference to each content-addressed name. The blob itself is
+    removed later by claim_unreferenced(), after commit.
+    """
+    from ..models import MediaBlob
+
+    for name in filter(is_content_addressed, names):
+        MediaBlob.objects.filter(key=name, refcount__gt=0).update(
+            refcount=F("refcount") - 1
+        )
+
+
+def pin(name):
+    """
+    Protect content-addressed `name` from claim_unreferenced() until the
+    row being saved acquires it (or PIN_TTL passes, if that save fails).
+
+    Called by an upload before it checks whether the object already
+    exists (and skips the PUT if so), inside the same transaction: the
+    MediaBlob row lock orders the check against a concurrent claim.
+    """
+    from ..models import MediaBlob
+
+    now = timezone.now()
+    pinned = {"pins": F("pins") + 1, "pinned_at": now}
+    if MediaBlob.objects.filter(key=name).update(**pinned):
+        return
+    try:
+        with transaction.atomic():
+            MediaBlob.objects.create(key=name, pins=1, pinned_at=now)
+    except IntegrityError:
+        # Created concurrently
+        MediaBlob.objects.filter(key=name).update(**pinned)
+
+
+def unpin(names):
+    """
+    Drop the pin of uploads that ended up not referencing their blob (the
+    row already pointed at the same bytes).
+    """
+    from ..models import MediaBlob
+
+    for name in filter(is_content_addressed, names):
+        MediaBlob.objects.filter(key=name, pins__gt=0).update(pins=F("pins") - 1)
+
+
+def claim_unreferenced(names):
+    """
+    The subset of `names` that may be deleted from storage.
+
+    Plain names always may. A content-addressed name may only if its
+    refcount is zero (or it was never counted) and no upload pinned it
+    within PIN_TTL that hasn't acquired it yet; its MediaBlob row is
+    deleted in the same step.
+
+    Must run in a transaction that also covers the deletion from storage
+    (deletion.delete_unreferenced): the row locks taken here are what keep
+    an upload from finding the object present just before it is deleted.
+    """
+    from ..models import MediaBlob
+
+    plain = [name for name in names if not is_content_addressed(name)]
+    hashed = [name for name in names if is_content_addressed(name)]
+    if not hashed:
+        return plain
+
+    # Never-counted keys get a row to lock, so a concurrent pin() waits
+    # for this transaction instead of slipping past it
+    MediaBlob.objects.bulk_create(
+        [MediaBlob(key=name) for name in dict.fromkeys(hashed)],
+        ignore_conflicts=True,
+    )
+    rows = {
+        key: (refcount, pins, pinned_at)
+        for key, refcount, pins, pinned_at in (
+            MediaBlob.objects
+            .select_for_update()
+            .filter(key__in=hashed)
+            .values_list("key", "refcount", "pins", "pinned_at")
+        )
+    }
+
+    stale = timezone.now() - PIN_TTL
+
+    def unreferenced(name):
+        # A row that is gone by now was claimed (and its object deleted) by
+        # a concurrent call; a later upload may already be writing it again
+        if name not in rows:
+            return False
+        refcount, pins, pinned_at = rows[name]
+        return refcount == 0 and (pins == 0 or pinned_at < stale)
+
+    free = [name for name in dict.fromkeys(hashed) if unreferenced(name)]
+    MediaBlob.objects.filter(key__in=free).delete()
+
+    return plain + free
@@ -0,0 +1,320 @@
+import asyncio
+import hashlib
+import logging
+import math
+import random
+import threading
+import time
+
+from django.core.cache import caches
+
+logger = logging.getLogger(__name__)
+
+
+# Probabilistic early refresh (XFetch): larger recomputes earlier
+EARLY_REFRESH_BETA = 1.0
+
+# Single-flight: how long a recompute may hold the lock, and how long
+# other callers wait for it before computing themselves.
+LOCK_TIMEOUT = 10
+LOCK_POLL = 0.05
+LOCK_WAIT = 1.0
+
+
+def digest(key):
+    # Fixed-length, backend-safe keys whatever the caller passes in
+    return hashlib.blake2b(str(key).encode(), digest_size=16).hexdigest()
+
+
+# ─────────────────────────────────────────────
+# NAMESPACES
+# ─────────────────────────────────────────────
+
+class CacheNamespace:
+    """
+    Cache-aside over the shared Django cache.
+
+    Keys are "<name>:v<version>:<digest>". The version is either supplied
+    (e.g. the catalog version, so a catalog write invalidates every entry)
+    or a generation counter that invalidate() bumps.
+
+    Entries carry their expiry and how long they took to compute, so a
+    hot key is refreshed shortly before it expires by one caller (XFetch)
+    instead of by everyone at once after. A cold key is computed under a
+    cache.add() lock; the others wait briefly for the result. Cache errors
+    fall back to computing, so an unreachable Redis degrades to no cache.
+    """
+
+    COUNTERS = ("hits", "misses", "early_refreshes", "stale_served", "lock_waits", "errors")
+
+    def __init__(self, name, ttl=300, version=None, aversion=None, alias="default"):
+        self.name = name
+        self.ttl = ttl
+        self._version = version
+        self._aversion = aversion
+        self.alias = alias
+        self._lock = threading.Lock()
+        self.reset_metrics()
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    # ───── versioning ─────
+
+    @property
+    def generation_key(self):
+        return f"{self.name}:generation"
+
+    def version(self):
+        if self._version is not None:
+            return self._version()
+        self.cache.add(self.generation_key, 1, None)
+        return self.cache.get(self.generation_key, 1)
+
+    async def aversion(self):
+        if self._aversion is not None:
+            return await self._aversion()
+        if self._version is not None:
+            return self._version()
+        await self.cache.aadd(self.generation_key, 1, None)
+        return await self.cache.aget(self.generation_key, 1)
+
+    def invalidate(self):
+        """
+        Orphan every entry in the namespace (they age out on their TTL).
+        """
+        if self._version is not None:
+            raise TypeError(f"{self.name} is versioned by its source, not invalidate()")
+        try:
+            self.cache.incr(self.generation_key)
+        except ValueError:
+            self.cache.set(self.generation_key, 2, None)
+
+    def make_key(self, key, version):
+        return f"{self.name}:v{version}:{digest(key)}"
+
+    # ───── cache-aside ─────
+
+    def _fresh(self, entry):
+        _, delta, expires_at = entry
+        early = -delta * EARLY_REFRESH_BETA * math.log(random.random() or 1e-12)
+        return time.time() + early < expires_at
+
+    def _entry(self, value, started, ttl):
+        delta = time.time() - started
+        return (value, delta, time.time() + ttl)
+
+    def get_or_set(self, key, compute, ttl=None):
+        ttl = ttl or self.ttl
+        try:
+            full_key = self.make_key(key, self.version())
+            entry = self.cache.get(full_key)
+        except Exception:
+            logger.exception("Cache read failed in %s", self.name)
+            self._count("errors")
+            return compute()
+
+        if entry is not None:
+            if self._fresh(entry):
+                self._count("hits")
+                return entry[0]
+            # Close to expiry: one caller refreshes, the rest keep the value
+            locked = self._lock_for(full_key)
+            if locked is None:
+                return compute()
+            if not locked:
+                self._count("stale_served")
+                return entry[0]
+            self._count("early_refreshes")
+            return self._compute_and_store(full_key, compute, ttl)
+
+        self._count("misses")
+        locked = self._lock_for(full_key)
+        if locked is None:
+            return compute()
+        if locked:
+            return self._compute_and_store(full_key, compute, ttl)
+
+        # Someone else is computing it
+        self._count("lock_waits")
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL)
+            try:
+                entry = self.cache.get(full_key)
+            except Exception:
+                logger.exception("Cache read failed in %s", self.name)
+                self._count("errors")
+                break
+            if entry is not None:
+                return entry[0]
+        return compute()
+
+    def _lock_for(self, full_key):
+        """
+        Whether this caller got the recompute lock; None if the cache failed.
+        """
+        try:
+            return self.cache.add(f"{full_key}:lock", 1, LOCK_TIMEOUT)
+        except Exception:
+            logger.exception("Cache lock failed in %s", self.name)
+            self._count("errors")
+            return None
+
+    def _compute_and_store(self, full_key, compute, ttl):
+        started = time.time()
+        try:
+            value = compute()
+        except Exception:
+            self._release(full_key)
+            raise
+
+        try:
+            self.cache.set(full_key, self._entry(value, started, ttl), ttl)
+        except Exception:
+            logger.exception("Cache write failed in %s", self.name)
+            self._count("errors")
+        # Released after the write, so waiters find the value
+        self._release(full_key)
+        return value
+
+    def _release(self, full_key):
+        try:
+            self.cache.delete(f"{full_key}:lock")
+        except Exception:
+            self._count("errors")
+
+    async def aget_or_set(self, key, compute, ttl=None):
+        """
+        get_or_set() for async views; `compute` is a coroutine function.
+        """
+        ttl = ttl or self.ttl
+        try:
+            full_key = self.make_key(key, await self.aversion())
+            entry = await self.cache.aget(full_key)
+        except Exception:
+            logger.exception("Cache read failed in %s", self.name)
+            self._count("errors")
+            return await compute()
+
+        if entry is not None:
+            if self._fresh(entry):
+                self._count("hits")
+                return entry[0]
+            locked = await self._alock_for(full_key)
+            if locked is None:
+                return await compute()
+            if not locked:
+                self._count("stale_served")
+                return entry[0]
+            self._count("early_refreshes")
+            return await self._acompute_and_store(full_key, compute, ttl)
+
+        self._count("misses")
+        locked = await self._alock_for(full_key)
+        if locked is None:
+            return await compute()
+        if locked:
+            return await self._acompute_and_store(full_key, compute, ttl)
+
+        self._count("lock_waits")
+        deadline = time.monotonic() + LOCK_WAIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(LOCK_POLL)
+            try:
+                entry = await self.cache.aget(full_key)
+            except Exception:
+                logger.exception("Cache read failed in %s", self.name)
+                self._count("errors")
+                break
+            if entry is not None:
+                return entry[0]
+        return await compute()
+
+    async def _alock_for(self, full_key):
+        try:
+            return await self.cache.aadd(f"{full_key}:lock", 1, LOCK_TIMEOUT)
+        except Exception:
+            logger.exception("Cache lock failed in %s", self.name)
+            self._count("errors")
+            return None
+
+    async def _acompute_and_store(self, full_key, compute, ttl):
+        started = time.time()
+        try:
+            value = await compute()
+        except Exception:
+            await self._arelease(full_key)
+            raise
+
+        try:
+            await self.cache.aset(full_key, self._entry(value, started, ttl), ttl)
+        except Exception:
+            logger.exception("Cache write failed in %s", self.name)
+            self._count("errors")
+        # Released after the write, so waiters find the value
+        await self._arelease(full_key)
+        return value
+
+    async def _arelease(self, full_key):
+        try:
+            await self.cache.adelete(f"{full_key}:lock")
+        except Exception:
+            self._count("errors")
+
+    # ───── metrics ─────
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def reset_metrics(self):
+        for counter in self.COUNTERS:
+            setattr(self, counter, 0)
+
+    def metrics(self):
+        lookups = self.hits + self.stale_served + self.early_refreshes + self.misses
+        served_from_cache = self.hits + self.stale_served
+        return {
+            **{counter: getattr(self, counter) for counter in self.COUNTERS},
+            "hit_rate": round(served_from_cache / lookups, 4) if lookups else None,
+        }
+
+
+# ─────────────────────────────────────────────
+# REGISTRY
+# ─────────────────────────────────────────────
+
+namespaces = {}
+
+
+def namespace(name, **kwargs):
+    """
+    The CacheNamespace called `name`, created on first use.
+    """
+    if name not in namespaces:
+        namespaces[name] = CacheNamespace(name, **kwargs)
+    return namespaces[name]
+
+
+def cache_metrics():
+    """
+    Per-namespace counters for this process, plus the configured backend.
+    """
+    return {
+        "backend": type(caches["default"]).__name__,
+        "namespaces": {name: ns.metrics() for name, ns in sorted(namespaces.items())},
+    }
+
+
+def prometheus_lines():
+    """
+    Namespace counters in Prometheus text format (for /api/ops/metrics/).
+    """
+    name = "cache_lookups_total"
+    lines = [f"# HELP {name} Cache-aside lookups by namespace and outcome.", f"# TYPE {name} counter"]
+    for ns_name, ns in sorted(namespaces.items()):
+        for counter in CacheNamespace.COUNTERS:
+            lines.append(f'{name}{{namespace="{ns_name}",result="{counter}"}} {getattr(ns, counter)}')
+    return lines
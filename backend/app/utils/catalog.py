@@ -0,0 +1,152 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.http import HttpResponseNotModified
+from django.utils.cache import patch_cache_control
+from django.utils.http import parse_etags
+
+from .cache import namespace
+
+logger = logging.getLogger(__name__)
+
+
+VERSION_CACHE_KEY = "catalog:version"
+VERSION_PK = 1
+
+# Responses embedding presigned URLs (10 minute expiry) are re-tagged
+# every 5 minutes, so a revalidated body never holds expired URLs.
+SIGNED_URL_WINDOW = 300
+
+
+# ─────────────────────────────────────────────
+# VERSION COUNTER
+# ─────────────────────────────────────────────
+# The row is the source of truth; the cache fronts it. With a shared
+# cache a bump is visible everywhere at once, with a per-process cache
+# within CATALOG_VERSION_TTL seconds.
+
+def _version_ttl():
+    return getattr(settings, "CATALOG_VERSION_TTL", 5)
+
+
+def _stored_version():
+    from ..models import CatalogVersion
+
+    return (
+        CatalogVersion.objects
+        .filter(pk=VERSION_PK)
+        .values_list("version", flat=True)
+        .first()
+    ) or 0
+
+
+async def _astored_version():
+    from ..models import CatalogVersion
+
+    row = await CatalogVersion.objects.filter(pk=VERSION_PK).afirst()
+    return row.version if row else 0
+
+
+def catalog_version():
+    try:
+        version = cache.get(VERSION_CACHE_KEY)
+    except Exception:
+        # Cache unreachable: the row is still authoritative
+        logger.exception("Catalog version cache read failed")
+        return _stored_version()
+
+    if version is None:
+        version = _stored_version()
+        cache.set(VERSION_CACHE_KEY, version, _version_ttl())
+    return version
+
+
+async def acatalog_version():
+    try:
+        version = await cache.aget(VERSION_CACHE_KEY)
+    except Exception:
+        logger.exception("Catalog version cache read failed")
+        return await _astored_version()
+
+    if version is None:
+        version = await _astored_version()
+        await cache.aset(VERSION_CACHE_KEY, version, _version_ttl())
+    return version
+
+
+def _bump():
+    from ..models import CatalogVersion
+
+    if not CatalogVersion.objects.filter(pk=VERSION_PK).update(version=F("version") + 1):
+        CatalogVersion.objects.get_or_create(pk=VERSION_PK, defaults={"version": 1})
+    try:
+        cache.set(VERSION_CACHE_KEY, _stored_version(), _version_ttl())
+    except Exception:
+        logger.exception("Catalog version cache write failed")
+
+
+def bump_catalog_version():
+    """
+    Invalidate every catalog ETag once the current transaction commits.
+    Bumps once per transaction however many rows it writes.
+    """
+    connection = transaction.get_connection()
+    if any(func is _bump for _, func, _ in connection.run_on_commit):
+        return
+    transaction.on_commit(_bump)
+
+
+# Serialized catalog data; keyed by the version, so a bump invalidates it
+catalog_cache = namespace(
+    "catalog",
+    ttl=SIGNED_URL_WINDOW,
+    version=catalog_version,
+    aversion=acatalog_version,
+)
+
+
+def signing_window():
+    """
+    Index of the current SIGNED_URL_WINDOW: part of the ETag and cache key
+    of anything embedding presigned URLs.
+    """
+    return int(time.time()) // SIGNED_URL_WINDOW
+
+
+# ─────────────────────────────────────────────
+# VALIDATORS / HEADERS
+# ─────────────────────────────────────────────
+
+def etag_for(version, signed_urls=False):
+    if signed_urls:
+        return f'"catalog-{version}-{signing_window()}"'
+    return f'"catalog-{version}"'
+
+
+def is_not_modified(request, etag):
+    """
+    Weak If-None-Match comparison: compressed responses carry W/ tags.
+    """
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or etag in {tag.removeprefix("W/") for tag in tags}
+
+
+def patch_catalog_headers(response, etag):
+    response["ETag"] = etag
+    patch_cache_control(
+        response,
+        private=True,
+        max_age=getattr(settings, "CATALOG_MAX_AGE", 60),
+    )
+    return response
+
+
+def not_modified_response(etag):
+    return patch_catalog_headers(HttpResponseNotModified(), etag)
@@ -0,0 +1,28 @@
+import time
+
+from django.db import connections
+
+
+def connection_stats(alias="default"):
+    """
+    Connection lifecycle settings and, when pooling is on, the psycopg
+    pool counters for this process, plus one SELECT 1 round trip.
+    """
+    connection = connections[alias]
+    pool = getattr(connection, "pool", None)
+
+    started = time.perf_counter()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+    roundtrip_ms = (time.perf_counter() - started) * 1000
+
+    stats = {
+        "vendor": connection.vendor,
+        "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+        "health_checks": connection.settings_dict["CONN_HEALTH_CHECKS"],
+        "pooled": pool is not None,
+        "select_1_ms": round(roundtrip_ms, 3),
+    }
+    if pool is not None:
+        stats["pool"] = pool.get_stats()
+    return stats
@@ -0,0 +1,221 @@
+import atexit
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+
+from .blobs import claim_unreferenced
+from .r2 import get_r2_client
+
+logger = logging.getLogger(__name__)
+
+
+# S3 DeleteObjects limit
+DELETE_BATCH = 1000
+
+
+def is_s3(storage):
+    try:
+        from storages.backends.s3 import S3Storage
+    except ImportError:
+        return False
+    return isinstance(storage, S3Storage)
+
+
+# ─────────────────────────────────────────────
+# SYNCHRONOUS BATCH DELETION
+# ─────────────────────────────────────────────
+
+def list_prefix(prefix, storage=None):
+    """
+    Every stored name under `prefix` (a "directory"). One paginated
+    ListObjectsV2 on S3 rather than a listdir per level.
+    """
+    storage = storage or default_storage
+    if is_s3(storage):
+        paginator = get_r2_client().get_paginator("list_objects_v2")
+        root = storage._normalize_name(prefix)
+        names = []
+        for page in paginator.paginate(Bucket=storage.bucket_name, Prefix=root):
+            # Back to storage-relative names
+            names.extend(prefix + obj["Key"][len(root):] for obj in page.get("Contents", ()))
+        return names
+
+    try:
+        directories, files = storage.listdir(prefix)
+    except FileNotFoundError:
+        return []
+    names = [prefix + filename for filename in files]
+    for directory in directories:
+        names.extend(list_prefix(f"{prefix}{directory}/", storage))
+    return names
+
+
+def delete_names(names, storage=None):
+    """
+    Delete stored files by name, up to DELETE_BATCH per DeleteObjects call
+    on S3. Deletes are idempotent, so missing files aren't checked for.
+    Returns the number of names that failed.
+    """
+    storage = storage or default_storage
+    names = [name for name in dict.fromkeys(names) if name]
+    if not is_s3(storage):
+        for name in names:
+            storage.delete(name)
+        return 0
+
+    client = get_r2_client()
+    failed = 0
+    for i in range(0, len(names), DELETE_BATCH):
+        batch = names[i:i + DELETE_BATCH]
+        response = client.delete_objects(
+            Bucket=storage.bucket_name,
+            Delete={
+                "Objects": [{"Key": storage._normalize_name(name)} for name in batch],
+                "Quiet": True,
+            },
+        )
+        for error in response.get("Errors", ()):
+            failed += 1
+            logger.error("Could not delete %s: %s", error.get("Key"), error.get("Message"))
+    return failed
+
+
+def delete_prefix(prefix, storage=None):
+    return delete_names(list_prefix(prefix, storage), storage)
+
+
+def delete_unreferenced(names, storage=None):
+    """
+    Delete `names`, except content-addressed blobs still referenced or
+    pinned (blobs.claim_unreferenced). The MediaBlob rows stay locked
+    until the storage delete has returned. Returns (claimed names, number
+    that failed).
+    """
+    with transaction.atomic():
+        claimed = claim_unreferenced(names)
+        return claimed, delete_names(claimed, storage)
+
+
+# ─────────────────────────────────────────────
+# DEFERRED DELETION (after commit, off the request)
+# ─────────────────────────────────────────────
+
+class Deleter:
+    """
+    Background worker for file cleanup.
+
+    Callers enqueue names/prefixes; the worker drains everything waiting
+    (so a bulk delete of many rows becomes a few DeleteObjects calls) and
+    deletes it off the request thread. Whatever is still queued at
+    interpreter exit is flushed synchronously.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, names=(), prefixes=()):
+        self._queue.put((tuple(names), tuple(prefixes)))
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name="media-deleter", daemon=True
+                )
+                self._thread.start()
+
+    def _drain(self, block):
+        """
+        (names, prefixes, items taken): the next item plus whatever else is
+        already waiting, up to about one DeleteObjects batch.
+        """
+        names, prefixes, taken = [], [], 0
+        try:
+            item = self._queue.get(block=block)
+        except queue.Empty:
+            return names, prefixes, taken
+
+        while True:
+            names.extend(item[0])
+            prefixes.extend(item[1])
+            taken += 1
+            if len(names) >= DELETE_BATCH:
+                break
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+        return names, prefixes, taken
+
+    def _process(self, names, prefixes, taken):
+        try:
+            names = list(names)
+            for prefix in prefixes:
+                try:
+                    names.extend(list_prefix(prefix))
+                except Exception:
+                    logger.exception("Could not list %s for deletion", prefix)
+            delete_unreferenced(names)
+        except Exception:
+            logger.exception("Deferred media deletion failed (%d files)", len(names))
+        finally:
+            for _ in range(taken):
+                self._queue.task_done()
+
+    def _run(self):
+        while True:
+            self._process(*self._drain(block=True))
+            close_old_connections()
+
+    def flush(self):
+        """
+        Delete everything queued on the calling thread (exit hook, tests,
+        management commands).
+        """
+        while True:
+            batch = self._drain(block=False)
+            if not batch[2]:
+                return
+            self._process(*batch)
+
+    def join(self):
+        """
+        Block until everything submitted so far has been processed.
+        """
+        self._queue.join()
+
+
+deleter = Deleter()
+atexit.register(deleter.flush)
+
+
+def delete_on_commit(names=(), prefixes=()):
+    """
+    Delete stored files (and whole prefixes) once the current transaction
+    commits; nothing is deleted if it rolls back. Content-addressed names
+    are only deleted if no row references them any more.
+
+    MEDIA_DELETE_ASYNC = False deletes inline in the on_commit hook.
+    """
+    names = [name for name in names if name]
+    prefixes = [prefix for prefix in prefixes if prefix]
+    if not names and not prefixes:
+        return
+
+    def run():
+        if getattr(settings, "MEDIA_DELETE_ASYNC", True):
+            deleter.submit(names, prefixes)
+        else:
+            deletable = list(names)
+            for prefix in prefixes:
+                deletable.extend(list_prefix(prefix))
+            delete_unreferenced(deletable)
+
+    transaction.on_commit(run)
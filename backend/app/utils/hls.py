@@ -0,0 +1,188 @@
+import logging
+import os
+import posixpath
+import re
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+from .deletion import delete_prefix
+from .r2 import generate_signed_url
+
+logger = logging.getLogger(__name__)
+
+
+BITRATES = ("64k", "128k", "192k")
+SEGMENT_SECONDS = 6
+MASTER_PLAYLIST = "master.m3u8"
+
+# Signed segment URLs must outlive a full listen; playlists are re-signed
+# per worker once half of that has passed.
+SEGMENT_URL_EXPIRES = 3600
+PLAYLIST_CACHE_ENTRIES = 256
+
+
+# ─────────────────────────────────────────────
+# PACKAGING
+# ─────────────────────────────────────────────
+
+def package_to_dir(source, out_dir, bitrates=BITRATES, segment_seconds=SEGMENT_SECONDS):
+    """
+    Encode `source` into one fMP4 HLS rendition per bitrate (v0, v1, …)
+    plus master.m3u8, in a single ffmpeg pass (decode once, encode N).
+    """
+    # Packaging only; playlist serving shouldn't load the audio stack
+    from .audio import ffmpeg_binary
+
+    cmd = [ffmpeg_binary(), "-nostdin", "-v", "error", "-y", "-i", source]
+    for _ in bitrates:
+        cmd += ["-map", "0:a"]
+    cmd += ["-c:a", "aac"]
+    for index, bitrate in enumerate(bitrates):
+        cmd += [f"-b:a:{index}", bitrate]
+    cmd += [
+        "-var_stream_map", " ".join(f"a:{i}" for i in range(len(bitrates))),
+        "-master_pl_name", MASTER_PLAYLIST,
+        "-f", "hls",
+        "-hls_time", str(segment_seconds),
+        "-hls_playlist_type", "vod",
+        "-hls_segment_type", "fmp4",
+        "-hls_fmp4_init_filename", "init.mp4",
+        "-hls_segment_filename", os.path.join(out_dir, "v%v", "seg_%05d.m4s"),
+        os.path.join(out_dir, "v%v", "index.m3u8"),
+    ]
+
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(f"HLS packaging failed: {result.stderr.decode(errors='replace')}")
+
+
+def upload_dir(local_dir, prefix):
+    for root, _, files in os.walk(local_dir):
+        for filename in files:
+            path = os.path.join(root, filename)
+            relative = os.path.relpath(path, local_dir).replace(os.sep, "/")
+            with open(path, "rb") as fh:
+                default_storage.save(prefix + relative, File(fh))
+
+
+def package_song(song):
+    """
+    Package song.audio_file under a fresh versioned prefix, point the song
+    at it, then drop the previous version. Players holding the old master
+    keep working until their signed URLs expire.
+
+    Returns None (and drops the new package) if the song's audio changed
+    while packaging ran; the newer upload has its own job queued.
+    """
+    from .audio import ffmpeg_input
+
+    prefix = f"songs/hls/{song.pk}/{uuid.uuid4().hex[:12]}/"
+    old_prefix = song.hls_prefix
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        package_to_dir(ffmpeg_input(song.audio_file), out_dir)
+        upload_dir(out_dir, prefix)
+
+    updated = type(song).objects.filter(pk=song.pk, audio_file=song.audio_file.name).update(
+        hls_prefix=prefix,
+        hls_status=type(song).HLS_READY,
+    )
+    if not updated:
+        delete_prefix(prefix)
+        return None
+
+    song.hls_prefix = prefix
+    song.hls_status = type(song).HLS_READY
+
+    if old_prefix and old_prefix != prefix:
+        delete_prefix(old_prefix)
+
+    return prefix
+
+
+def package_song_safely(song):
+    """
+    Media worker job: failures are logged and leave the song "failed" for
+    `manage.py package_hls` to retry.
+    """
+    try:
+        package_song(song)
+    except Exception:
+        logger.exception("HLS packaging failed for Song %s", song.pk)
+        type(song).objects.filter(pk=song.pk, audio_file=song.audio_file.name).update(
+            hls_status=type(song).HLS_FAILED,
+        )
+
+
+# ─────────────────────────────────────────────
+# PLAYLIST SIGNING
+# ─────────────────────────────────────────────
+
+_URI_ATTR = re.compile(r'URI="([^"]+)"')
+
+_playlists = OrderedDict()
+_playlists_lock = threading.Lock()
+
+
+def sign_playlist(text, playlist_key, expires=SEGMENT_URL_EXPIRES):
+    """
+    Rewrite a media playlist so every segment (and the init map) is a
+    presigned R2 URL. Presigning is a local HMAC, so one playlist request
+    signs the whole rendition without extra round trips.
+    """
+    base = posixpath.dirname(playlist_key)
+
+    def sign(uri):
+        return generate_signed_url(key=posixpath.join(base, uri), expires=expires)
+
+    lines = []
+    for line in text.splitlines():
+        if line.startswith("#EXT-X-MAP"):
+            line = _URI_ATTR.sub(lambda m: f'URI="{sign(m.group(1))}"', line)
+        elif line and not line.startswith("#"):
+            line = sign(line)
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+def read_text(key):
+    with default_storage.open(key, "rb") as fh:
+        return fh.read().decode("utf-8")
+
+
+def playlist_for(prefix, name):
+    """
+    Playlist `name` under `prefix`, ready to hand to a player.
+
+    The master only references sibling playlists (served by the same
+    endpoint), so it is returned as stored. Media playlists are signed.
+    Results are cached per worker for half the signature lifetime; the
+    prefix is versioned, so content never changes underneath the cache.
+    """
+    key = prefix + name
+    now = time.monotonic()
+
+    with _playlists_lock:
+        cached = _playlists.get(key)
+        if cached and cached[0] > now:
+            _playlists.move_to_end(key)
+            return cached[1]
+
+    text = read_text(key)
+    if name != MASTER_PLAYLIST:
+        text = sign_playlist(text, key)
+
+    with _playlists_lock:
+        _playlists[key] = (now + SEGMENT_URL_EXPIRES / 2, text)
+        _playlists.move_to_end(key)
+        while len(_playlists) > PLAYLIST_CACHE_ENTRIES:
+            _playlists.popitem(last=False)
+
+    return text
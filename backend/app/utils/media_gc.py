@@ -0,0 +1,216 @@
+import os
+import sqlite3
+import tempfile
+from dataclasses import dataclass, field
+from datetime import timedelta
+
+from django.core.files.storage import default_storage
+from django.utils import timezone
+
+from .deletion import DELETE_BATCH, delete_unreferenced, is_s3, list_prefix
+from .r2 import get_r2_client
+
+
+# Where model file fields and HLS packages live (upload_to roots)
+MANAGED_PREFIXES = ("song_covers/", "songs/", "recordings/")
+HLS_ROOT = "songs/hls/"
+
+FILE_FIELDS = {
+    "Song": ["cover_image", "audio_file", "lrc_file", "peaks_file", "melody_file"],
+    "Recording": ["audio_file", "peaks_file"],
+}
+
+LOOKUP_BATCH = 500
+
+
+# ─────────────────────────────────────────────
+# REFERENCED KEYS (ON-DISK SET)
+# ─────────────────────────────────────────────
+
+class KeySet:
+    """
+    A set of strings in a temporary SQLite file, so a catalogue of millions
+    of keys is checked without holding it in memory.
+    """
+
+    def __init__(self, directory=None):
+        fd, self.path = tempfile.mkstemp(suffix=".sqlite3", dir=directory)
+        os.close(fd)
+        self.db = sqlite3.connect(self.path)
+        self.db.execute("PRAGMA journal_mode = OFF")
+        self.db.execute("PRAGMA synchronous = OFF")
+        self.db.execute("CREATE TABLE keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+
+    def add_many(self, keys):
+        self.db.executemany(
+            "INSERT OR IGNORE INTO keys VALUES (?)",
+            ((key,) for key in keys),
+        )
+        self.db.commit()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+
+    def present(self, keys):
+        """
+        The subset of `keys` that is in the set.
+        """
+        found = set()
+        keys = list(keys)
+        for i in range(0, len(keys), LOOKUP_BATCH):
+            batch = keys[i:i + LOOKUP_BATCH]
+            placeholders = ",".join("?" * len(batch))
+            found.update(
+                row[0] for row in self.db.execute(
+                    f"SELECT key FROM keys WHERE key IN ({placeholders})", batch
+                )
+            )
+        return found
+
+    def close(self):
+        self.db.close()
+        os.remove(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def iter_referenced_names():
+    """
+    Every stored name a row points at, streamed from the database.
+    """
+    from .. import models
+
+    for model_name, fields in FILE_FIELDS.items():
+        model = getattr(models, model_name)
+        for field_name in fields:
+            yield from (
+                model.objects
+                .exclude(**{field_name: ""})
+                .values_list(field_name, flat=True)
+                .iterator(chunk_size=2000)
+            )
+
+    yield from (
+        models.Song.objects
+        .exclude(hls_prefix="")
+        .values_list("hls_prefix", flat=True)
+        .iterator(chunk_size=2000)
+    )
+
+
+def hls_package_of(name):
+    """
+    "songs/hls/<song>/<version>/" for a key inside an HLS package, else None.
+    """
+    if not name.startswith(HLS_ROOT):
+        return None
+    parts = name[len(HLS_ROOT):].split("/")
+    if len(parts) < 3:
+        return None
+    return f"{HLS_ROOT}{parts[0]}/{parts[1]}/"
+
+
+# ─────────────────────────────────────────────
+# STORED OBJECTS
+# ─────────────────────────────────────────────
+
+def iter_stored_pages(prefix, storage=None):
+    """
+    Pages of (name, size, last_modified) under `prefix`: ListObjectsV2
+    pages on S3, a single directory walk elsewhere.
+    """
+    storage = storage or default_storage
+    if is_s3(storage):
+        root = storage._normalize_name(prefix)
+        paginator = get_r2_client().get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=storage.bucket_name, Prefix=root):
+            yield [
+                (prefix + obj["Key"][len(root):], obj["Size"], obj["LastModified"])
+                for obj in page.get("Contents", ())
+            ]
+        return
+
+    page = []
+    for name in list_prefix(prefix, storage):
+        page.append((name, storage.size(name), storage.get_modified_time(name)))
+        if len(page) >= DELETE_BATCH:
+            yield page
+            page = []
+    if page:
+        yield page
+
+
+# ─────────────────────────────────────────────
+# COLLECTION
+# ─────────────────────────────────────────────
+
+@dataclass
+class GcReport:
+    referenced_names: int = 0
+    scanned: int = 0
+    scanned_bytes: int = 0
+    orphaned: int = 0
+    orphaned_bytes: int = 0
+    too_recent: int = 0
+    deleted: int = 0
+    failed: int = 0
+    samples: list = field(default_factory=list)
+
+
+def collect_garbage(prefixes=MANAGED_PREFIXES, grace=timedelta(hours=24),
+                    dry_run=True, sample_size=20, workdir=None, storage=None):
+    """
+    Delete stored objects under `prefixes` that no Song/Recording row
+    references and that are older than `grace`.
+
+    The grace period covers uploads whose row isn't committed yet (the
+    file is written before the INSERT). Content-addressed keys are also
+    claimed through MediaBlob, so a blob re-acquired or pinned by an
+    upload concurrently is kept.
+    """
+    report = GcReport()
+    cutoff = timezone.now() - grace
+
+    with KeySet(workdir) as referenced:
+        chunk = []
+        for name in iter_referenced_names():
+            chunk.append(name)
+            if len(chunk) >= 5000:
+                referenced.add_many(chunk)
+                chunk = []
+        referenced.add_many(chunk)
+        report.referenced_names = len(referenced)
+
+        for prefix in prefixes:
+            for page in iter_stored_pages(prefix, storage):
+                names = [name for name, _, _ in page]
+                known = referenced.present(
+                    names + [hls_package_of(name) for name in names if hls_package_of(name)]
+                )
+
+                doomed = []
+                for name, size, modified in page:
+                    report.scanned += 1
+                    report.scanned_bytes += size
+                    if name in known or hls_package_of(name) in known:
+                        continue
+                    if modified > cutoff:
+                        report.too_recent += 1
+                        continue
+
+                    report.orphaned += 1
+                    report.orphaned_bytes += size
+                    if len(report.samples) < sample_size:
+                        report.samples.append(name)
+                    doomed.append(name)
+
+                if doomed and not dry_run:
+                    claimed, failed = delete_unreferenced(doomed, storage)
+                    report.failed += failed
+                    report.deleted += len(claimed) - failed
+
+    return report
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from django.conf import settings
+
+from .r2 import get_r2_client
+
+
+STREAM_CHUNK = 256 * 1024
+
+METADATA_TTL = 60
+METADATA_MAX_ENTRIES = 1024
+
+
+@dataclass(frozen=True)
+class R2Object:
+    key: str
+    size: int
+    etag: str
+    last_modified: int
+    content_type: str
+
+
+# ─────────────────────────────────────────────
+# OBJECT METADATA (HEAD, cached briefly per process)
+# ─────────────────────────────────────────────
+
+_metadata = OrderedDict()
+_metadata_lock = threading.Lock()
+
+
+def head_object(key):
+    """
+    Size/ETag/Last-Modified for `key`, or None if it doesn't exist.
+
+    Range resolution needs the size before the ranged GET; caching HEADs
+    for a minute keeps that to one extra round trip per object, not per
+    request.
+    """
+    now = time.monotonic()
+    with _metadata_lock:
+        cached = _metadata.get(key)
+        if cached and cached[0] > now:
+            _metadata.move_to_end(key)
+            return cached[1]
+
+    from botocore.exceptions import ClientError
+
+    try:
+        head = get_r2_client().head_object(
+            Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+            Key=key,
+        )
+    except ClientError as exc:
+        if exc.response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound"):
+            return None
+        raise
+
+    obj = R2Object(
+        key=key,
+        size=head["ContentLength"],
+        etag=head["ETag"],
+        last_modified=int(head["LastModified"].timestamp()),
+        content_type=head.get("ContentType") or "application/octet-stream",
+    )
+
+    with _metadata_lock:
+        _metadata[key] = (now + METADATA_TTL, obj)
+        _metadata.move_to_end(key)
+        while len(_metadata) > METADATA_MAX_ENTRIES:
+            _metadata.popitem(last=False)
+
+    return obj
+
+
+def iter_object_range(obj, start, end):
+    """
+    Stream bytes [start, end] of `obj` from R2 without buffering the body.
+    """
+    response = get_r2_client().get_object(
+        Bucket=settings.AWS_STORAGE_BUCKET_NAME,
+        Key=obj.key,
+        Range=f"bytes={start}-{end}",
+        IfMatch=obj.etag,
+    )
+    body = response["Body"]
+    try:
+        yield from body.iter_chunks(STREAM_CHUNK)
+    finally:
+        body.close()
+
+
+# ─────────────────────────────────────────────
+# LOCAL LRU DISK CACHE OF OBJECT HEADS
+# ─────────────────────────────────────────────
+
+class HeadCache:
+    """
+    Keeps the first `head_bytes` of recently streamed objects on local disk.
+
+    Players start at byte 0, so caching object heads turns the
+    time-to-first-audio of popular songs into a local read (and sendfile).
+    Files are named by key + ETag, so a replaced object never serves stale
+    bytes. Recency is the file mtime, which makes eviction safe to share
+    between worker processes.
+    """
+
+    def __init__(self, directory, head_bytes, max_bytes):
+        self.directory = str(directory)
+        self.head_bytes = head_bytes
+        self.max_bytes = max_bytes
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            directory=settings.MEDIA_PROXY_CACHE_DIR,
+            head_bytes=settings.MEDIA_PROXY_CACHE_HEAD_BYTES,
+            max_bytes=settings.MEDIA_PROXY_CACHE_MAX_BYTES,
+        )
+
+    @property
+    def enabled(self):
+        return self.head_bytes > 0 and self.max_bytes > 0
+
+    def cached_length(self, obj):
+        return min(self.head_bytes, obj.size)
+
+    def path_for(self, obj):
+        digest = hashlib.sha256(f"{obj.key}\0{obj.etag}".encode("utf-8")).hexdigest()
+        return os.path.join(self.directory, digest)
+
+    def lookup(self, obj, end):
+        """
+        Path of the cached head if it covers bytes up to `end`, else None.
+        """
+        if not self.enabled or end >= self.cached_length(obj):
+            return None
+
+        path = self.path_for(obj)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def tee(self, obj, start, chunks):
+        """
+        Pass `chunks` (bytes from `start`) through, saving the object head
+        along the way when the stream starts at byte 0 and isn't cached yet.
+        """
+        if not self.enabled or start != 0 or os.path.exists(self.path_for(obj)):
+            yield from chunks
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        wanted = self.cached_length(obj)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        written = 0
+
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                for chunk in chunks:
+                    if written < wanted:
+                        part = chunk[:wanted - written]
+                        tmp.write(part)
+                        written += len(part)
+                    yield chunk
+
+            if written == wanted:
+                os.replace(tmp_path, self.path_for(obj))
+                self.evict()
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def evict(self):
+        entries = []
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.is_file() and not entry.name.endswith(".part"):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -0,0 +1,104 @@
+import hashlib
+import os
+
+import numpy as np
+from django.core.files import File
+from django.db import IntegrityError, transaction
+
+from .audio import (
+    BLOCK_FRAMES,
+    PcmEncoder,
+    ffmpeg_input,
+    iter_fixed_blocks,
+    iter_pcm_blocks,
+)
+from .blobs import unpin
+from .deletion import delete_on_commit
+
+
+def mix_hash(recording, song, vocal_gain, backing_gain, offset):
+    """
+    Stable cache key for a mix: same sources + same settings → same hash.
+    """
+    params = "|".join([
+        recording.audio_file.name,
+        song.audio_file.name,
+        f"{vocal_gain:.3f}",
+        f"{backing_gain:.3f}",
+        f"{offset:.3f}",
+    ])
+    return hashlib.sha256(params.encode("utf-8")).hexdigest()
+
+
+def render_mix(recording, song, vocal_gain, backing_gain, offset, suffix=".m4a"):
+    """
+    Mix the vocal recording over the song's backing track.
+
+    The output is as long as the vocal; the backing starts `offset` seconds
+    into the song (where the user started recording). Both sources are
+    decoded block by block so memory stays flat for any track length.
+
+    Returns (temp_path, duration_seconds). The caller removes temp_path.
+    """
+    vocal_blocks = iter_pcm_blocks(ffmpeg_input(recording.audio_file))
+    backing_blocks = iter_fixed_blocks(
+        iter_pcm_blocks(ffmpeg_input(song.audio_file), start=offset),
+        BLOCK_FRAMES,
+    )
+
+    with PcmEncoder(suffix=suffix) as encoder:
+        for vocal, backing in zip(vocal_blocks, backing_blocks):
+            mixed = vocal * np.float32(vocal_gain)
+            mixed += backing[:len(vocal)] * np.float32(backing_gain)
+            np.clip(mixed, -1.0, 1.0, out=mixed)
+            encoder.write(mixed)
+
+    return encoder.path, encoder.duration
+
+
+def create_mix_rendition(recording, song, vocal_gain, backing_gain, offset):
+    """
+    Return the user's mixed Recording for these parameters, rendering and
+    storing it only if it does not exist yet.
+
+    Returns (rendition, created).
+    """
+    from ..models import Recording
+
+    digest = mix_hash(recording, song, vocal_gain, backing_gain, offset)
+    renditions = Recording.objects.filter(mixed_from=recording, mix_hash=digest)
+
+    existing = renditions.first()
+    if existing:
+        return existing, False
+
+    # Rendered and uploaded outside any transaction: no connection or row
+    # lock is held for the length of an ffmpeg run. Identical concurrent
+    # requests may both render; the unique_mix_rendition constraint keeps
+    # the first and the others return it.
+    path, duration = render_mix(recording, song, vocal_gain, backing_gain, offset)
+    try:
+        rendition = Recording(
+            user=recording.user,
+            song=song,
+            mixed_from=recording,
+            mix_hash=digest,
+            duration=duration,
+        )
+        with open(path, "rb") as fh:
+            rendition.audio_file.save(f"mixed-{digest[:16]}.m4a", File(fh), save=False)
+    finally:
+        os.remove(path)
+
+    try:
+        with transaction.atomic():
+            rendition.save()
+    except IntegrityError:
+        # Lost the race: drop this upload unless the winner's is the same
+        # object (content-addressed key, so then it is referenced)
+        name = rendition.audio_file.name
+        unpin([name])
+        delete_on_commit(names=[name])
+        return renditions.get(), False
+
+    return rendition, True
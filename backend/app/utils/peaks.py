@@ -0,0 +1,138 @@
+import logging
+import os
+import struct
+
+import numpy as np
+from django.core.files.base import ContentFile
+
+from .audio import SAMPLE_RATE, ffmpeg_input, iter_pcm_blocks
+from .blobs import acquire, release
+from .deletion import delete_on_commit
+
+logger = logging.getLogger(__name__)
+
+
+# Samples per bin, finest first. Each level must divide the next one.
+RESOLUTIONS = (256, 1024, 4096)
+
+# Blob layout (little endian):
+#   b"PKS1" | sample_rate u32 | level count u16
+#   per level: samples_per_bin u32 | bins u32 | bins * (min i8, max i8)
+MAGIC = b"PKS1"
+
+
+def compute_peaks(source, resolutions=RESOLUTIONS, sample_rate=SAMPLE_RATE):
+    """
+    Return {samples_per_bin: int8 array of shape (bins, 2)} of min/max
+    peaks for `source`, decoded as a mono stream.
+
+    Only the finest level is computed from samples; coarser levels are
+    folded from it, so each sample is touched once.
+    """
+    finest = resolutions[0]
+    carry = np.zeros(0, dtype=np.float32)
+    mins, maxs = [], []
+
+    for block in iter_pcm_blocks(source, sample_rate=sample_rate, channels=1):
+        samples = np.concatenate([carry, block[:, 0]])
+        usable = len(samples) - len(samples) % finest
+        bins = samples[:usable].reshape(-1, finest)
+        mins.append(bins.min(axis=1))
+        maxs.append(bins.max(axis=1))
+        carry = samples[usable:]
+
+    if len(carry):
+        mins.append(carry.min(keepdims=True))
+        maxs.append(carry.max(keepdims=True))
+
+    lo = np.concatenate(mins) if mins else np.zeros(0, dtype=np.float32)
+    hi = np.concatenate(maxs) if maxs else np.zeros(0, dtype=np.float32)
+
+    levels = {}
+    for resolution in resolutions:
+        factor = resolution // finest
+        pad = -len(lo) % factor
+        lo_level = np.pad(lo, (0, pad), mode="edge") if pad and len(lo) else lo
+        hi_level = np.pad(hi, (0, pad), mode="edge") if pad and len(hi) else hi
+
+        pairs = np.stack([
+            lo_level.reshape(-1, factor).min(axis=1),
+            hi_level.reshape(-1, factor).max(axis=1),
+        ], axis=1)
+        levels[resolution] = np.round(np.clip(pairs, -1.0, 1.0) * 127).astype(np.int8)
+
+    return levels
+
+
+def encode_peaks(levels, sample_rate=SAMPLE_RATE):
+    parts = [MAGIC, struct.pack("<IH", sample_rate, len(levels))]
+    for resolution, pairs in sorted(levels.items()):
+        parts.append(struct.pack("<II", resolution, len(pairs)))
+        parts.append(pairs.tobytes())
+    return b"".join(parts)
+
+
+def decode_peaks(blob):
+    if blob[:4] != MAGIC:
+        raise ValueError("Not a peaks file")
+
+    sample_rate, count = struct.unpack_from("<IH", blob, 4)
+    offset = 10
+    levels = {}
+
+    for _ in range(count):
+        resolution, bins = struct.unpack_from("<II", blob, offset)
+        offset += 8
+        pairs = np.frombuffer(blob, dtype=np.int8, count=bins * 2, offset=offset)
+        levels[resolution] = pairs.reshape(-1, 2)
+        offset += bins * 2
+
+    return sample_rate, levels
+
+
+def store_peaks(instance):
+    """
+    Compute peaks for `instance.audio_file`, upload them under the model's
+    peaks_file prefix and record the key on the row.
+
+    Uses queryset.update() so file-cleanup signals don't fire again. Runs
+    after the upload request, so the row is only updated if it still has
+    the audio the peaks came from.
+    """
+    levels = compute_peaks(ffmpeg_input(instance.audio_file))
+    old_name = instance.peaks_file.name
+
+    instance.peaks_file.save(
+        f"{os.path.basename(instance.audio_file.name)}.peaks",
+        ContentFile(encode_peaks(levels)),
+        save=False,
+    )
+    updated = type(instance).objects.filter(
+        pk=instance.pk,
+        audio_file=instance.audio_file.name,
+    ).update(peaks_file=instance.peaks_file.name)
+    if not updated:
+        # Audio replaced (or row deleted) meanwhile; its own job runs next
+        delete_on_commit(names=[instance.peaks_file.name])
+        return None
+
+    # Written with update(), so the reference counting signals don't run
+    acquire([instance.peaks_file.name])
+    if old_name:
+        release([old_name])
+        delete_on_commit(names=[old_name])
+
+    return instance.peaks_file.name
+
+
+def store_peaks_safely(instance):
+    """
+    Media worker job: a failed decode is logged, the row keeps no peaks
+    (backfill_peaks retries it).
+    """
+    try:
+        store_peaks(instance)
+    except Exception:
+        logger.exception(
+            "Peak generation failed for %s %s", type(instance).__name__, instance.pk
+        )
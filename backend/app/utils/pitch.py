@@ -0,0 +1,243 @@
+import logging
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from .audio import ffmpeg_input, iter_pcm_blocks
+from .stats import score_changed
+
+logger = logging.getLogger(__name__)
+
+
+PITCH_SAMPLE_RATE = 16000
+HOP = 320  # 20 ms → 50 contour frames per second
+CONTOUR_RATE = PITCH_SAMPLE_RATE // HOP
+
+MIN_F0 = 80.0
+MAX_F0 = 1000.0
+TAU_MIN = int(PITCH_SAMPLE_RATE / MAX_F0)
+TAU_MAX = int(PITCH_SAMPLE_RATE / MIN_F0)
+WINDOW = 512
+FRAME = WINDOW + TAU_MAX
+
+YIN_THRESHOLD = 0.15
+SILENCE_RMS = 0.01
+
+# Full credit within PERFECT_CENTS, none beyond ZERO_CENTS (octave-folded)
+PERFECT_CENTS = 50
+ZERO_CENTS = 300
+MIN_LINE_FRAMES = 10
+
+
+# ─────────────────────────────────────────────
+# PITCH CONTOUR (VECTORISED YIN)
+# ─────────────────────────────────────────────
+
+def yin(frames):
+    """
+    f0 in Hz for each row of `frames` (shape (n, FRAME)); 0 where unvoiced.
+
+    The YIN difference function is built for all frames at once from an
+    FFT cross-correlation and cumulative energies, so the per-frame cost is
+    a couple of small FFTs rather than a Python loop over lags.
+    """
+    n = len(frames)
+    if not n:
+        return np.zeros(0, dtype=np.float32)
+
+    size = 1 << (FRAME + WINDOW - 1).bit_length()
+    spectrum = np.fft.rfft(frames, size, axis=1)
+    head = np.fft.rfft(frames[:, :WINDOW], size, axis=1)
+    # r[tau] = sum_{j < WINDOW} x[j] * x[j + tau]
+    r = np.fft.irfft(spectrum * np.conj(head), size, axis=1)[:, :TAU_MAX + 1]
+
+    squares = np.concatenate(
+        [np.zeros((n, 1), dtype=np.float64), np.cumsum(frames.astype(np.float64) ** 2, axis=1)],
+        axis=1,
+    )
+    taus = np.arange(TAU_MAX + 1)
+    energy_head = squares[:, WINDOW][:, None]
+    energy_lag = squares[:, taus + WINDOW] - squares[:, taus]
+    diff = np.maximum(energy_head + energy_lag - 2 * r, 0)
+
+    # Cumulative mean normalised difference
+    running = np.cumsum(diff[:, 1:], axis=1)
+    cmnd = np.ones_like(diff)
+    cmnd[:, 1:] = diff[:, 1:] * taus[1:] / np.where(running > 0, running, 1)
+    cmnd[:, :TAU_MIN] = 1.0
+
+    below = cmnd < YIN_THRESHOLD
+    voiced = below.any(axis=1)
+    first = np.argmax(below, axis=1)
+
+    # Best lag = minimum of the first dip under the threshold
+    after_first = taus[None, :] >= first[:, None]
+    left_dip = np.cumsum(after_first & ~below, axis=1) > 0
+    in_dip = after_first & ~left_dip
+    best = np.argmin(np.where(in_dip, cmnd, np.inf), axis=1)
+
+    # Parabolic interpolation around the chosen lag
+    rows = np.arange(n)
+    lo = np.clip(best - 1, 0, TAU_MAX)
+    hi = np.clip(best + 1, 0, TAU_MAX)
+    a, b, c = cmnd[rows, lo], cmnd[rows, best], cmnd[rows, hi]
+    denom = a - 2 * b + c
+    shift = np.where(np.abs(denom) > 1e-12, 0.5 * (a - c) / np.where(denom == 0, 1, denom), 0)
+    tau = best + np.clip(shift, -1, 1)
+
+    rms = np.sqrt(squares[:, WINDOW] / WINDOW)
+    voiced &= (rms > SILENCE_RMS) & (tau > 0)
+
+    f0 = np.where(voiced, PITCH_SAMPLE_RATE / np.where(tau > 0, tau, 1), 0)
+    return f0.astype(np.float32)
+
+
+def pitch_contour(source):
+    """
+    f0 contour of `source` at CONTOUR_RATE frames per second.
+
+    Frames are strided views over a small rolling buffer of decoded
+    samples; nothing longer than one decode block is materialised.
+    """
+    buffer = np.zeros(0, dtype=np.float32)
+    contour = []
+
+    for block in iter_pcm_blocks(source, sample_rate=PITCH_SAMPLE_RATE, channels=1):
+        buffer = np.concatenate([buffer, block[:, 0]])
+        if len(buffer) < FRAME:
+            continue
+
+        count = (len(buffer) - FRAME) // HOP + 1
+        frames = sliding_window_view(buffer, FRAME)[::HOP][:count]
+        contour.append(yin(frames))
+        buffer = buffer[count * HOP:]
+
+    if not contour:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(contour)
+
+
+# ─────────────────────────────────────────────
+# SCORING
+# ─────────────────────────────────────────────
+
+def frame_scores(sung, reference):
+    """
+    0–1 credit per frame where both contours are voiced, NaN elsewhere.
+    Octave errors are forgiven: only pitch class distance counts.
+    """
+    both = (sung > 0) & (reference > 0)
+    cents = np.full(len(sung), np.nan, dtype=np.float32)
+    cents[both] = 1200 * np.log2(sung[both] / reference[both])
+    folded = np.abs((cents + 600) % 1200 - 600)
+    return np.clip(1 - (folded - PERFECT_CENTS) / (ZERO_CENTS - PERFECT_CENTS), 0, 1)
+
+
+def score_contours(sung, reference, offset, lyric_times):
+    """
+    Score a recording contour against the song's reference contour.
+
+    `offset` is where the recording starts in the song (seconds) and
+    `lyric_times` the sorted SongLyricLine timestamps. Returns
+    (overall 0–100 or None, [{"timestamp", "score"}, ...]).
+    """
+    start = int(round(offset * CONTOUR_RATE))
+    reference = reference[start:start + len(sung)]
+    sung = sung[:len(reference)]
+    scores = frame_scores(sung, reference)
+
+    bounds = list(lyric_times) or [offset]
+    edges = [int(round(t * CONTOUR_RATE)) - start for t in bounds]
+    edges.append(len(scores))
+
+    lines = []
+    total = weight = 0.0
+    for timestamp, begin, end in zip(bounds, edges, edges[1:]):
+        window = scores[max(begin, 0):max(end, 0)]
+        window = window[~np.isnan(window)]
+        if len(window) < MIN_LINE_FRAMES:
+            continue
+
+        line_score = float(window.mean()) * 100
+        lines.append({"timestamp": timestamp, "score": round(line_score, 1)})
+        total += line_score * len(window)
+        weight += len(window)
+
+    overall = round(total / weight, 1) if weight else None
+    return overall, lines
+
+
+# ─────────────────────────────────────────────
+# CACHED REFERENCE + RECORDING SCORE
+# ─────────────────────────────────────────────
+
+def song_melody_contour(song):
+    """
+    Reference contour from SongAnalysis, extracted once per melody_file.
+
+    YIN is monophonic: run on the mixed audio_file it tracks whichever
+    part dominates each frame, so only the isolated melody is used. None
+    if the song has no melody_file.
+    """
+    from ..models import SongAnalysis
+
+    if not song.melody_file:
+        return None
+
+    analysis = SongAnalysis.for_song(song)
+    if analysis.melody_contour:
+        return np.frombuffer(analysis.melody_contour, dtype=np.float32)
+
+    contour = pitch_contour(ffmpeg_input(song.melody_file))
+    analysis.melody_contour = contour.tobytes()
+    analysis.save(update_fields=["melody_contour", "updated_at"])
+    return contour
+
+
+def store_score(recording):
+    """
+    Score `recording` against its song's melody and record the result.
+    Returns (overall, lines), or None if it stays unscored: the song has
+    no melody reference, or the take was replaced meanwhile.
+    """
+    recording.refresh_from_db(fields=["alignment_offset", "alignment_confidence", "score"])
+    song = recording.song
+
+    reference = song_melody_contour(song)
+    if reference is None:
+        return None
+
+    sung = pitch_contour(ffmpeg_input(recording.audio_file))
+    lyric_times = list(
+        song.lyrics.order_by("timestamp").values_list("timestamp", flat=True)
+    )
+
+    overall, lines = score_contours(
+        sung, reference, recording.start_offset or 0.0, lyric_times
+    )
+
+    # Runs after the upload request: skip if the take was replaced meanwhile
+    updated = type(recording).objects.filter(
+        pk=recording.pk,
+        audio_file=recording.audio_file.name,
+    ).update(score=overall, line_scores=lines)
+    if not updated:
+        return None
+
+    score_changed(recording, recording.score, overall)
+    recording.score = overall
+    return overall, lines
+
+
+def store_score_safely(recording):
+    try:
+        store_score(recording)
+    except Exception:
+        logger.exception("Scoring failed for Recording %s", recording.pk)
+
+
+def cache_song_melody_safely(song):
+    try:
+        song_melody_contour(song)
+    except Exception:
+        logger.exception("Melody contour failed for Song %s", song.pk)
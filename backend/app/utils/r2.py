@@ -1,14 +1,23 @@
-import boto3
+from functools import lru_cache
+
 from django.conf import settings
-from botocore.config import Config
 
+from base.instrumentation import instrument_s3_client
 
-def generate_signed_url(key: str, expires: int = 300) -> str:
+# boto3 is imported by the functions that build clients: it is the
+# heaviest import in the app and most processes never need a client.
+
+
+@lru_cache(maxsize=1)
+def get_r2_client():
     """
-    Generate a short-lived signed URL for a PRIVATE Cloudflare R2 object.
+    One S3 client per process. boto3 clients are thread-safe and keep a
+    pool of keep-alive connections, so reuse avoids repeated TLS setup.
     """
+    import boto3
+    from botocore.config import Config
 
-    s3 = boto3.client(
+    return instrument_s3_client(boto3.client(
         "s3",
         endpoint_url=settings.AWS_S3_ENDPOINT_URL,
         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
@@ -16,11 +25,17 @@ def generate_signed_url(key: str, expires: int = 300) -> str:
         config=Config(
             signature_version="s3v4",
             s3={"addressing_style": "path"},
+            max_pool_connections=getattr(settings, "R2_MAX_POOL_CONNECTIONS", 20),
         ),
         region_name="auto",
-    )
+    ))
 
-    return s3.generate_presigned_url(
+
+def generate_signed_url(key: str, expires: int = 300) -> str:
+    """
+    Generate a short-lived signed URL for a PRIVATE Cloudflare R2 object.
+    """
+    return get_r2_client().generate_presigned_url(
         ClientMethod="get_object",
         Params={
             "Bucket": settings.AWS_STORAGE_BUCKET_NAME,
@@ -30,20 +45,16 @@ def generate_signed_url(key: str, expires: int = 300) -> str:
     )
 
 
-from datetime import timedelta
-from django.utils import timezone
-import boto3
-from django.conf import settings
-
-
 def get_s3_client():
-    return boto3.client(
+    import boto3
+
+    return instrument_s3_client(boto3.client(
         "s3",
         endpoint_url=settings.AWS_S3_ENDPOINT_URL,
         aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
         aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
         region_name=settings.AWS_S3_REGION_NAME,
-    )
+    ))
 
 
 def sign_object(key, expires=600):
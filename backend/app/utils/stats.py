@@ -0,0 +1,277 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+
+
+SCORE_TOLERANCE = 1e-6
+
+
+def is_counted(recording):
+    # Mixdowns are renditions of an existing take, not a new performance
+    return not recording.mix_hash
+
+
+def counted_recordings():
+    from ..models import Recording
+
+    return Recording.objects.filter(mix_hash="")
+
+
+# ─────────────────────────────────────────────
+# INCREMENTAL UPDATES (called from signals / scoring)
+# ─────────────────────────────────────────────
+
+def recording_added(recording):
+    from ..models import SongStats, UserStats
+
+    if not is_counted(recording):
+        return
+
+    SongStats.objects.get_or_create(song_id=recording.song_id)
+    UserStats.objects.get_or_create(user_id=recording.user_id)
+
+    SongStats.objects.filter(pk=recording.song_id).update(
+        recording_count=F("recording_count") + 1
+    )
+    UserStats.objects.filter(pk=recording.user_id).update(
+        recording_count=F("recording_count") + 1
+    )
+
+    if recording.score is not None:
+        score_changed(recording, None, recording.score)
+
+
+def recording_removed(recording):
+    """
+    Only ever updates existing rows: when a Song or User is deleted its
+    aggregates are being cascaded away in the same transaction.
+    """
+    from ..models import SongStats, UserStats
+
+    if not is_counted(recording):
+        return
+
+    SongStats.objects.filter(pk=recording.song_id, recording_count__gt=0).update(
+        recording_count=F("recording_count") - 1
+    )
+    UserStats.objects.filter(pk=recording.user_id, recording_count__gt=0).update(
+        recording_count=F("recording_count") - 1
+    )
+
+    if recording.score is not None:
+        score_changed(recording, recording.score, None)
+
+
+def score_changed(recording, old, new):
+    from ..models import SongStats, UserStats
+
+    if not is_counted(recording) or old == new:
+        return
+
+    scored = (new is not None) - (old is not None)
+    delta = (new or 0) - (old or 0)
+
+    for model, pk in ((SongStats, recording.song_id), (UserStats, recording.user_id)):
+        model.objects.filter(pk=pk).update(
+            scored_count=F("scored_count") + scored,
+            score_total=F("score_total") + delta,
+        )
+
+    if new is not None:
+        UserStats.objects.filter(pk=recording.user_id).filter(
+            Q(best_score__isnull=True) | Q(best_score__lt=new)
+        ).update(best_score=new)
+
+    if old is not None and (new is None or new < old):
+        if UserStats.objects.filter(pk=recording.user_id, best_score=old).exists():
+            best = (
+                counted_recordings()
+                .filter(user_id=recording.user_id)
+                .aggregate(best=Max("score"))["best"]
+            )
+            UserStats.objects.filter(pk=recording.user_id).update(best_score=best)
+
+    _update_leaderboard(recording, old, new)
+
+
+def _update_leaderboard(recording, old, new):
+    from ..models import SongLeaderboardEntry
+
+    entry = SongLeaderboardEntry.objects.filter(
+        song_id=recording.song_id,
+        user_id=recording.user_id,
+    ).first()
+
+    if new is not None and (entry is None or new > entry.best_score):
+        SongLeaderboardEntry.objects.update_or_create(
+            song_id=recording.song_id,
+            user_id=recording.user_id,
+            defaults={"recording_id": recording.pk, "best_score": new},
+        )
+        return
+
+    # The best take got worse or went away (deletion cascades the entry)
+    if old is not None and (entry is None or entry.recording_id == recording.pk):
+        _recompute_leaderboard_entry(recording.song_id, recording.user_id)
+
+
+def _recompute_leaderboard_entry(song_id, user_id):
+    from ..models import SongLeaderboardEntry
+
+    best = (
+        counted_recordings()
+        .filter(song_id=song_id, user_id=user_id, score__isnull=False)
+        .order_by("-score", "created_at")
+        .only("id", "score")
+        .first()
+    )
+
+    if best is None:
+        SongLeaderboardEntry.objects.filter(song_id=song_id, user_id=user_id).delete()
+        return
+
+    SongLeaderboardEntry.objects.update_or_create(
+        song_id=song_id,
+        user_id=user_id,
+        defaults={"recording_id": best.pk, "best_score": best.score},
+    )
+
+
+# ─────────────────────────────────────────────
+# FULL REBUILD / CONSISTENCY CHECK
+# ─────────────────────────────────────────────
+
+def expected_stats():
+    """
+    Aggregates computed from scratch with GROUP BY queries over Recording.
+    """
+    per_song = {
+        row["song"]: row
+        for row in counted_recordings()
+        .values("song")
+        .annotate(
+            recording_count=Count("id"),
+            scored_count=Count("score"),
+            score_total=Sum("score"),
+        )
+        .order_by()
+    }
+
+    per_user = {
+        row["user"]: row
+        for row in counted_recordings()
+        .values("user")
+        .annotate(
+            recording_count=Count("id"),
+            scored_count=Count("score"),
+            score_total=Sum("score"),
+            best_score=Max("score"),
+        )
+        .order_by()
+    }
+
+    leaderboard = {}
+    best_takes = (
+        counted_recordings()
+        .filter(score__isnull=False)
+        .order_by("song", "user", "-score", "created_at")
+        .values_list("song", "user", "id", "score")
+    )
+    for song_id, user_id, recording_id, score in best_takes.iterator():
+        leaderboard.setdefault((song_id, user_id), (recording_id, score))
+
+    return per_song, per_user, leaderboard
+
+
+def check_stats():
+    """
+    Compare stored aggregates against a rebuild. Returns a list of
+    human-readable mismatches (empty when consistent).
+    """
+    from ..models import SongLeaderboardEntry, SongStats, UserStats
+
+    per_song, per_user, leaderboard = expected_stats()
+    problems = []
+
+    def compare(label, stored, expected, fields):
+        for key in sorted(set(stored) | set(expected)):
+            have, want = stored.get(key), expected.get(key)
+            for field in fields:
+                a = have.get(field) if have else None
+                b = want.get(field) if want else None
+                if field.endswith("count"):
+                    a, b = a or 0, b or 0
+                elif field == "score_total":
+                    a, b = a or 0.0, b or 0.0
+                if not _same(a, b):
+                    problems.append(f"{label} {key}: {field} is {a}, expected {b}")
+
+    compare(
+        "SongStats",
+        {s.pk: s.__dict__ for s in SongStats.objects.all()},
+        per_song,
+        ["recording_count", "scored_count", "score_total"],
+    )
+    compare(
+        "UserStats",
+        {s.pk: s.__dict__ for s in UserStats.objects.all()},
+        per_user,
+        ["recording_count", "scored_count", "score_total", "best_score"],
+    )
+    compare(
+        "Leaderboard",
+        {
+            (e.song_id, e.user_id): {"best_score": e.best_score}
+            for e in SongLeaderboardEntry.objects.all()
+        },
+        {key: {"best_score": score} for key, (_, score) in leaderboard.items()},
+        ["best_score"],
+    )
+    return problems
+
+
+@transaction.atomic
+def rebuild_stats():
+    from ..models import SongLeaderboardEntry, SongStats, UserStats
+
+    per_song, per_user, leaderboard = expected_stats()
+
+    SongStats.objects.all().delete()
+    UserStats.objects.all().delete()
+    SongLeaderboardEntry.objects.all().delete()
+
+    SongStats.objects.bulk_create([
+        SongStats(
+            song_id=song_id,
+            recording_count=row["recording_count"],
+            scored_count=row["scored_count"],
+            score_total=row["score_total"] or 0,
+        )
+        for song_id, row in per_song.items()
+    ], batch_size=1000)
+
+    UserStats.objects.bulk_create([
+        UserStats(
+            user_id=user_id,
+            recording_count=row["recording_count"],
+            scored_count=row["scored_count"],
+            score_total=row["score_total"] or 0,
+            best_score=row["best_score"],
+        )
+        for user_id, row in per_user.items()
+    ], batch_size=1000)
+
+    SongLeaderboardEntry.objects.bulk_create([
+        SongLeaderboardEntry(
+            song_id=song_id,
+            user_id=user_id,
+            recording_id=recording_id,
+            best_score=score,
+        )
+        for (song_id, user_id), (recording_id, score) in leaderboard.items()
+    ], batch_size=1000)
+
+
+def _same(a, b):
+    if a is None or b is None:
+        return a is b
+    return abs(a - b) <= SCORE_TOLERANCE * max(1.0, abs(a), abs(b))
@@ -0,0 +1,93 @@
+import logging
+import queue
+import threading
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+# ─────────────────────────────────────────────
+# MEDIA PROCESSING WORKER (after commit, off the request)
+# ─────────────────────────────────────────────
+# Media jobs (peaks, alignment, melody extraction, scoring and HLS
+# packaging) decode whole files with ffmpeg. They run here so an upload
+# request is "save the row, enqueue" and a sync worker isn't pinned for
+# the length of a decode.
+#
+# The queue lives in the web process: work still queued when the process
+# exits is lost. Each job leaves its row in a state a management command
+# picks up (backfill_peaks, analyze_recordings, package_hls).
+
+class MediaWorker:
+    """
+    One background thread running queued jobs in submission order, so a
+    job submitted after another (scoring after alignment) sees its result.
+    """
+
+    def __init__(self, name="media-worker"):
+        self.name = name
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, func, *args):
+        self._queue.put((func, args))
+        self._ensure_worker()
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def _process(self, func, args):
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Media job %s failed", getattr(func, "__name__", func))
+        finally:
+            self._queue.task_done()
+
+    def _run(self):
+        while True:
+            self._process(*self._queue.get())
+            close_old_connections()
+
+    def run_pending(self):
+        """
+        Run everything queued on the calling thread (tests, management
+        commands).
+        """
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            self._process(*job)
+
+    def join(self):
+        """
+        Block until everything submitted so far has run.
+        """
+        self._queue.join()
+
+
+media_worker = MediaWorker()
+
+
+def enqueue_on_commit(func, *args):
+    """
+    Run func(*args) on the media worker once the current transaction
+    commits; nothing runs if it rolls back.
+
+    MEDIA_PROCESS_ASYNC = False runs it inline in the on_commit hook.
+    """
+    def run():
+        if getattr(settings, "MEDIA_PROCESS_ASYNC", True):
+            media_worker.submit(func, *args)
+        else:
+            func(*args)
+
+    transaction.on_commit(run)
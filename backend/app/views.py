@@ -1,16 +1,64 @@
+import re
+
+from django.db.models import Count, Min
+from django.http import Http404, HttpResponse
 from rest_framework import generics, permissions
+from rest_framework.pagination import CursorPagination
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
-from .models import Song, Recording
+from base.authentication import (
+    CookiesJWTClaimsAuthentication,
+    auth_cache_metrics,
+    prometheus_lines as auth_prometheus_lines,
+)
+from base.instrumentation import render_metrics
+
+from .models import Song, Recording, SongStats, UserStats, SongLeaderboardEntry
 from .serializers import *
+from .permissions import HasMetricsToken, can_access_media
 
+from .utils.hls import MASTER_PLAYLIST, playlist_for
 from .utils.r2 import generate_signed_url
+from .utils.db import connection_stats
+from .utils.cache import cache_metrics, prometheus_lines as cache_prometheus_lines
+from .utils.catalog import (
+    catalog_cache,
+    catalog_version,
+    etag_for,
+    is_not_modified,
+    not_modified_response,
+    patch_catalog_headers,
+    signing_window,
+)
 
 
 # ─────────────────────────────────────────────
 # SONG VIEWS
 # ─────────────────────────────────────────────
+# Read-only catalog endpoints authenticate from the token claims alone
+# (no user row lookup); see base.authentication. Catalog responses carry
+# ETags from the catalog version (utils.catalog). The song list/detail,
+# genre list and media gateway have async twins in views_async, routed
+# instead of these when ASYNC_VIEWS is set (ASGI deploys).
+
+class CatalogCacheMixin:
+    """
+    Catalog version ETag + private Cache-Control; a matching
+    If-None-Match gets a 304 before the queryset or serializer runs.
+    """
+    signed_urls = False
+
+    def get(self, request, *args, **kwargs):
+        etag = etag_for(catalog_version(), self.signed_urls)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            patch_catalog_headers(response, etag)
+        return response
+
 
 # Admin-only song upload
 class SongUploadView(generics.CreateAPIView):
@@ -20,18 +68,40 @@ class SongUploadView(generics.CreateAPIView):
 
 
 # List all songs (AUTH REQUIRED)
-class SongListView(generics.ListAPIView):
-    queryset = Song.objects.all()
-    serializer_class = SongSerializer
+class SongListView(CatalogCacheMixin, generics.ListAPIView):
+    queryset = Song.objects.select_related("artist")
+    serializer_class = SongListSerializer
+    # Cover URLs are presigned
+    signed_urls = True
+    authentication_classes = [CookiesJWTClaimsAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
+    def list(self, request, *args, **kwargs):
+        # Serialized once per catalog version and signing window
+        data = catalog_cache.get_or_set(
+            f"song-list:{signing_window()}",
+            lambda: list(self.get_serializer(self.get_queryset(), many=True).data),
+        )
+        return Response(data)
+
 
 # Song detail (AUTH REQUIRED)
-class SongDetailView(generics.RetrieveAPIView):
-    queryset = Song.objects.all()
+class SongDetailView(CatalogCacheMixin, generics.RetrieveAPIView):
+    queryset = Song.objects.select_related("artist").prefetch_related("lyrics")
     serializer_class = SongSerializer
+    authentication_classes = [CookiesJWTClaimsAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
+    def retrieve(self, request, *args, **kwargs):
+        def render():
+            song = self.get_queryset().filter(pk=self.kwargs["pk"]).first()
+            return self.get_serializer(song).data if song else None
+
+        data = catalog_cache.get_or_set(f"song-detail:{self.kwargs['pk']}", render)
+        if data is None:
+            raise Http404("No Song matches the given query.")
+        return Response(data)
+
 
 # ─────────────────────────────────────────────
 # RECORDING VIEWS
@@ -47,16 +117,81 @@ class RecordingUploadView(generics.CreateAPIView):
 
 
 # List logged-in user's recordings
+class RecordingCursorPagination(CursorPagination):
+    """
+    Keyset pagination on (user, -created_at, -id): each page is one index
+    range scan, however many takes the user has. The id makes the order
+    total, so takes saved in the same instant are neither skipped nor
+    repeated across pages.
+    """
+    ordering = ("-created_at", "-id")
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+
+# List my recordings (takes, not mixdowns), newest first (AUTH REQUIRED)
 class MyRecordingsView(generics.ListAPIView):
     serializer_class = RecordingSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = RecordingCursorPagination
 
     def get_queryset(self):
         return (
             Recording.objects
             .filter(user=self.request.user)
+            # Mixdowns are renditions of a take (returned by the mix
+            # endpoint), left out like they are from recording_count
+            .filter(mixed_from__isnull=True)
             .select_related("song")
-            .order_by("-created_at")
+            # Just the columns RecordingSerializer reads
+            .only(*RECORDING_LIST_FIELDS)
+        )
+
+    def get_paginated_response(self, data):
+        response = super().get_paginated_response(data)
+        # From the maintained aggregate (mixdowns excluded), not a COUNT(*)
+        response.data["recording_count"] = (
+            UserStats.objects
+            .filter(pk=self.request.user.pk)
+            .values_list("recording_count", flat=True)
+            .first()
+        ) or 0
+        return response
+
+
+# Render vocal + backing mix server-side (AUTH REQUIRED)
+class RecordingMixView(APIView):
+    """
+    Mixes one of the user's recordings over the song's backing track and
+    stores the result as a new Recording. Identical requests return the
+    existing rendition instead of rendering again.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        # numpy-backed; loaded with the first mix, not at worker boot
+        from .utils.mixdown import create_mix_rendition
+
+        serializer = RecordingMixSerializer(
+            data=request.data,
+            context={"request": request},
+        )
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        recording = data["recording"]
+        rendition, created = create_mix_rendition(
+            recording=recording,
+            song=data.get("song") or recording.song,
+            vocal_gain=data["vocal_gain"],
+            backing_gain=data["backing_gain"],
+            offset=data["offset"],
+        )
+
+        return Response(
+            RecordingSerializer(rendition).data,
+            status=201 if created else 200,
         )
 
 
@@ -67,7 +202,7 @@ class MyRecordingsView(generics.ListAPIView):
 class SecureMediaView(APIView):
     """
     The ONLY way media is accessed.
-    - Requires JWT
+    - Requires JWT (full user auth: deactivated accounts lose access)
     - Validates access
     - Generates short-lived signed URL
     """
@@ -78,80 +213,208 @@ class SecureMediaView(APIView):
         if not key:
             return Response({"error": "Missing key"}, status=400)
 
-        user = request.user
-
         # ───── ACCESS CONTROL (ANTI-IDOR) ─────
-        allowed = (
-            # Songs (shared across authenticated users)
-            Song.objects.filter(audio_file=key).exists()
-            or Song.objects.filter(cover_image=key).exists()
-            or Song.objects.filter(lrc_file=key).exists()
-
-            # Recordings (PRIVATE per user)
-            or Recording.objects.filter(audio_file=key, user=user).exists()
-        )
-
-        if not allowed:
+        if not can_access_media(request.user, key):
             return Response({"error": "Forbidden"}, status=403)
 
         # Generate short-lived signed URL
         signed_url = generate_signed_url(key=key, expires=300)
 
         return Response({
-    "url": signed_url,
-    "expires_in": 300
-})
+            "url": signed_url,
+            "expires_in": 300,
+        })
 
 
+# ─────────────────────────────────────────────
+# HLS PLAYLISTS (SIGNED PER RENDITION)
+# ─────────────────────────────────────────────
 
-class SongListView(generics.ListAPIView):
-    queryset = Song.objects.select_related("artist")
-    serializer_class = SongListSerializer
+MEDIA_PLAYLIST = re.compile(r"^v\d+/index\.m3u8$")
+
+
+class SongHlsView(APIView):
+    """
+    Serves a song's HLS playlists. Songs are shared media, so one indexed
+    lookup authorises the whole rendition: the media playlist comes back
+    with every segment already presigned.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, pk, name):
+        if name != MASTER_PLAYLIST and not MEDIA_PLAYLIST.match(name):
+            raise Http404("Playlist not found")
+
+        prefix = Song.objects.filter(pk=pk).values_list("hls_prefix", flat=True).first()
+        if not prefix:
+            raise Http404("Song is not packaged")
+
+        response = HttpResponse(
+            playlist_for(prefix, name),
+            content_type="application/vnd.apple.mpegurl",
+        )
+        response["Cache-Control"] = "private, max-age=60"
+        return response
+
+
+# ─────────────────────────────────────────────
+# LEADERBOARDS / STATS (AGGREGATE TABLES ONLY)
+# ─────────────────────────────────────────────
+
+MAX_TOP_N = 50
+
+
+def top_n(request, default=10):
+    try:
+        limit = int(request.query_params.get("limit", default))
+    except ValueError:
+        limit = default
+    return max(1, min(limit, MAX_TOP_N))
+
+
+class SongLeaderboardView(generics.ListAPIView):
+    """
+    Best score per user on one song, highest first.
+    """
+    serializer_class = LeaderboardEntrySerializer
+    authentication_classes = [CookiesJWTClaimsAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return (
+            SongLeaderboardEntry.objects
+            .filter(song_id=self.kwargs["pk"])
+            .select_related("user")
+            .order_by("-best_score")[:top_n(self.request)]
+        )
+
+
+class PopularSongsView(generics.ListAPIView):
+    """
+    Most-sung songs.
+    """
+    serializer_class = PopularSongSerializer
+    authentication_classes = [CookiesJWTClaimsAuthentication]
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = None
+
+    def get_queryset(self):
+        return (
+            SongStats.objects
+            .filter(recording_count__gt=0)
+            .select_related("song__artist")
+            .order_by("-recording_count")[:top_n(self.request)]
+        )
+
+
+class MyStatsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        stats = UserStats.objects.filter(pk=request.user.pk).first() or UserStats()
+        return Response(UserStatsSerializer(stats).data)
 
 
 # ─────────────────────────────────────────────
 # GENRE VIEWS
 # ─────────────────────────────────────────────
 
-class GenresListView(APIView):
+class GenresListView(CatalogCacheMixin, generics.ListAPIView):
     """
     Returns list of unique genres with song counts and sample cover.
     """
+    authentication_classes = [CookiesJWTClaimsAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
-    def get(self, request):
-        from django.db.models import Count
-        
-        genres = (
+    def list(self, request, *args, **kwargs):
+        return Response(catalog_cache.get_or_set("genre-list", self.render))
+
+    def render(self):
+        genres = list(
             Song.objects
             .exclude(genre__isnull=True)
             .exclude(genre='')
             .values('genre')
-            .annotate(count=Count('id'))
+            .annotate(count=Count('id'), sample_id=Min('id'))
             .order_by('-count')
         )
-        
-        result = []
-        for g in genres:
-            # Get first song's cover for this genre
-            sample_song = Song.objects.filter(genre=g['genre']).first()
-            result.append({
+
+        # First song's cover per genre, in one query
+        covers = dict(
+            Song.objects
+            .filter(pk__in=[g['sample_id'] for g in genres])
+            .values_list('pk', 'cover_image')
+        )
+
+        return [
+            {
                 'name': g['genre'],
                 'count': g['count'],
-                'cover_key': sample_song.cover_image.name if sample_song and sample_song.cover_image else None
-            })
-        
-        return Response(result)
+                'cover_key': covers.get(g['sample_id']) or None,
+            }
+            for g in genres
+        ]
 
 
-class SongsByGenreView(generics.ListAPIView):
+class SongsByGenreView(CatalogCacheMixin, generics.ListAPIView):
     """
     Returns all songs for a specific genre.
     """
     serializer_class = SongListSerializer
+    signed_urls = True
+    authentication_classes = [CookiesJWTClaimsAuthentication]
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         genre = self.kwargs.get('genre')
         return Song.objects.filter(genre__iexact=genre).select_related("artist")
+
+    def list(self, request, *args, **kwargs):
+        genre = self.kwargs.get('genre', '').lower()
+        data = catalog_cache.get_or_set(
+            f"genre-songs:{genre}:{signing_window()}",
+            lambda: list(self.get_serializer(self.get_queryset(), many=True).data),
+        )
+        return Response(data)
+
+
+# ─────────────────────────────────────────────
+# OPERATIONS (ADMIN ONLY)
+# ─────────────────────────────────────────────
+
+class DatabaseStatsView(APIView):
+    """
+    Connection lifecycle / pool counters of the worker that serves the
+    request.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(connection_stats())
+
+
+class CacheStatsView(APIView):
+    """
+    Cache-aside hit rates per namespace, and the auth caches, for the
+    worker that serves the request.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({**cache_metrics(), "auth": auth_cache_metrics()})
+
+
+class MetricsView(APIView):
+    """
+    Prometheus text exposition: request / DB / R2 histograms, cache-aside
+    and auth cache counters. Metrics are per process, like the other ops
+    endpoints.
+    """
+    permission_classes = [HasMetricsToken | permissions.IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(
+            render_metrics(cache_prometheus_lines() + auth_prometheus_lines()),
+            content_type="text/plain; version=0.0.4",
+        )
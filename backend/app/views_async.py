@@ -0,0 +1,210 @@
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.db.models import Count, Min
+from django.http import HttpResponse
+from django.views import View
+
+from base.authentication import CookiesJWTAuthentication, CookiesJWTClaimsAuthentication
+from base.renderers import dumps
+
+from .models import Song
+from .permissions import acan_access_media
+from .serializers import SongListSerializer, SongSerializer
+from .utils.catalog import (
+    acatalog_version,
+    catalog_cache,
+    etag_for,
+    is_not_modified,
+    not_modified_response,
+    patch_catalog_headers,
+    signing_window,
+)
+from .utils.r2 import generate_signed_url
+
+
+def json_response(data, status=200):
+    """
+    JSON response encoded with orjson, like the DRF views' renderer.
+    `data` may already be encoded (bytes from the catalog cache).
+    """
+    body = data if isinstance(data, bytes) else dumps(data)
+    return HttpResponse(body, status=status, content_type="application/json")
+
+
+# ─────────────────────────────────────────────
+# AUTH (NO THREAD HOPS)
+# ─────────────────────────────────────────────
+
+def authenticate(request):
+    """
+    The signed-in ClaimsUser, or None.
+
+    Verification is CPU-only (token cache + claims, no user lookup), so it
+    runs directly on the event loop instead of via sync_to_async.
+    """
+    result = CookiesJWTClaimsAuthentication().authenticate(request)
+    return result[0] if result else None
+
+
+async def authenticate_user(request):
+    """
+    The signed-in User row, or None: full auth (is_active, revocation)
+    like the DRF default, for views whose access must end when an account
+    is deactivated. One thread hop; user cache hits skip the query.
+    """
+    result = await sync_to_async(CookiesJWTAuthentication().authenticate)(request)
+    return result[0] if result else None
+
+
+def unauthenticated():
+    response = json_response(
+        {"detail": "Authentication credentials were not provided."},
+        status=401,
+    )
+    response["WWW-Authenticate"] = 'Bearer realm="api"'
+    return response
+
+
+class AsyncAPIView(View):
+    """
+    Async Django view with the API's cookie JWT auth and JSON responses.
+    DRF views are sync-only; these hot read paths skip it under ASGI
+    (ASYNC_VIEWS).
+    """
+
+    http_method_names = ["get", "head", "options"]
+    # Claims-only auth; True loads and checks the user row
+    load_user = False
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await authenticate_user(request) if self.load_user else authenticate(request)
+        if request.user is None:
+            return unauthenticated()
+        return await super().dispatch(request, *args, **kwargs)
+
+
+def catalog_cached(signed_urls=False):
+    """
+    Tag a catalog GET with the catalog version ETag and answer a matching
+    If-None-Match with 304 before the handler runs (no queries, no
+    serialization).
+    """
+    def decorator(get):
+        @wraps(get)
+        async def wrapper(self, request, *args, **kwargs):
+            etag = etag_for(await acatalog_version(), signed_urls)
+            if is_not_modified(request, etag):
+                return not_modified_response(etag)
+
+            response = await get(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                patch_catalog_headers(response, etag)
+            return response
+        return wrapper
+    return decorator
+
+
+# ─────────────────────────────────────────────
+# SONGS / GENRES
+# ─────────────────────────────────────────────
+
+class SongListView(AsyncAPIView):
+    # Cover URLs are presigned
+    @catalog_cached(signed_urls=True)
+    async def get(self, request):
+        async def render():
+            songs = [song async for song in Song.objects.select_related("artist")]
+            return dumps(SongListSerializer(songs, many=True).data)
+
+        # Encoded once per catalog version and signing window
+        body = await catalog_cache.aget_or_set(f"songs:{signing_window()}", render)
+        return json_response(body)
+
+
+class SongDetailView(AsyncAPIView):
+    @catalog_cached()
+    async def get(self, request, pk):
+        async def render():
+            song = await (
+                Song.objects
+                .select_related("artist")
+                .prefetch_related("lyrics")
+                .filter(pk=pk)
+                .afirst()
+            )
+            return dumps(SongSerializer(song).data) if song else None
+
+        body = await catalog_cache.aget_or_set(f"song:{pk}", render)
+        if body is None:
+            return json_response({"detail": "No Song matches the given query."}, status=404)
+        return json_response(body)
+
+
+class GenresListView(AsyncAPIView):
+    """
+    Returns list of unique genres with song counts and sample cover.
+    """
+
+    @catalog_cached()
+    async def get(self, request):
+        return json_response(await catalog_cache.aget_or_set("genres", self.render))
+
+    async def render(self):
+        genres = [
+            row async for row in
+            Song.objects
+            .exclude(genre__isnull=True)
+            .exclude(genre='')
+            .values('genre')
+            .annotate(count=Count('id'), sample_id=Min('id'))
+            .order_by('-count')
+        ]
+
+        # First song's cover per genre, in one query
+        covers = {
+            pk: cover async for pk, cover in
+            Song.objects
+            .filter(pk__in=[g['sample_id'] for g in genres])
+            .values_list('pk', 'cover_image')
+        }
+
+        return dumps([
+            {
+                'name': g['genre'],
+                'count': g['count'],
+                'cover_key': covers.get(g['sample_id']) or None,
+            }
+            for g in genres
+        ])
+
+
+# ─────────────────────────────────────────────
+# SECURE MEDIA GATEWAY
+# ─────────────────────────────────────────────
+
+class SecureMediaView(AsyncAPIView):
+    """
+    The ONLY way media is accessed.
+    - Requires JWT (full user auth: deactivated accounts lose access)
+    - Validates access
+    - Generates short-lived signed URL
+    """
+    load_user = True
+
+    async def get(self, request):
+        key = request.GET.get("key")
+        if not key:
+            return json_response({"error": "Missing key"}, status=400)
+
+        # ───── ACCESS CONTROL (ANTI-IDOR) ─────
+        if not await acan_access_media(request.user, key):
+            return json_response({"error": "Forbidden"}, status=403)
+
+        # Presigning is a local HMAC, cheap enough for the event loop
+        signed_url = generate_signed_url(key=key, expires=300)
+
+        return json_response({
+            "url": signed_url,
+            "expires_in": 300,
+        })
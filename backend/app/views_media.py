@@ -1,71 +1,379 @@
 import os
+import mmap
 import mimetypes
+import uuid
 
 from django.conf import settings
-from django.http import StreamingHttpResponse, Http404
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
 from django.views import View
 
+from base.authentication import CookiesJWTAuthentication
 
-def file_iterator(path, offset=0, length=None, chunk_size=8192):
+from .permissions import can_access_media
+from .utils.media_proxy import HeadCache, head_object, iter_object_range
+
+
+# Ranges up to this size are sliced out of an mmap and sent in one write
+SMALL_RANGE = 256 * 1024
+
+MIN_CHUNK = 64 * 1024
+MAX_CHUNK = 1024 * 1024
+
+# More ranges than this and we just send the whole file (RFC 7233 §3.1)
+MAX_RANGES = 16
+
+
+def chunk_size_for(length):
+    """
+    Bigger reads for bigger bodies: ~16 chunks per response, within bounds.
+    """
+    return max(MIN_CHUNK, min(MAX_CHUNK, length // 16))
+
+
+class FileRange:
+    """
+    A file object limited to `length` bytes from `start`.
+
+    Keeps fileno() so servers with wsgi.file_wrapper (gunicorn) can use
+    sendfile — they send Content-Length bytes from the current offset —
+    while plain iteration stops at the end of the range.
+    """
+
+    def __init__(self, path, start=0, length=None):
+        self.file = open(path, "rb")
+        self.file.seek(start)
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining is None:
+            return self.file.read(size)
+        if self.remaining <= 0:
+            return b""
+
+        size = self.remaining if size is None or size < 0 else min(size, self.remaining)
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+# ─────────────────────────────────────────────
+# RANGE PARSING (RFC 7233)
+# ─────────────────────────────────────────────
+
+class Unsatisfiable(Exception):
+    pass
+
+
+def parse_range_header(header, size):
     """
-    Generator that opens the file itself and keeps it open
-    for the duration of streaming.
+    Parse a Range header into a sorted list of coalesced (start, end)
+    inclusive byte ranges.
+
+    Returns None when the header should be ignored (missing, not bytes,
+    malformed, or too many ranges). Raises Unsatisfiable when it is valid
+    but no range overlaps the file.
     """
+    if not header:
+        return None
+
+    unit, _, specs = header.partition("=")
+    specs = [spec.strip() for spec in specs.split(",") if spec.strip()]
+    if unit.strip().lower() != "bytes" or not specs or len(specs) > MAX_RANGES:
+        return None
+
+    ranges = []
+    for spec in specs:
+        first, dash, last = (part.strip() for part in spec.partition("-"))
+        if not dash or not (first or last):
+            return None
+        if (first and not first.isdigit()) or (last and not last.isdigit()):
+            return None
+
+        if not first:
+            # Suffix range: the last N bytes
+            suffix = int(last)
+            if suffix and size:
+                ranges.append((max(size - suffix, 0), size - 1))
+            continue
+
+        start = int(first)
+        end = int(last) if last else size - 1
+        if last and end < start:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if not ranges:
+        raise Unsatisfiable()
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def if_range_matches(header, etag, last_modified):
+    """
+    If-Range holds a strong ETag or an HTTP date; the Range applies only
+    if it still identifies the current file.
+    """
+    if not header:
+        return True
+
+    header = header.strip()
+    if header.startswith('"'):
+        return header == etag
+    if header.startswith("W/"):
+        return False
+
+    date = parse_http_date_safe(header)
+    return date is not None and date == int(last_modified)
+
+
+# ─────────────────────────────────────────────
+# RESPONSES
+# ─────────────────────────────────────────────
+
+def read_small(path, start, end):
     with open(path, "rb") as f:
-        f.seek(offset)
-        remaining = length
-
-        while True:
-            if remaining is None:
-                data = f.read(chunk_size)
-            else:
-                if remaining <= 0:
-                    break
-                data = f.read(min(chunk_size, remaining))
-                remaining -= len(data)
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return mm[start:end + 1]
 
+
+def iter_file_range(path, start, end):
+    remaining = end - start + 1
+    chunk = chunk_size_for(remaining)
+    with open(path, "rb") as f:
+        f.seek(start)
+        while remaining > 0:
+            data = f.read(min(chunk, remaining))
             if not data:
                 break
+            remaining -= len(data)
             yield data
 
 
+def single_range_response(path, start, end, size, content_type):
+    length = end - start + 1
+
+    if length <= SMALL_RANGE:
+        response = HttpResponse(
+            read_small(path, start, end),
+            status=206,
+            content_type=content_type,
+        )
+    else:
+        response = FileResponse(
+            FileRange(path, start, length),
+            status=206,
+            content_type=content_type,
+        )
+        response.block_size = chunk_size_for(length)
+
+    response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    response["Content-Length"] = str(length)
+    return response
+
+
+def multi_range_response(iter_range, ranges, size, content_type):
+    """
+    multipart/byteranges body; `iter_range(start, end)` yields each part.
+    """
+    boundary = uuid.uuid4().hex
+    heads = [
+        (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode("ascii")
+        for start, end in ranges
+    ]
+    tail = f"\r\n--{boundary}--\r\n".encode("ascii")
+
+    def body():
+        for head, (start, end) in zip(heads, ranges):
+            yield head
+            yield from iter_range(start, end)
+        yield tail
+
+    length = sum(len(h) for h in heads) + len(tail) + sum(e - s + 1 for s, e in ranges)
+
+    response = StreamingHttpResponse(
+        body(),
+        status=206,
+        content_type=f"multipart/byteranges; boundary={boundary}",
+    )
+    response["Content-Length"] = str(length)
+    return response
+
+
+def resolve_ranges(request, size, etag, last_modified):
+    """
+    (ranges or None, 416 response or None) for this request.
+    """
+    if not if_range_matches(request.headers.get("If-Range"), etag, last_modified):
+        return None, None
+
+    try:
+        return parse_range_header(request.headers.get("Range"), size), None
+    except Unsatisfiable:
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return None, response
+
+
+def with_validators(response, etag, last_modified):
+    response["ETag"] = etag
+    response["Last-Modified"] = http_date(last_modified)
+    response["Accept-Ranges"] = "bytes"
+    return response
+
+
 class MediaStreamView(View):
+    """
+    Byte-range media streaming.
+
+    MEDIA_STREAM_SOURCE = "filesystem" serves MEDIA_ROOT (public, local
+    dev). "r2" proxies R2 objects for authenticated users under the same
+    ACL as the secure media gateway, with hot object heads cached on disk.
+    """
+
     def get(self, request, path):
-        full_path = os.path.join(settings.MEDIA_ROOT, path)
+        if getattr(settings, "MEDIA_STREAM_SOURCE", "filesystem") == "r2":
+            return self.get_from_r2(request, path)
+        return self.get_from_disk(request, path)
+
+    # ──────────────── LOCAL FILES ────────────────
+
+    def get_from_disk(self, request, path):
+        try:
+            full_path = safe_join(settings.MEDIA_ROOT, path)
+        except (SuspiciousFileOperation, ValueError):
+            raise Http404("File not found")
 
-        if not os.path.exists(full_path):
+        if not os.path.isfile(full_path):
             raise Http404("File not found")
 
-        file_size = os.path.getsize(full_path)
+        stat = os.stat(full_path)
+        size = stat.st_size
+        etag = f'"{stat.st_mtime_ns:x}-{size:x}"'
+        last_modified = stat.st_mtime
+
         content_type, _ = mimetypes.guess_type(full_path)
         content_type = content_type or "application/octet-stream"
 
-        range_header = request.headers.get("Range")
+        # 304 / 412 before touching the file
+        response = get_conditional_response(
+            request,
+            etag=etag,
+            last_modified=int(last_modified),
+        )
+        if response is None:
+            response = self.file_response(request, full_path, size, etag, last_modified, content_type)
 
-        if range_header:
-            # Example: bytes=12345-
-            start_str, end_str = range_header.replace("bytes=", "").split("-")
-            start = int(start_str)
-            end = int(end_str) if end_str else file_size - 1
-            end = min(end, file_size - 1)
-            length = end - start + 1
+        response["Cache-Control"] = "public, max-age=86400"
+        return with_validators(response, etag, last_modified)
 
-            response = StreamingHttpResponse(
-                file_iterator(full_path, offset=start, length=length),
-                status=206,
-                content_type=content_type,
+    def file_response(self, request, full_path, size, etag, last_modified, content_type):
+        ranges, unsatisfiable = resolve_ranges(request, size, etag, last_modified)
+        if unsatisfiable:
+            return unsatisfiable
+
+        if ranges and len(ranges) == 1:
+            start, end = ranges[0]
+            return single_range_response(full_path, start, end, size, content_type)
+
+        if ranges:
+            return multi_range_response(
+                lambda start, end: iter_file_range(full_path, start, end),
+                ranges,
+                size,
+                content_type,
             )
 
-            response["Content-Range"] = f"bytes {start}-{end}/{file_size}"
-            response["Content-Length"] = str(length)
-        else:
-            response = StreamingHttpResponse(
-                file_iterator(full_path),
-                content_type=content_type,
+        response = FileResponse(FileRange(full_path), content_type=content_type)
+        response.block_size = chunk_size_for(size)
+        response["Content-Length"] = str(size)
+        return response
+
+    # ──────────────── R2 PROXY ────────────────
+
+    def get_from_r2(self, request, key):
+        auth = CookiesJWTAuthentication().authenticate(request)
+        if auth is None:
+            return HttpResponse(status=401)
+
+        if not can_access_media(auth[0], key):
+            return HttpResponse(status=403)
+
+        obj = head_object(key)
+        if obj is None:
+            raise Http404("File not found")
+
+        response = get_conditional_response(
+            request,
+            etag=obj.etag,
+            last_modified=obj.last_modified,
+        )
+        if response is None:
+            response = self.proxy_response(request, obj)
+
+        # Private: the ACL depends on the user
+        response["Cache-Control"] = "private, max-age=300"
+        return with_validators(response, obj.etag, obj.last_modified)
+
+    def proxy_response(self, request, obj):
+        ranges, unsatisfiable = resolve_ranges(request, obj.size, obj.etag, obj.last_modified)
+        if unsatisfiable:
+            return unsatisfiable
+
+        if ranges and len(ranges) > 1:
+            return multi_range_response(
+                lambda start, end: iter_object_range(obj, start, end),
+                ranges,
+                obj.size,
+                obj.content_type,
             )
-            response["Content-Length"] = str(file_size)
 
-        response["Accept-Ranges"] = "bytes"
-        response["Cache-Control"] = "public, max-age=86400"
+        start, end = ranges[0] if ranges else (0, obj.size - 1)
+        cache = HeadCache.from_settings()
+
+        cached_path = cache.lookup(obj, end)
+        if cached_path:
+            response = single_range_response(cached_path, start, end, obj.size, obj.content_type)
+            if not ranges:
+                response.status_code = 200
+                del response["Content-Range"]
+            return response
 
+        length = end - start + 1
+        response = StreamingHttpResponse(
+            cache.tee(obj, start, iter_object_range(obj, start, end)) if length else iter(()),
+            status=206 if ranges else 200,
+            content_type=obj.content_type,
+        )
+        if ranges:
+            response["Content-Range"] = f"bytes {start}-{end}/{obj.size}"
+        response["Content-Length"] = str(length)
         return response
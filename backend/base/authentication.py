@@ -1,7 +1,191 @@
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import cached_property
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import AuthenticationFailed
 from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import BlacklistMixin
+
+
+# ─────────────────────────────────────────────
+# PER-PROCESS CACHES (bounded, expiring)
+# ─────────────────────────────────────────────
+
+class ExpiringCache:
+    """
+    Thread-safe LRU whose entries each carry their own expiry, with hit /
+    miss / eviction counters for metrics().
+    """
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.evictions = self.expirations = 0
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached and cached[0] <= now:
+                del self._entries[key]
+                self.expirations += 1
+                cached = None
+            if not cached:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return cached[1]
+
+    def set(self, key, value, ttl):
+        if not self.enabled or ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self):
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class UserCache(ExpiringCache):
+    """
+    Recently authenticated users by id (a string, as in the token), so a
+    burst of API calls from one client costs one `SELECT` on the user table
+    instead of one per request.
+
+    Entries are dropped on User save/delete in this process (base.signals)
+    and expire after `ttl` seconds everywhere else, which bounds how long
+    another worker can keep honouring a deactivated account.
+    """
+
+    def __init__(self, ttl, max_entries):
+        super().__init__(max_entries)
+        self.ttl = ttl
+
+    @classmethod
+    def from_settings(cls):
+        return cls(
+            ttl=getattr(settings, "JWT_USER_CACHE_TTL", 60),
+            max_entries=getattr(settings, "JWT_USER_CACHE_SIZE", 1024),
+        )
+
+    @property
+    def enabled(self):
+        return self.ttl > 0 and super().enabled
+
+    def get(self, user_id):
+        user = super().get(str(user_id))
+        # Views get their own instance to scribble on
+        return copy.copy(user) if user is not None else None
+
+    def set(self, user_id, user):
+        super().set(str(user_id), copy.copy(user), self.ttl)
+
+    def invalidate(self, user_id):
+        super().invalidate(str(user_id))
+
+
+class TokenCache(ExpiringCache):
+    """
+    Validated access tokens keyed by a hash of the raw token, kept until
+    the token's own `exp`.
+
+    A page firing dozens of API/media requests verifies its cookie once
+    instead of once per request. Only plain access tokens are cached:
+    they can't be blacklisted (simplejwt blacklists refresh and sliding
+    tokens, which always go through full verification), and refresh
+    rotation never revokes an access token early, so a hit accepts
+    exactly the tokens a full decode would. A token that fails
+    verification is never stored.
+    """
+
+    @classmethod
+    def from_settings(cls):
+        return cls(max_entries=getattr(settings, "JWT_TOKEN_CACHE_SIZE", 4096))
 
+    @staticmethod
+    def key_for(raw_token):
+        if isinstance(raw_token, str):
+            raw_token = raw_token.encode("utf-8")
+        return hashlib.sha256(raw_token).digest()
+
+    def add(self, key, token):
+        if isinstance(token, BlacklistMixin):
+            return
+        exp = token.get("exp")
+        if exp is not None:
+            self.set(key, token, exp - time.time())
+
+
+user_cache = UserCache.from_settings()
+token_cache = TokenCache.from_settings()
+
+AUTH_CACHES = {"user": user_cache, "token": token_cache}
+
+
+def auth_cache_metrics():
+    return {name: auth_cache.metrics() for name, auth_cache in AUTH_CACHES.items()}
+
+
+def prometheus_lines():
+    """
+    Auth cache counters and sizes in Prometheus text format (for
+    /api/ops/metrics/).
+    """
+    metrics = auth_cache_metrics()
+    lookups, entries = "auth_cache_lookups_total", "auth_cache_entries"
+    lines = [f"# HELP {lookups} Auth cache lookups by cache and outcome.", f"# TYPE {lookups} counter"]
+    for name, values in metrics.items():
+        for result in ("hits", "misses"):
+            lines.append(f'{lookups}{{cache="{name}",result="{result}"}} {values[result]}')
+
+    removed = "auth_cache_removals_total"
+    lines += [f"# HELP {removed} Auth cache entries dropped by cache and reason.", f"# TYPE {removed} counter"]
+    for name, values in metrics.items():
+        for reason in ("evictions", "expirations"):
+            lines.append(f'{removed}{{cache="{name}",reason="{reason}"}} {values[reason]}')
+
+    lines += [f"# HELP {entries} Entries held per auth cache.", f"# TYPE {entries} gauge"]
+    for name, values in metrics.items():
+        lines.append(f'{entries}{{cache="{name}"}} {values["size"]}')
+    return lines
+
+
+# ─────────────────────────────────────────────
+# COOKIE AUTHENTICATION
+# ─────────────────────────────────────────────
 
 class CookiesJWTAuthentication(JWTAuthentication):
     def authenticate(self, request):
@@ -17,3 +201,54 @@ class CookiesJWTAuthentication(JWTAuthentication):
             return None
 
         return (user, validated_token)
+
+    def get_validated_token(self, raw_token):
+        if not token_cache.enabled:
+            return super().get_validated_token(raw_token)
+
+        key = token_cache.key_for(raw_token)
+        token = token_cache.get(key)
+        if token is None:
+            token = super().get_validated_token(raw_token)
+            token_cache.add(key, token)
+        return token
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if user_id is None or not user_cache.enabled:
+            return super().get_user(validated_token)
+
+        user = user_cache.get(user_id)
+        if user is None:
+            # Lookup plus is_active / revocation checks; only users that
+            # passed them are cached
+            user = super().get_user(validated_token)
+            user_cache.set(user_id, user)
+        return user
+
+
+class ClaimsUser(TokenUser):
+    """
+    Token-backed user: id, username, role and is_staff come from the
+    access token claims (see base.serializers.CustomTokenObtainPairSerializer).
+    """
+
+    @cached_property
+    def role(self):
+        return self.token.get("role", "client")
+
+
+class CookiesJWTClaimsAuthentication(CookiesJWTAuthentication):
+    """
+    Cookie JWT auth without a database lookup.
+
+    For read-only endpoints that only need "is this a signed-in user":
+    request.user is a ClaimsUser, not a User row, so it must not be saved
+    or used as a foreign key value (use request.user.id). An account that
+    is deactivated keeps access here until its access token expires.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        return ClaimsUser(validated_token)
@@ -0,0 +1,284 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db.backends.signals import connection_created
+
+logger = logging.getLogger(__name__)
+
+
+# SQL kept per request for slow-request logs
+MAX_RECORDED_QUERIES = 50
+
+
+# ─────────────────────────────────────────────
+# PER-REQUEST RECORDER
+# ─────────────────────────────────────────────
+# Held in a context variable, so queries run by sync_to_async (async
+# views) and S3 calls made anywhere in the request are attributed to it.
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = []
+        self.r2_calls = 0
+        self.r2_time = 0.0
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.db_time += seconds
+        if len(self.statements) < MAX_RECORDED_QUERIES:
+            self.statements.append((sql, seconds))
+
+    def add_r2_call(self, seconds):
+        self.r2_calls += 1
+        self.r2_time += seconds
+
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+
+
+def current_metrics():
+    return _current.get()
+
+
+@contextmanager
+def recording():
+    """
+    Attribute queries and R2 calls made inside the block to a fresh
+    RequestMetrics.
+    """
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+# ─────────────────────────────────────────────
+# DATABASE
+# ─────────────────────────────────────────────
+
+def record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    # connection_created fires on every (re)connect of the same wrapper.
+    # Outermost, so execute_wrapper() blocks that pop() their own keep working.
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+connection_created.connect(install_query_recorder)
+
+
+# ─────────────────────────────────────────────
+# R2 / S3 CLIENTS
+# ─────────────────────────────────────────────
+
+def _before_call(model, context, **kwargs):
+    context["instrumentation"] = (model.name, time.perf_counter())
+
+
+def _after_call(context, **kwargs):
+    # after-call-error carries no model, so the operation comes from before-call
+    operation, started = context.pop("instrumentation", (None, None))
+    if started is None:
+        return
+    seconds = time.perf_counter() - started
+
+    r2_call_seconds.observe(seconds, operation=operation)
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.add_r2_call(seconds)
+
+
+def instrument_s3_client(client):
+    """
+    Time every API call a boto3 S3 client makes (botocore events). Safe
+    to call more than once per client.
+    """
+    if getattr(client, "_instrumented", False):
+        return client
+    client.meta.events.register("before-call.s3", _before_call)
+    client.meta.events.register("after-call.s3", _after_call)
+    client.meta.events.register("after-call-error.s3", _after_call)
+    client._instrumented = True
+    return client
+
+
+# ─────────────────────────────────────────────
+# PROMETHEUS-STYLE METRICS (per process)
+# ─────────────────────────────────────────────
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(values):
+    if not values:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in values) + "}"
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help_text = help_text
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_labels(key)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0, 0.0]
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, count, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f"{self.name}_bucket{_labels(key + (('le', bound),))} {cumulative}")
+                lines.append(f"{self.name}_bucket{_labels(key + (('le', '+Inf'),))} {count}")
+                lines.append(f"{self.name}_sum{_labels(key)} {total}")
+                lines.append(f"{self.name}_count{_labels(key)} {count}")
+        return lines
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+requests_total = Counter("http_requests_total", "Requests by view, method and status.")
+request_seconds = Histogram(
+    "http_request_duration_seconds", "Time to response headers, by view.", LATENCY_BUCKETS
+)
+request_queries = Histogram(
+    "http_request_db_queries", "Database queries per request, by view.", QUERY_BUCKETS
+)
+request_db_seconds = Histogram(
+    "http_request_db_seconds", "Database time per request, by view.", LATENCY_BUCKETS
+)
+r2_call_seconds = Histogram(
+    "r2_call_duration_seconds", "R2 (S3 API) call latency, by operation.", LATENCY_BUCKETS
+)
+
+METRICS = [requests_total, request_seconds, request_queries, request_db_seconds, r2_call_seconds]
+
+
+def render_metrics(extra_lines=()):
+    """
+    Prometheus text exposition of this process's metrics.
+    """
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    lines.extend(extra_lines)
+    return "\n".join(lines) + "\n"
+
+
+# ─────────────────────────────────────────────
+# REQUEST REPORTING
+# ─────────────────────────────────────────────
+
+def view_label(request):
+    match = getattr(request, "resolver_match", None)
+    if match is None:
+        return "unresolved"
+    return match.view_name or match.route
+
+
+def server_timing(metrics, total):
+    return ", ".join([
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f'r2;dur={metrics.r2_time * 1000:.1f};desc="{metrics.r2_calls} calls"',
+        f"total;dur={total * 1000:.1f}",
+    ])
+
+
+def finish_request(request, response, metrics):
+    """
+    Server-Timing header, histograms, and a structured log line; requests
+    over SLOW_REQUEST_MS or SLOW_REQUEST_QUERIES also log their SQL.
+    """
+    total = time.perf_counter() - metrics.started
+    view = view_label(request)
+
+    response["Server-Timing"] = server_timing(metrics, total)
+
+    requests_total.inc(view=view, method=request.method, status=response.status_code)
+    request_seconds.observe(total, view=view)
+    request_queries.observe(metrics.queries, view=view)
+    request_db_seconds.observe(metrics.db_time, view=view)
+
+    record = {
+        "method": request.method,
+        "path": request.path,
+        "view": view,
+        "status": response.status_code,
+        "ms": round(total * 1000, 1),
+        "queries": metrics.queries,
+        "db_ms": round(metrics.db_time * 1000, 1),
+        "r2_calls": metrics.r2_calls,
+        "r2_ms": round(metrics.r2_time * 1000, 1),
+    }
+
+    slow = (
+        total * 1000 >= getattr(settings, "SLOW_REQUEST_MS", 500)
+        or metrics.queries >= getattr(settings, "SLOW_REQUEST_QUERIES", 20)
+    )
+    if slow:
+        record["sql"] = [
+            {"ms": round(seconds * 1000, 2), "sql": sql}
+            for sql, seconds in metrics.statements
+        ]
+        logger.warning("slow request %s", json.dumps(record))
+    else:
+        logger.info("request %s", json.dumps(record))
+    return response
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from base.token_blacklist import BATCH_PAUSE, BATCH_SIZE, compact_expired_tokens, table_counts
+
+
+class Command(BaseCommand):
+    help = "Delete expired OutstandingToken/BlacklistedToken rows in bounded batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop after this many batches (default: until nothing has expired)",
+        )
+        parser.add_argument(
+            "--pause",
+            type=float,
+            default=BATCH_PAUSE,
+            help="Seconds to sleep between batches",
+        )
+
+    def handle(self, *args, **options):
+        before = table_counts()
+        self.stdout.write(
+            f"Before: {before['outstanding']} outstanding, {before['blacklisted']} blacklisted"
+        )
+
+        result = compact_expired_tokens(
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+            pause=options["pause"],
+        )
+
+        after = table_counts()
+        self.stdout.write(
+            f"After:  {after['outstanding']} outstanding, {after['blacklisted']} blacklisted"
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Deleted {result['outstanding']} outstanding and {result['blacklisted']} "
+            f"blacklisted tokens in {result['batches']} batches ({result['seconds']}s)"
+        ))
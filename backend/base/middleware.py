@@ -0,0 +1,158 @@
+import gzip
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from .instrumentation import finish_request, recording
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = ("application/json",)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+# ─────────────────────────────────────────────
+# CONTENT NEGOTIATION
+# ─────────────────────────────────────────────
+
+def accepted_encodings(header):
+    """
+    {coding: q} from an Accept-Encoding header.
+    """
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+def choose_encoding(header):
+    """
+    "br", "gzip" or None for an Accept-Encoding header. Brotli wins ties
+    (smaller JSON) when the brotli module is installed.
+    """
+    accepted = accepted_encodings(header)
+    wildcard = accepted.get("*", 0.0)
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    best, best_q = None, 0.0
+    for coding in candidates:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+# ─────────────────────────────────────────────
+# MIDDLEWARE
+# ─────────────────────────────────────────────
+
+def compress_response(request, response):
+    content_type = response.get("Content-Type", "").split(";")[0].strip()
+    if (
+        # Media / file streams (and WhiteNoise's own precompressed files)
+        response.streaming
+        or content_type not in COMPRESSIBLE_TYPES
+        or response.has_header("Content-Encoding")
+    ):
+        return response
+
+    patch_vary_headers(response, ("Accept-Encoding",))
+
+    # Auth responses carry tokens next to reflected input (BREACH)
+    if response.cookies:
+        return response
+    if len(response.content) < getattr(settings, "COMPRESS_MIN_SIZE", 1024):
+        return response
+
+    encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+    if encoding is None:
+        return response
+
+    compressed = compress(response.content, encoding)
+    if len(compressed) >= len(response.content):
+        return response
+
+    response.content = compressed
+    response["Content-Length"] = str(len(compressed))
+    response["Content-Encoding"] = encoding
+
+    # The representation changed, so a strong validator no longer holds
+    etag = response.get("ETag")
+    if etag and etag.startswith('"'):
+        response["ETag"] = "W/" + etag
+    return response
+
+
+class CompressionMiddleware:
+    """
+    gzip / brotli for JSON API responses above COMPRESS_MIN_SIZE, chosen
+    from Accept-Encoding. Sync and async capable, so the async views
+    don't pay a thread hop for it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return compress_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return compress_response(request, await self.get_response(request))
+
+
+class InstrumentationMiddleware:
+    """
+    Per-request query count, DB time, R2 calls and latency: Server-Timing
+    header, histograms and a structured log line (base.instrumentation).
+    Listed first, so the total covers the other middleware too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        with recording() as metrics:
+            response = self.get_response(request)
+        return finish_request(request, response, metrics)
+
+    async def __acall__(self, request):
+        with recording() as metrics:
+            response = await self.get_response(request)
+        return finish_request(request, response, metrics)
@@ -0,0 +1,32 @@
+from django.db import migrations
+
+
+INDEX = "base_outstandingtoken_expires_at_idx"
+TABLE = "token_blacklist_outstandingtoken"
+
+
+def create_index(apps, schema_editor):
+    # token_blacklist ships no index on expires_at; compaction range-scans it
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(
+        f"CREATE INDEX {concurrently}IF NOT EXISTS {INDEX} ON {TABLE} (expires_at)"
+    )
+
+
+def drop_index(apps, schema_editor):
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    # CREATE INDEX CONCURRENTLY can't run inside a transaction
+    atomic = False
+
+    dependencies = [
+        ('base', '0004_alter_user_role'),
+        ('token_blacklist', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
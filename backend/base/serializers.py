@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import User, Todo
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 
 from rest_framework import serializers
@@ -50,3 +51,19 @@ class TodoSerializer(serializers.ModelSerializer):
     class Meta:
         model = Todo
         fields = ['id', 'name', 'completed']
+
+
+class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Adds the claims ClaimsUser reads, so token-backed endpoints can
+    authorise without loading the user row. Refreshed access tokens copy
+    them from the refresh token.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token["username"] = user.username
+        token["role"] = user.role
+        token["is_staff"] = user.is_staff
+        return token
@@ -1,3 +1,428 @@
-from django.test import TestCase
+import gzip
+import io
+import logging
+import uuid
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock, skipUnless
 
-# Create your tests here.
+import orjson
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.exceptions import ParseError
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, BlacklistMixin, RefreshToken, SlidingToken
+
+from .authentication import TokenCache, token_cache, user_cache
+from .middleware import CompressionMiddleware, brotli, choose_encoding
+from .models import Todo, User
+from .renderers import ORJSONParser, ORJSONRenderer
+from .serializers import CustomTokenObtainPairSerializer
+from .token_blacklist import compact_expired_tokens, table_counts
+
+
+LOCAL_CACHE = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
+TODOS = 50
+
+
+# No background blacklist compaction thread against the test database
+@override_settings(ALLOWED_HOSTS=["testserver"], CACHES=LOCAL_CACHE, TOKEN_BLACKLIST_COMPACT_INTERVAL=0)
+class AuthQueryTests(TestCase):
+    """
+    Query bounds for the auth endpoints: login, refresh (with rotation and
+    blacklisting), session check, logout, register and the todo list.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="singer", password="pw")
+        Todo.objects.bulk_create(
+            [Todo(owner=cls.user, name=f"Todo {n}") for n in range(TODOS)]
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Per-request and slow-request log lines (base.instrumentation)
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+    @contextmanager
+    def budget(self, queries):
+        with CaptureQueriesContext(connection) as captured:
+            yield
+        self.assertLessEqual(
+            len(captured), queries,
+            f"{len(captured)} queries (budget {queries}):\n"
+            + "\n".join(query["sql"] for query in captured.captured_queries),
+        )
+
+    def post(self, name, data=None, status=200):
+        response = self.client.post(reverse(name), data or {}, content_type="application/json")
+        self.assertEqual(response.status_code, status, response.content[:500])
+        return response
+
+    def login(self):
+        return self.post("token_obtain_pair", {"username": "singer", "password": "pw"})
+
+    def test_login(self):
+        # user + last_login update + outstanding token
+        with self.budget(queries=4):
+            response = self.login()
+        self.assertIn("access_token", response.cookies)
+        self.assertIn("refresh_token", response.cookies)
+
+    def test_bad_login(self):
+        with self.budget(queries=1):
+            self.post("token_obtain_pair", {"username": "singer", "password": "no"}, status=401)
+
+    def test_refresh(self):
+        self.login()
+        # Blacklist check, then simplejwt's rotation: blacklist the old
+        # token and record the new one (each in a savepoint)
+        with self.budget(queries=13):
+            response = self.post("token_refresh")
+        self.assertEqual(response.json(), {"refreshed": True})
+
+    def test_authenticated(self):
+        self.login()
+        with self.budget(queries=1):
+            response = self.client.get(reverse("authenticated"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "singer")
+
+    def test_todos(self):
+        self.login()
+        with self.budget(queries=2):
+            response = self.client.get(reverse("todos"))
+        self.assertEqual(len(response.json()), TODOS)
+
+    def test_logout(self):
+        self.login()
+        # Blacklist check + user, then blacklisting the refresh token
+        with self.budget(queries=7):
+            self.post("logout")
+
+    def test_register(self):
+        with self.budget(queries=3):
+            self.post("register", {"username": "new", "password": "a-long-password"}, status=201)
+
+
+# ─────────────────────────────────────────────
+# AUTH CACHES
+# ─────────────────────────────────────────────
+
+@override_settings(ALLOWED_HOSTS=["testserver"], CACHES=LOCAL_CACHE)
+class UserCacheTests(TestCase):
+    """
+    Cached users are dropped on save/delete (base.signals), so the next
+    request sees the change.
+    """
+
+    def setUp(self):
+        cache.clear()
+        user_cache.clear()
+        token_cache.clear()
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+        self.user = User.objects.create_user(username="singer", password="pw")
+        token = CustomTokenObtainPairSerializer.get_token(self.user)
+        self.client.cookies["access_token"] = str(token.access_token)
+
+    def whoami(self, status=200):
+        response = self.client.get(reverse("authenticated"))
+        self.assertEqual(response.status_code, status, response.content[:500])
+        return response.json()
+
+    def test_cached(self):
+        self.whoami()
+        with self.assertNumQueries(0):
+            self.assertEqual(self.whoami()["username"], "singer")
+
+    def test_rename(self):
+        self.whoami()
+        self.user.username = "soloist"
+        self.user.save()
+        self.assertEqual(self.whoami()["username"], "soloist")
+
+    def test_deactivate(self):
+        self.whoami()
+        self.user.is_active = False
+        self.user.save(update_fields=["is_active"])
+        self.whoami(status=401)
+
+    def test_delete(self):
+        self.whoami()
+        self.user.delete()
+        self.whoami(status=401)
+
+
+class FakeClock:
+    """
+    Stands in for the `time` module in base.authentication.
+    """
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now - 999_000.0
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class TokenCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch("base.authentication.time", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.cache = TokenCache(max_entries=8)
+
+    def access_token(self, lifetime):
+        token = AccessToken()
+        token["exp"] = int(self.clock.time() + lifetime)
+        return token
+
+    def test_expires_at_exp(self):
+        token = self.access_token(300)
+        self.cache.add(b"key", token)
+
+        self.clock.advance(299)
+        self.assertIs(self.cache.get(b"key"), token)
+
+        self.clock.advance(1)
+        self.assertIsNone(self.cache.get(b"key"))
+        self.assertEqual(self.cache.metrics()["expirations"], 1)
+
+    def test_expired_token_is_not_stored(self):
+        self.cache.add(b"key", self.access_token(-1))
+        self.assertEqual(self.cache.metrics()["size"], 0)
+
+    def test_blacklistable_tokens_are_never_cached(self):
+        for token in (RefreshToken(), SlidingToken()):
+            with self.subTest(type(token).__name__):
+                self.assertIsInstance(token, BlacklistMixin)
+                self.cache.add(b"key", token)
+                self.assertIsNone(self.cache.get(b"key"))
+        self.assertEqual(self.cache.metrics()["size"], 0)
+
+
+# ─────────────────────────────────────────────
+# TOKEN BLACKLIST COMPACTION
+# ─────────────────────────────────────────────
+
+@override_settings(ALLOWED_HOSTS=["testserver"], CACHES=LOCAL_CACHE, TOKEN_BLACKLIST_COMPACT_INTERVAL=0)
+class TokenBlacklistCompactionTests(TestCase):
+    EXPIRED = 7
+    EXPIRED_BLACKLISTED = 4
+
+    def setUp(self):
+        logging.disable(logging.WARNING)
+        self.addCleanup(logging.disable, logging.NOTSET)
+
+        self.user = User.objects.create_user(username="singer", password="pw")
+        now = timezone.now()
+
+        expired = OutstandingToken.objects.bulk_create([
+            OutstandingToken(
+                user=self.user,
+                jti=f"expired-{n}",
+                token=f"expired-{n}",
+                expires_at=now - timedelta(hours=n + 1),
+            )
+            for n in range(self.EXPIRED)
+        ])
+        BlacklistedToken.objects.bulk_create([
+            BlacklistedToken(token=token) for token in expired[:self.EXPIRED_BLACKLISTED]
+        ])
+
+        # Unexpired: one plain row, and a real refresh token that was revoked
+        OutstandingToken.objects.create(
+            user=self.user, jti="live", token="live", expires_at=now + timedelta(hours=1),
+        )
+        self.revoked = RefreshToken.for_user(self.user)
+        self.revoked.blacklist()
+
+    def test_batches(self):
+        result = compact_expired_tokens(batch_size=3, pause=0)
+
+        self.assertEqual(
+            (result["outstanding"], result["blacklisted"], result["batches"]),
+            (self.EXPIRED, self.EXPIRED_BLACKLISTED, 3),
+        )
+        self.assertEqual(table_counts(), {"outstanding": 2, "blacklisted": 1})
+        self.assertTrue(BlacklistedToken.objects.filter(token__jti=self.revoked["jti"]).exists())
+
+    def test_max_batches(self):
+        result = compact_expired_tokens(batch_size=3, max_batches=1, pause=0)
+
+        self.assertEqual(result["batches"], 1)
+        self.assertEqual(result["outstanding"], 3)
+        # Oldest first
+        self.assertFalse(OutstandingToken.objects.filter(jti="expired-6").exists())
+        self.assertEqual(table_counts()["outstanding"], self.EXPIRED - 3 + 2)
+
+    def test_revoked_token_stays_rejected(self):
+        compact_expired_tokens(pause=0)
+
+        self.client.cookies["refresh_token"] = str(self.revoked)
+        response = self.client.post(reverse("token_refresh"), {}, content_type="application/json")
+        self.assertEqual(response.status_code, 401, response.content[:500])
+
+    def test_command(self):
+        out = io.StringIO()
+        call_command("compact_token_blacklist", "--batch-size", "3", "--pause", "0", stdout=out)
+
+        self.assertIn(
+            f"Deleted {self.EXPIRED} outstanding and {self.EXPIRED_BLACKLISTED} "
+            "blacklisted tokens in 3 batches",
+            out.getvalue(),
+        )
+        self.assertEqual(table_counts(), {"outstanding": 2, "blacklisted": 1})
+
+
+# ─────────────────────────────────────────────
+# RESPONSE COMPRESSION
+# ─────────────────────────────────────────────
+
+BODY = orjson.dumps([{"id": n, "title": f"Song {n}"} for n in range(200)])
+
+
+@override_settings(COMPRESS_MIN_SIZE=1024)
+class CompressionTests(SimpleTestCase):
+
+    def respond(self, response, accept="gzip, deflate, br"):
+        request = RequestFactory().get("/", HTTP_ACCEPT_ENCODING=accept)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def json(self, body=BODY, **headers):
+        response = HttpResponse(body, content_type="application/json")
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    def assertUntouched(self, response, body=BODY):
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertEqual(response.content, body)
+
+    def test_negotiation(self):
+        for header, expected in (
+            ("", None),
+            ("identity", None),
+            ("gzip", "gzip"),
+            ("gzip, deflate, br", "br" if brotli else "gzip"),
+            ("br;q=0.5, gzip", "gzip"),
+            ("br;q=0, gzip;q=0", None),
+            ("GZIP;q=0.8", "gzip"),
+            ("*", "br" if brotli else "gzip"),
+            ("br;q=0, *", "gzip"),
+            ("*;q=0", None),
+            ("gzip;q=abc", None),
+        ):
+            with self.subTest(header):
+                self.assertEqual(choose_encoding(header), expected)
+
+    def test_gzip(self):
+        response = self.respond(self.json(ETag='"v1"'), accept="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), BODY)
+        self.assertEqual(response["Content-Length"], str(len(response.content)))
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        # The compressed bytes differ: a strong validator becomes weak
+        self.assertEqual(response["ETag"], 'W/"v1"')
+
+    @skipUnless(brotli, "needs brotli")
+    def test_brotli(self):
+        response = self.respond(self.json(ETag='W/"v1"'))
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(brotli.decompress(response.content), BODY)
+        self.assertEqual(response["ETag"], 'W/"v1"')
+
+    def test_vary_is_appended(self):
+        response = self.respond(self.json(Vary="Cookie"), accept="gzip")
+        self.assertEqual(response["Vary"], "Cookie, Accept-Encoding")
+
+    def test_refused_encodings(self):
+        response = self.respond(self.json(), accept="br;q=0, gzip;q=0")
+        self.assertUntouched(response)
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_small_response(self):
+        response = self.respond(self.json(b'{"ok":true}'))
+        self.assertUntouched(response, b'{"ok":true}')
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+
+    def test_left_alone(self):
+        encoded = self.json(**{"Content-Encoding": "gzip"})
+        html = HttpResponse(BODY, content_type="text/html")
+        with_cookie = self.json()
+        with_cookie.set_cookie("access_token", "secret")
+
+        for name, response, encoding in (
+            ("already encoded", encoded, "gzip"),
+            ("not JSON", html, None),
+            ("sets cookies", with_cookie, None),
+        ):
+            with self.subTest(name):
+                response = self.respond(response)
+                self.assertEqual(response.content, BODY)
+                self.assertEqual(response.get("Content-Encoding"), encoding)
+
+    def test_streaming(self):
+        response = self.respond(StreamingHttpResponse(iter([BODY]), content_type="application/json"))
+
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertFalse(response.has_header("Vary"))
+        self.assertEqual(b"".join(response.streaming_content), BODY)
+
+
+# ─────────────────────────────────────────────
+# ORJSON RENDERER / PARSER
+# ─────────────────────────────────────────────
+
+class ORJSONTests(SimpleTestCase):
+    data = {
+        "price": Decimal("9.99"),
+        "created_at": datetime(2026, 3, 1, 12, 30, 5, 123456, tzinfo=dt_timezone.utc),
+        "local": datetime(2026, 3, 1, 12, 30, 5),
+        "offset": datetime(2026, 3, 1, 12, 30, tzinfo=dt_timezone(timedelta(hours=2))),
+        "day": date(2026, 3, 1),
+        "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+        "title": "Café ♪",
+        "scores": [1, 2.5, None, True],
+        "nested": {"ids": [uuid.UUID(int=1)], 7: "int key"},
+    }
+
+    def test_matches_drf(self):
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+
+    def test_none(self):
+        self.assertEqual(ORJSONRenderer().render(None), b"")
+
+    def test_parse(self):
+        parsed = ORJSONParser().parse(io.BytesIO(ORJSONRenderer().render(self.data)))
+
+        self.assertEqual(parsed["id"], str(self.data["id"]))
+        self.assertEqual(parsed["created_at"], "2026-03-01T12:30:05.123456Z")
+        self.assertEqual(parsed["nested"], {"ids": [str(uuid.UUID(int=1))], "7": "int key"})
+
+    def test_parse_error(self):
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(io.BytesIO(b'{"unterminated": '))
@@ -0,0 +1,129 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_SIZE = 1000
+# Between batches, so other writers get the tables back
+BATCH_PAUSE = 0.05
+
+
+# ─────────────────────────────────────────────
+# COMPACTION
+# ─────────────────────────────────────────────
+
+def table_counts():
+    return {
+        "outstanding": OutstandingToken.objects.count(),
+        "blacklisted": BlacklistedToken.objects.count(),
+    }
+
+
+def delete_expired_batch(now, batch_size=BATCH_SIZE):
+    """
+    Delete up to `batch_size` expired tokens (and their blacklist rows) in
+    one short transaction. Returns (outstanding, blacklisted) deleted.
+
+    Expired refresh tokens are rejected on their `exp` claim alone, so
+    neither their OutstandingToken nor their BlacklistedToken row is ever
+    consulted again.
+    """
+    with transaction.atomic():
+        ids = list(
+            OutstandingToken.objects
+            .filter(expires_at__lt=now)
+            .order_by("expires_at")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return 0, 0
+
+        blacklisted, _ = BlacklistedToken.objects.filter(token_id__in=ids).delete()
+        outstanding, _ = OutstandingToken.objects.filter(id__in=ids).delete()
+        return outstanding, blacklisted
+
+
+def compact_expired_tokens(batch_size=BATCH_SIZE, max_batches=None, pause=BATCH_PAUSE):
+    """
+    Delete expired token_blacklist rows in bounded batches.
+
+    Each batch is its own transaction keyed off the expires_at index
+    (base migration 0005), so row locks are held for one batch at a time.
+    Returns {"outstanding", "blacklisted", "batches", "seconds"}.
+    """
+    now = timezone.now()
+    started = time.monotonic()
+    result = {"outstanding": 0, "blacklisted": 0, "batches": 0}
+
+    while max_batches is None or result["batches"] < max_batches:
+        outstanding, blacklisted = delete_expired_batch(now, batch_size)
+        if not outstanding:
+            break
+
+        result["outstanding"] += outstanding
+        result["blacklisted"] += blacklisted
+        result["batches"] += 1
+
+        if outstanding < batch_size:
+            break
+        if pause:
+            time.sleep(pause)
+
+    result["seconds"] = round(time.monotonic() - started, 3)
+    return result
+
+
+# ─────────────────────────────────────────────
+# IN-PROCESS SCHEDULING
+# ─────────────────────────────────────────────
+
+_last_run = None
+_running = threading.Lock()
+
+
+def maybe_compact_in_background():
+    """
+    Kick off a bounded compaction pass in a daemon thread at most once per
+    TOKEN_BLACKLIST_COMPACT_INTERVAL seconds per process (0 disables).
+
+    Called after token refreshes, which are what grow the tables, so
+    deployments without a cron still stay compact.
+    """
+    global _last_run
+
+    interval = getattr(settings, "TOKEN_BLACKLIST_COMPACT_INTERVAL", 3600)
+    if interval <= 0:
+        return
+
+    now = time.monotonic()
+    if _last_run is not None and now - _last_run < interval:
+        return
+    if not _running.acquire(blocking=False):
+        return
+
+    _last_run = now
+    threading.Thread(target=_compact_and_release, daemon=True).start()
+
+
+def _compact_and_release():
+    try:
+        result = compact_expired_tokens(
+            max_batches=getattr(settings, "TOKEN_BLACKLIST_COMPACT_MAX_BATCHES", 10),
+        )
+        if result["outstanding"]:
+            logger.info("Compacted token blacklist: %s", result)
+    except Exception:
+        logger.exception("Token blacklist compaction failed")
+    finally:
+        connections.close_all()
+        _running.release()
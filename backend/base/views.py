@@ -8,10 +8,12 @@ from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from rest_framework_simplejwt.tokens import RefreshToken
 
 from .models import Todo
+from .token_blacklist import maybe_compact_in_background
 from .serializers import (
     TodoSerializer,
     UserRegisterSerializer,
     UserSerializer,
+    CustomTokenObtainPairSerializer,
 )
 
 # ─────────────────────────────────────────────
@@ -63,6 +65,7 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     """
     Login → sets JWT in HttpOnly cookies
     """
+    serializer_class = CustomTokenObtainPairSerializer
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -127,6 +130,9 @@ class CustomTokenRefreshView(TokenRefreshView):
         if new_refresh:
             res.set_cookie("refresh_token", new_refresh, **cookie_kwargs)
 
+        # Rotation is what grows token_blacklist; trim expired rows now and then
+        maybe_compact_in_background()
+
         return res
 
 
@@ -0,0 +1,184 @@
+import random
+from dataclasses import dataclass, field
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+
+from app.models import Artist, MediaBlob, Recording, Song, SongLyricLine
+from app.storage import content_addressed_storage
+from app.utils.catalog import bump_catalog_version
+from app.utils.media_gc import FILE_FIELDS
+from app.utils.stats import rebuild_stats
+
+from .media import lrc_text, recording_media, song_media
+
+
+# Everything generated is recognisable, so a re-seed can remove it first
+USER_PREFIX = "bench-"
+USER_PASSWORD = "bench-password"
+ARTIST_PREFIX = "Bench Artist"
+SONG_PREFIX = "Bench Song"
+
+GENRES = ["pop", "rock", "jazz", "hip-hop", "folk", "classical", "electronic", "r&b"]
+LANGUAGES = ["English", "Hindi", "Spanish"]
+
+BATCH = 2000
+
+
+@dataclass
+class SeedReport:
+    artists: int = 0
+    songs: int = 0
+    lyric_lines: int = 0
+    users: int = 0
+    recordings: int = 0
+    media_objects: list = field(default_factory=list)
+
+
+# ─────────────────────────────────────────────
+# FAKE MEDIA
+# ─────────────────────────────────────────────
+
+def store_media(variants):
+    """
+    Upload `variants` sets of song and recording media through the
+    content-addressed storage; rows share them round-robin.
+    """
+    storage = content_addressed_storage()
+    songs, recordings = [], []
+
+    for variant in range(variants):
+        audio, peaks, cover = song_media(variant)
+        songs.append({
+            "audio_file": storage.save("songs/audio/bench.wav", ContentFile(audio)),
+            "peaks_file": storage.save("songs/peaks/bench.wav.peaks", ContentFile(peaks)),
+            "cover_image": storage.save("song_covers/bench.jpg", ContentFile(cover)),
+            "lrc_file": storage.save(
+                "songs/lyrics/bench.lrc",
+                ContentFile(lrc_text(f"{SONG_PREFIX} {variant}", 40).encode()),
+            ),
+        })
+
+        audio, peaks = recording_media(variant)
+        recordings.append({
+            "audio_file": storage.save("recordings/bench.wav", ContentFile(audio)),
+            "peaks_file": storage.save("recordings/peaks/bench.wav.peaks", ContentFile(peaks)),
+        })
+
+    return songs, recordings
+
+
+def recount_blobs(names):
+    """
+    Set MediaBlob refcounts for `names` from the rows that use them
+    (bulk_create skips the reference counting signals).
+    """
+    from app import models
+
+    for name in set(names):
+        refcount = 0
+        for model_name, fields in FILE_FIELDS.items():
+            uses = Q()
+            for field_name in fields:
+                uses |= Q(**{field_name: name})
+            refcount += getattr(models, model_name).objects.filter(uses).count()
+        MediaBlob.objects.update_or_create(key=name, defaults={"refcount": refcount})
+
+
+# ─────────────────────────────────────────────
+# CATALOG
+# ─────────────────────────────────────────────
+
+def remove_catalog():
+    """
+    Delete previously generated users (and their recordings), songs and
+    artists. Returns the number of rows deleted.
+    """
+    User = get_user_model()
+    deleted = 0
+    with transaction.atomic():
+        deleted += User.objects.filter(username__startswith=USER_PREFIX).delete()[0]
+        deleted += Song.objects.filter(title__startswith=SONG_PREFIX).delete()[0]
+        deleted += Artist.objects.filter(name__startswith=ARTIST_PREFIX).delete()[0]
+    return deleted
+
+
+def seed_catalog(songs, artists, lines, users, recordings, variants=8, seed=0):
+    """
+    Generate a catalog with bulk inserts: `songs` songs over `artists`
+    artists with `lines` lyric lines each, and `users` users with
+    `recordings` scored takes each. Media is real (decodable audio,
+    peaks, covers, LRC) but shared between rows.
+    """
+    rng = random.Random(seed)
+    report = SeedReport()
+    User = get_user_model()
+
+    song_files, recording_files = store_media(variants)
+    report.media_objects = [
+        name for files in song_files + recording_files for name in files.values()
+    ]
+
+    with transaction.atomic():
+        artist_rows = Artist.objects.bulk_create(
+            [Artist(name=f"{ARTIST_PREFIX} {n}") for n in range(artists)],
+            batch_size=BATCH,
+        )
+        song_rows = Song.objects.bulk_create([
+            Song(
+                title=f"{SONG_PREFIX} {n}",
+                artist=artist_rows[n % artists] if artists else None,
+                language=LANGUAGES[n % len(LANGUAGES)],
+                genre=GENRES[n % len(GENRES)],
+                duration=30,
+                **song_files[n % variants],
+            )
+            for n in range(songs)
+        ], batch_size=BATCH)
+
+        pending = []
+        for song in song_rows:
+            pending.extend(
+                SongLyricLine(song=song, timestamp=line * 4.5, text=f"{song.title}, line {line + 1}")
+                for line in range(lines)
+            )
+            if len(pending) >= BATCH:
+                SongLyricLine.objects.bulk_create(pending, batch_size=BATCH)
+                report.lyric_lines += len(pending)
+                pending = []
+        SongLyricLine.objects.bulk_create(pending, batch_size=BATCH)
+        report.lyric_lines += len(pending)
+
+        # One hash for every user: hashing is deliberately slow
+        password = make_password(USER_PASSWORD)
+        user_rows = User.objects.bulk_create(
+            [User(username=f"{USER_PREFIX}{n:04d}", password=password) for n in range(users)],
+            batch_size=BATCH,
+        )
+        takes = Recording.objects.bulk_create([
+            Recording(
+                user=user,
+                song=rng.choice(song_rows),
+                duration=8.0,
+                alignment_offset=0.0,
+                alignment_confidence=0.9,
+                score=round(rng.uniform(40, 100), 1),
+                **recording_files[rng.randrange(variants)],
+            )
+            for user in user_rows
+            for _ in range(recordings)
+        ], batch_size=BATCH)
+
+        recount_blobs(report.media_objects)
+
+    rebuild_stats()
+    bump_catalog_version()
+
+    report.artists = len(artist_rows)
+    report.songs = len(song_rows)
+    report.users = len(user_rows)
+    report.recordings = len(takes)
+    return report
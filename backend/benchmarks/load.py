@@ -0,0 +1,164 @@
+import http.client
+import random
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+
+# ─────────────────────────────────────────────
+# HTTP SESSION (ONE PER VIRTUAL USER)
+# ─────────────────────────────────────────────
+
+class Session:
+    """
+    A keep-alive connection authenticated with one user's access cookie.
+    Every request is timed under its endpoint label.
+    """
+
+    def __init__(self, base_url, access_token, timeout=60):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.prefix = parts.path.rstrip("/")
+        self.timeout = timeout
+        self.headers = {"Cookie": f"access_token={access_token}"}
+        self.samples = []  # (endpoint, seconds, ok)
+        self.conn = None
+
+    def connect(self):
+        self.conn = http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+    def request(self, endpoint, method, path, body=None, content_type=None):
+        if self.conn is None:
+            self.connect()
+        headers = dict(self.headers)
+        if content_type:
+            headers["Content-Type"] = content_type
+
+        started = time.perf_counter()
+        try:
+            self.conn.request(method, self.prefix + path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            content = response.read()
+        except (OSError, http.client.HTTPException):
+            self.samples.append((endpoint, time.perf_counter() - started, False))
+            self.close()
+            return None
+
+        ok = 200 <= response.status < 300
+        self.samples.append((endpoint, time.perf_counter() - started, ok))
+        if response.will_close:
+            self.close()
+        return content if ok else None
+
+    def get(self, endpoint, path):
+        return self.request(f"GET {endpoint}", "GET", path)
+
+    def post(self, endpoint, path, body, content_type):
+        return self.request(f"POST {endpoint}", "POST", path, body, content_type)
+
+
+# ─────────────────────────────────────────────
+# RUNNER
+# ─────────────────────────────────────────────
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))
+    return sorted_values[index]
+
+
+def summarize(samples, elapsed):
+    latencies = sorted(seconds for _, seconds, _ in samples)
+    errors = sum(1 for _, _, ok in samples if not ok)
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def run_scenario(scenario, targets, base_url, tokens, concurrency, duration, seed=0):
+    """
+    Run `scenario` from `concurrency` virtual users (threads, each with its
+    own connection and user token) for `duration` seconds. Returns overall
+    and per-endpoint throughput and latency percentiles.
+    """
+    deadline = time.monotonic() + duration
+    sessions = [
+        Session(base_url, tokens[n % len(tokens)]) for n in range(concurrency)
+    ]
+    iterations = [0] * concurrency
+
+    def user(index):
+        session = sessions[index]
+        rng = random.Random(seed + index)
+        while time.monotonic() < deadline:
+            scenario(session, targets, rng)
+            iterations[index] += 1
+        session.close()
+
+    started = time.monotonic()
+    threads = [threading.Thread(target=user, args=(n,)) for n in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    samples = [sample for session in sessions for sample in session.samples]
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample[0]].append(sample)
+
+    return {
+        "iterations": sum(iterations),
+        "seconds": round(elapsed, 2),
+        **summarize(samples, elapsed),
+        "endpoints": {
+            endpoint: summarize(endpoint_samples, elapsed)
+            for endpoint, endpoint_samples in sorted(by_endpoint.items())
+        },
+    }
+
+
+# ─────────────────────────────────────────────
+# RUN-TO-RUN COMPARISON
+# ─────────────────────────────────────────────
+
+def change(new, old):
+    if not old:
+        return "    n/a"
+    return f"{(new - old) / old:+7.1%}"
+
+
+def compare(report, baseline):
+    """
+    Lines comparing req/s and p95 per endpoint with an earlier report.
+    """
+    lines = []
+    for name, scenario in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if before is None:
+            continue
+        for endpoint, stats in scenario["endpoints"].items():
+            old = before["endpoints"].get(endpoint)
+            if old is None:
+                continue
+            lines.append(
+                f"{name:>16} {endpoint:<24} "
+                f"req/s {old['rps']:8.1f} → {stats['rps']:8.1f} ({change(stats['rps'], old['rps'])})  "
+                f"p95 {old['p95_ms']:7.1f} → {stats['p95_ms']:7.1f} ms ({change(stats['p95_ms'], old['p95_ms'])})"
+            )
+    return lines
@@ -0,0 +1,118 @@
+import json
+import os
+import random
+import subprocess
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from app.models import Recording, Song
+from base.serializers import CustomTokenObtainPairSerializer
+from benchmarks.catalog import USER_PREFIX
+from benchmarks.load import compare, run_scenario
+from benchmarks.scenarios import SCENARIOS, load_targets
+
+
+RESULTS_DIR = os.path.join(settings.BASE_DIR, "benchmarks", "results")
+
+
+def revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        "Run scripted load scenarios (browse, open song, sign media, upload "
+        "recording, list recordings) against a running server and write "
+        "req/s and p50/p95/p99 per endpoint to a JSON report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--url", default="http://127.0.0.1:8000", help="Server under test")
+        parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+        parser.add_argument("--concurrency", type=int, default=16, help="Virtual users (threads)")
+        parser.add_argument("--duration", type=float, default=20.0, help="Seconds per scenario")
+        parser.add_argument("--users", type=int, default=0, help="Seeded users to spread over (default: all)")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help=f"Report path (default: {RESULTS_DIR}/<timestamp>.json)")
+        parser.add_argument("--baseline", help="An earlier report to compare against")
+
+    def handle(self, *args, **options):
+        users = get_user_model().objects.filter(username__startswith=USER_PREFIX).order_by("pk")
+        if options["users"]:
+            users = users[:options["users"]]
+        users = list(users)
+        if not users:
+            raise CommandError("No benchmark users: run `manage.py bench_seed` first")
+
+        baseline = None
+        if options["baseline"]:
+            with open(options["baseline"]) as fh:
+                baseline = json.load(fh)
+
+        rng = random.Random(options["seed"])
+        try:
+            targets = load_targets(rng)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        started_at = datetime.now(timezone.utc)
+        report = {
+            "started_at": started_at.isoformat(),
+            "revision": revision(),
+            "url": options["url"],
+            "concurrency": options["concurrency"],
+            "duration": options["duration"],
+            "catalog": {
+                "songs": Song.objects.count(),
+                "recordings": Recording.objects.count(),
+                "users": len(users),
+            },
+            "scenarios": {},
+        }
+
+        for name in options["scenarios"]:
+            # Fresh tokens per scenario: access tokens are short-lived
+            tokens = [
+                str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+                for user in users
+            ]
+            result = run_scenario(
+                SCENARIOS[name], targets, options["url"], tokens,
+                options["concurrency"], options["duration"], options["seed"],
+            )
+            report["scenarios"][name] = result
+            self.write_scenario(name, result)
+
+        output = options["output"] or os.path.join(
+            RESULTS_DIR, started_at.strftime("%Y%m%dT%H%M%SZ") + ".json"
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w") as fh:
+            json.dump(report, fh, indent=2)
+        self.stdout.write(f"Report written to {output}")
+
+        if baseline is not None:
+            self.stdout.write(f"Compared with {options['baseline']}:")
+            for line in compare(report, baseline):
+                self.stdout.write(line)
+
+    def write_scenario(self, name, result):
+        self.stdout.write(
+            f"{name}: {result['iterations']} iterations, {result['rps']:.1f} req/s, "
+            f"{result['errors']} errors"
+        )
+        for endpoint, stats in result["endpoints"].items():
+            self.stdout.write(
+                f"  {endpoint:<24} {stats['rps']:8.1f} req/s  "
+                f"p50 {stats['p50_ms']:7.1f}  p95 {stats['p95_ms']:7.1f}  "
+                f"p99 {stats['p99_ms']:7.1f} ms  errors {stats['errors']}"
+            )
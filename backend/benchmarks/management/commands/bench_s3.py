@@ -0,0 +1,53 @@
+import logging
+import time
+
+import boto3
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = (
+        "Run an in-memory S3 stand-in (moto server) with the media bucket "
+        "created, for seeding and load-testing without R2."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=9000)
+        parser.add_argument("--bucket", default=settings.AWS_STORAGE_BUCKET_NAME or "bench-media")
+
+    def handle(self, *args, **options):
+        try:
+            from moto.server import ThreadedMotoServer
+        except ImportError:
+            raise CommandError("The S3 stand-in needs moto[server] (pip install -r requirements-dev.txt)")
+
+        endpoint = f"http://{options['host']}:{options['port']}"
+        # No access log line per S3 call
+        logging.getLogger("werkzeug").setLevel(logging.WARNING)
+        server = ThreadedMotoServer(ip_address=options["host"], port=options["port"])
+        server.start()
+
+        try:
+            boto3.client(
+                "s3",
+                endpoint_url=endpoint,
+                aws_access_key_id="testing",
+                aws_secret_access_key="testing",
+                region_name="us-east-1",
+            ).create_bucket(Bucket=options["bucket"])
+
+            self.stdout.write(f"S3 stand-in on {endpoint}, bucket {options['bucket']!r}.")
+            self.stdout.write("Point the server, bench_seed and bench_load at it with:")
+            self.stdout.write(f"  export R2_ENDPOINT={endpoint}")
+            self.stdout.write(f"  export R2_BUCKET_NAME={options['bucket']}")
+            self.stdout.write("  export R2_ACCESS_KEY_ID=testing R2_SECRET_ACCESS_KEY=testing")
+            self.stdout.write("Contents live in this process; Ctrl-C discards them.")
+
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.stop()
@@ -0,0 +1,64 @@
+from botocore.exceptions import ClientError
+from django.core.management.base import BaseCommand, CommandError
+
+from app.storage import content_addressed_storage
+from app.utils.deletion import is_s3
+from benchmarks.catalog import USER_PASSWORD, USER_PREFIX, remove_catalog, seed_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic catalog for load tests: artists, songs with "
+        "lyric lines and fake (but decodable) media, users and scored recordings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--songs", type=int, default=1000)
+        parser.add_argument("--artists", type=int, default=100)
+        parser.add_argument("--lines", type=int, default=40, help="Lyric lines per song")
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--recordings", type=int, default=50, help="Recordings per user")
+        parser.add_argument("--variants", type=int, default=8, help="Distinct media files shared by the rows")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--append", action="store_true",
+            help="Keep a previously generated catalog instead of replacing it",
+        )
+
+    def handle(self, *args, **options):
+        if options["songs"] < 1 or options["variants"] < 1:
+            raise CommandError("--songs and --variants must be at least 1")
+        if options["users"] and options["recordings"] and not options["songs"]:
+            raise CommandError("Recordings need songs")
+
+        storage = content_addressed_storage()
+        if is_s3(storage):
+            try:
+                storage.connection.meta.client.head_bucket(Bucket=storage.bucket_name)
+            except ClientError:
+                raise CommandError(
+                    f"Bucket {storage.bucket_name!r} not found; start one with "
+                    "`manage.py bench_s3` and export the R2_* variables it prints"
+                )
+
+        if not options["append"]:
+            deleted = remove_catalog()
+            if deleted:
+                self.stdout.write(f"Removed {deleted} rows of a previous catalog")
+
+        report = seed_catalog(
+            songs=options["songs"],
+            artists=options["artists"],
+            lines=options["lines"],
+            users=options["users"],
+            recordings=options["recordings"],
+            variants=options["variants"],
+            seed=options["seed"],
+        )
+
+        self.stdout.write(
+            f"Seeded {report.artists} artists, {report.songs} songs, "
+            f"{report.lyric_lines} lyric lines, {report.users} users, "
+            f"{report.recordings} recordings ({len(report.media_objects)} media objects)"
+        )
+        self.stdout.write(f"Users: {USER_PREFIX}0000… (password {USER_PASSWORD!r})")
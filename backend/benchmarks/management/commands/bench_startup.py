@@ -0,0 +1,135 @@
+import http.client
+import json
+import os
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from app.management.commands.bench_servers import SERVERS
+from base.serializers import CustomTokenObtainPairSerializer
+
+
+POLL = 0.005
+
+
+def fetch(port, path, headers, timeout=30):
+    conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        conn.request("GET", path, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+class Command(BaseCommand):
+    help = (
+        "Cold-start benchmark: spawn a one-worker server and time how long "
+        "until it answers its first real request (and how slow that first "
+        "request is compared with the next ones)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Username to authenticate as (default: first user)")
+        parser.add_argument("--path", help="Endpoint for the first request (default: /api/songs/)")
+        parser.add_argument("--servers", nargs="+", choices=list(SERVERS), default=list(SERVERS))
+        parser.add_argument("--runs", type=int, default=5)
+        parser.add_argument("--port", type=int, default=8766)
+        parser.add_argument("--timeout", type=float, default=60.0, help="Seconds to wait for a worker")
+        parser.add_argument("--json", dest="output", help="Also write the results to this path")
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.order_by("pk")
+        if options["user"]:
+            users = users.filter(username=options["user"])
+        user = users.first()
+        if user is None:
+            raise CommandError("No user to authenticate as")
+
+        access = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+        headers = {"Cookie": f"access_token={access}"}
+        path = options["path"] or reverse("song-list")
+
+        results = {}
+        for server in options["servers"]:
+            runs = [self.cold_start(server, options, path, headers) for _ in range(options["runs"])]
+            results[server] = {
+                key: {
+                    "median": round(statistics.median(run[key] for run in runs), 1),
+                    "min": round(min(run[key] for run in runs), 1),
+                    "max": round(max(run[key] for run in runs), 1),
+                }
+                for key in runs[0]
+            }
+            summary = results[server]
+            self.stdout.write(
+                f"{server:>8} {path}: first response after "
+                f"{summary['time_to_first_request_ms']['median']:7.1f} ms "
+                f"(min {summary['time_to_first_request_ms']['min']:.1f}, "
+                f"max {summary['time_to_first_request_ms']['max']:.1f})  "
+                f"first request {summary['first_request_ms']['median']:6.1f} ms, "
+                f"warm {summary['warm_request_ms']['median']:6.1f} ms"
+            )
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump({"path": path, "runs": options["runs"], "servers": results}, fh, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def cold_start(self, server, options, path, headers):
+        """
+        One spawn: time to the first answered request on `path`, how long
+        that request itself took, and a warm request for comparison.
+        """
+        port = options["port"]
+        started = time.perf_counter()
+        process = subprocess.Popen(
+            SERVERS[server](1, port),
+            cwd=settings.BASE_DIR,
+            env=os.environ.copy(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        try:
+            deadline = started + options["timeout"]
+            while True:
+                if process.poll() is not None:
+                    raise CommandError(f"{server} exited with {process.returncode}")
+                if time.perf_counter() > deadline:
+                    raise CommandError(f"{server} did not answer within {options['timeout']}s")
+
+                # The listening socket can accept before the worker has
+                # booted; that wait is part of the first request's time
+                sent = time.perf_counter()
+                try:
+                    status = fetch(port, path, headers)
+                    break
+                except ConnectionRefusedError:
+                    time.sleep(POLL)
+            answered = time.perf_counter()
+            if status != 200:
+                raise CommandError(f"{path} returned {status} under {server}")
+
+            warm_started = time.perf_counter()
+            fetch(port, path, headers)
+            warm = time.perf_counter() - warm_started
+
+            return {
+                "time_to_first_request_ms": (answered - started) * 1000,
+                "first_request_ms": (answered - sent) * 1000,
+                "warm_request_ms": warm * 1000,
+            }
+        finally:
+            process.terminate()
+            try:
+                process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                process.kill()
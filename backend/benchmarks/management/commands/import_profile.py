@@ -0,0 +1,127 @@
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# What a web worker imports before it can serve: the WSGI handler (which
+# sets Django up and loads middleware) and the URLconf (every view).
+BOOT = (
+    "from django.core.wsgi import get_wsgi_application; "
+    "get_wsgi_application(); "
+    "from django.urls import get_resolver; "
+    "get_resolver().url_patterns"
+)
+
+# Dependencies that should only load on the code paths that need them
+WATCHED = ("boto3", "storages.backends.s3", "numpy", "pydub", "PIL")
+
+LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def profile_once(env):
+    """
+    (wall seconds, {module: (self_us, cumulative_us, depth)}) for one
+    fresh interpreter importing BOOT.
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", BOOT],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - started
+    if result.returncode != 0:
+        raise CommandError(f"Boot failed:\n{result.stderr[-2000:]}")
+
+    modules = {}
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules[name] = (int(self_us), int(cumulative_us), len(indent) // 2)
+    return wall, modules
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile what a worker imports at boot (python -X importtime): "
+        "slowest modules, time per top-level package, and heavy "
+        "dependencies that load eagerly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters to average over")
+        parser.add_argument("--top", type=int, default=25)
+        parser.add_argument("--sort", choices=("cumulative", "self"), default="cumulative")
+        parser.add_argument("--json", dest="output", help="Also write the report to this path")
+
+    def handle(self, *args, **options):
+        env = os.environ.copy()
+        runs = [profile_once(env) for _ in range(max(1, options["runs"]))]
+
+        walls = [wall for wall, _ in runs]
+        names = set().union(*(modules for _, modules in runs))
+        modules = {}
+        for name in names:
+            samples = [found[name] for _, found in runs if name in found]
+            modules[name] = {
+                "self_ms": statistics.mean(s[0] for s in samples) / 1000,
+                "cumulative_ms": statistics.mean(s[1] for s in samples) / 1000,
+                "depth": samples[0][2],
+            }
+
+        packages = defaultdict(float)
+        for name, stats in modules.items():
+            packages[name.split(".")[0]] += stats["self_ms"]
+
+        key = "cumulative_ms" if options["sort"] == "cumulative" else "self_ms"
+        slowest = sorted(modules.items(), key=lambda item: -item[1][key])[:options["top"]]
+        top_level = sum(stats["cumulative_ms"] for stats in modules.values() if stats["depth"] == 0)
+        watched = {
+            name: round(modules[name]["cumulative_ms"], 1)
+            for name in WATCHED if name in modules
+        }
+
+        self.stdout.write(
+            f"Boot: {statistics.median(walls) * 1000:.0f} ms wall (median of {len(walls)}), "
+            f"{top_level:.0f} ms importing {len(modules)} modules"
+        )
+
+        self.stdout.write(f"\nSlowest modules (by {options['sort']}):")
+        for name, stats in slowest:
+            self.stdout.write(
+                f"  {stats['cumulative_ms']:8.1f} ms cumulative  {stats['self_ms']:7.1f} ms self  {name}"
+            )
+
+        self.stdout.write("\nBy top-level package (self time):")
+        for package, ms in sorted(packages.items(), key=lambda item: -item[1])[:options["top"]]:
+            self.stdout.write(f"  {ms:8.1f} ms  {package}")
+
+        if watched:
+            self.stdout.write("\nHeavy dependencies loaded at boot:")
+            for name, ms in watched.items():
+                self.stdout.write(f"  {ms:8.1f} ms  {name}")
+        else:
+            self.stdout.write("\nNo heavy dependencies loaded at boot.")
+
+        if options["output"]:
+            with open(options["output"], "w") as fh:
+                json.dump({
+                    "settings": os.environ.get("DJANGO_SETTINGS_MODULE"),
+                    "wall_ms": [round(wall * 1000, 1) for wall in walls],
+                    "import_ms": round(top_level, 1),
+                    "watched": watched,
+                    "packages": {name: round(ms, 2) for name, ms in sorted(packages.items())},
+                    "modules": {
+                        name: {k: round(v, 3) for k, v in stats.items()}
+                        for name, stats in sorted(modules.items())
+                    },
+                }, fh, indent=2)
+            self.stdout.write(f"\nReport written to {options['output']}")
@@ -0,0 +1,82 @@
+import io
+import wave
+
+import numpy as np
+from PIL import Image
+
+from app.utils.peaks import RESOLUTIONS, encode_peaks
+
+
+# Synthetic media is small: load tests measure the API, not transfer
+SONG_SECONDS = 30
+RECORDING_SECONDS = 8
+WAV_RATE = 22050
+
+GENRE_COLOURS = [
+    (230, 57, 70), (29, 53, 87), (69, 123, 157), (42, 157, 143),
+    (233, 196, 106), (244, 162, 97), (131, 56, 236), (58, 134, 255),
+]
+
+
+def tone(seconds, frequency, rate=WAV_RATE):
+    """
+    Mono float32 samples: a tone with a slow tremolo, so peaks have shape.
+    """
+    t = np.arange(int(seconds * rate), dtype=np.float32) / rate
+    envelope = 0.5 + 0.4 * np.sin(2 * np.pi * 0.25 * t)
+    return (envelope * np.sin(2 * np.pi * frequency * t)).astype(np.float32)
+
+
+def wav_bytes(samples, rate=WAV_RATE):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes((np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def peaks_bytes(samples, rate=WAV_RATE):
+    """
+    A peaks blob (app.utils.peaks format) computed from the samples
+    directly, without an ffmpeg decode.
+    """
+    levels = {}
+    for resolution in RESOLUTIONS:
+        usable = len(samples) - len(samples) % resolution
+        bins = samples[:usable].reshape(-1, resolution)
+        pairs = np.stack([bins.min(axis=1), bins.max(axis=1)], axis=1)
+        levels[resolution] = np.round(pairs * 127).astype(np.int8)
+    return encode_peaks(levels, sample_rate=rate)
+
+
+def cover_bytes(variant, size=300):
+    colour = GENRE_COLOURS[variant % len(GENRE_COLOURS)]
+    buffer = io.BytesIO()
+    Image.new("RGB", (size, size), colour).save(buffer, "JPEG", quality=80)
+    return buffer.getvalue()
+
+
+def lrc_text(title, lines, spacing=4.5):
+    rows = [f"[ti:{title}]"]
+    for line in range(lines):
+        seconds = line * spacing
+        rows.append(f"[{int(seconds // 60):02d}:{seconds % 60:05.2f}]{title}, line {line + 1}")
+    return "\n".join(rows) + "\n"
+
+
+def song_media(variant):
+    """
+    (audio, peaks, cover) bytes for one song media variant.
+    """
+    samples = tone(SONG_SECONDS, 220 * (1 + variant / 8))
+    return wav_bytes(samples), peaks_bytes(samples), cover_bytes(variant)
+
+
+def recording_media(variant):
+    """
+    (audio, peaks) bytes for one recording variant.
+    """
+    samples = tone(RECORDING_SECONDS, 330 * (1 + variant / 8))
+    return wav_bytes(samples), peaks_bytes(samples)
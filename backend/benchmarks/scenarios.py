@@ -0,0 +1,121 @@
+import json
+import os
+from dataclasses import dataclass, field
+from urllib.parse import quote, urlsplit
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.urls import reverse
+
+from app.models import Song
+
+from .media import recording_media
+
+
+# ─────────────────────────────────────────────
+# TARGETS
+# ─────────────────────────────────────────────
+
+@dataclass
+class Targets:
+    """
+    What the scenarios pick from, read once from the database the server
+    under test uses.
+    """
+    song_ids: list
+    genres: list
+    media_keys: list
+    uploads: list = field(default_factory=list)
+
+
+def load_targets(rng, sample=500, uploads=8):
+    songs = list(
+        Song.objects.order_by("?").values("pk", "genre", "cover_image", "audio_file")[:sample]
+    )
+    if not songs:
+        raise ValueError("No songs: seed a catalog first (manage.py bench_seed)")
+
+    targets = Targets(
+        song_ids=[song["pk"] for song in songs],
+        genres=sorted({song["genre"] for song in songs if song["genre"]}),
+        media_keys=[song[name] for song in songs for name in ("cover_image", "audio_file")],
+    )
+
+    for variant in range(uploads):
+        audio, _ = recording_media(variant)
+        body = encode_multipart(BOUNDARY, {
+            "song": rng.choice(targets.song_ids),
+            "audio_file": SimpleUploadedFile("take.wav", audio, "audio/wav"),
+        })
+        # Split around the last samples so each upload can carry new bytes
+        # (uploads are content addressed; a repeat would skip the write)
+        tail = body.index(audio) + len(audio)
+        targets.uploads.append((body[:tail - 4], body[tail:]))
+    return targets
+
+
+# ─────────────────────────────────────────────
+# SCENARIOS
+# ─────────────────────────────────────────────
+# Each is one user journey; the runner repeats it until the time is up.
+# session.get()/post() record latency under the endpoint label and return
+# the body of a 2xx response (None otherwise).
+
+def browse(session, targets, rng):
+    """
+    Home page: all songs, genres, then one genre's songs.
+    """
+    session.get("song-list", reverse("song-list"))
+    session.get("genre-list", reverse("genre-list"))
+    genre = rng.choice(targets.genres)
+    session.get("songs-by-genre", reverse("songs-by-genre", args=[genre]))
+
+
+def open_song(session, targets, rng):
+    """
+    Song page: detail with lyrics, then its leaderboard.
+    """
+    song_id = rng.choice(targets.song_ids)
+    session.get("song-detail", reverse("song-detail", args=[song_id]))
+    session.get("song-leaderboard", reverse("song-leaderboard", args=[song_id]))
+
+
+def sign_media(session, targets, rng):
+    """
+    Player start: a signed URL for a cover or audio file.
+    """
+    key = rng.choice(targets.media_keys)
+    session.get("secure-media", f"{reverse('secure-media')}?key={quote(key)}")
+
+
+def upload_recording(session, targets, rng):
+    """
+    A new take for a song (stored, then analysed in the request).
+    """
+    head, tail = rng.choice(targets.uploads)
+    session.post(
+        "recording-upload",
+        reverse("recording-upload"),
+        head + os.urandom(4) + tail,
+        content_type=MULTIPART_CONTENT,
+    )
+
+
+def list_recordings(session, targets, rng):
+    """
+    My recordings: the first page, then the next one when there is one.
+    """
+    body = session.get("my-recordings", reverse("my-recordings"))
+    next_url = json.loads(body).get("next") if body else None
+    if next_url:
+        parts = urlsplit(next_url)
+        session.get("my-recordings", f"{parts.path}?{parts.query}")
+
+
+SCENARIOS = {
+    "browse": browse,
+    "open_song": open_song,
+    "sign_media": sign_media,
+    "upload_recording": upload_recording,
+    "list_recordings": list_recordings,
+}
@@ -54,10 +54,19 @@ INSTALLED_APPS = [
 
 ]
 
+# Synthetic catalog + load scenarios (manage.py bench_seed / bench_load):
+# local benchmarking only, registered with DEBUG=True or BENCHMARKS=true
+if DEBUG or os.getenv("BENCHMARKS", "false").lower() == "true":
+    INSTALLED_APPS.append("benchmarks")
+
 
 STORAGES = {
     "default": {
-        "BACKEND": "storages.backends.s3boto3.S3Boto3Storage",
+        "BACKEND": "app.storage.InstrumentedS3Storage",
+    },
+    # Uploaded media (songs, covers, recordings): stored by content hash
+    "content_addressed": {
+        "BACKEND": "app.storage.ContentAddressedS3Storage",
     },
     "staticfiles": {
         "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage",
@@ -83,7 +92,9 @@ STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
 
 
 MIDDLEWARE = [
+    "base.middleware.InstrumentationMiddleware",
     'django.middleware.security.SecurityMiddleware',
+    "base.middleware.CompressionMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     'django.contrib.sessions.middleware.SessionMiddleware',
     "corsheaders.middleware.CorsMiddleware",
@@ -125,7 +136,16 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
-    ]
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'base.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'base.renderers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=10),
@@ -206,6 +226,25 @@ DATABASES = {
     }
 }
 
+# Connection lifecycle. Opening a TLS connection to Postgres per request
+# costs tens of ms, so connections are reused:
+#   DB_POOL=false (default): one persistent connection per worker thread,
+#     recycled after DB_CONN_MAX_AGE seconds and health-checked before reuse
+#   DB_POOL=true: psycopg 3 connection pool per worker process (Django's
+#     native pooling; incompatible with CONN_MAX_AGE)
+if os.getenv("DB_POOL", "false").lower() == "true":
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 1)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 4)),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+        "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+        "max_lifetime": float(os.getenv("DB_POOL_MAX_LIFETIME", 1800)),
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
 
 
 
@@ -258,3 +297,96 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Razorpay Settings
 RAZORPAY_KEY_ID = config('RAZORPAY_KEY_ID', default='rzp_test_ROhm8gRpTv2xUm')
 RAZORPAY_KEY_SECRET = config('RAZORPAY_KEY_SECRET', default='AOX9CU7x2sCR2Sp8XYv3lFoq')
+
+# Audio processing (render.yaml installs ffmpeg via aptPackages)
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+
+# /media/ streaming: "filesystem" serves MEDIA_ROOT, "r2" proxies the bucket
+MEDIA_STREAM_SOURCE = os.getenv("MEDIA_STREAM_SOURCE", "filesystem")
+MEDIA_PROXY_CACHE_DIR = os.getenv("MEDIA_PROXY_CACHE_DIR", str(BASE_DIR / ".media_cache"))
+MEDIA_PROXY_CACHE_HEAD_BYTES = int(os.getenv("MEDIA_PROXY_CACHE_HEAD_BYTES", 4 * 1024 * 1024))
+MEDIA_PROXY_CACHE_MAX_BYTES = int(os.getenv("MEDIA_PROXY_CACHE_MAX_BYTES", 512 * 1024 * 1024))
+
+# Per-process cache of JWT-authenticated users (seconds; 0 disables)
+JWT_USER_CACHE_TTL = int(os.getenv("JWT_USER_CACHE_TTL", 60))
+JWT_USER_CACHE_SIZE = int(os.getenv("JWT_USER_CACHE_SIZE", 1024))
+# Per-process cache of verified access tokens, held until their exp (0 disables)
+JWT_TOKEN_CACHE_SIZE = int(os.getenv("JWT_TOKEN_CACHE_SIZE", 4096))
+
+# In-process token_blacklist compaction after refreshes (seconds between runs; 0 disables)
+TOKEN_BLACKLIST_COMPACT_INTERVAL = int(os.getenv("TOKEN_BLACKLIST_COMPACT_INTERVAL", 3600))
+TOKEN_BLACKLIST_COMPACT_MAX_BATCHES = int(os.getenv("TOKEN_BLACKLIST_COMPACT_MAX_BATCHES", 10))
+
+# File cleanup after deletes/replacements runs on a background thread (False: inline after commit)
+MEDIA_DELETE_ASYNC = os.getenv("MEDIA_DELETE_ASYNC", "true").lower() == "true"
+
+# Media processing after uploads (peaks, analysis, HLS) runs on a background thread (False: inline after commit)
+MEDIA_PROCESS_ASYNC = os.getenv("MEDIA_PROCESS_ASYNC", "true").lower() == "true"
+
+# Route song list/detail, genres and the media gateway to their async twins
+# (app.views_async). Only for ASGI deploys: under WSGI (Procfile, render.yaml)
+# every async view runs through async_to_sync
+ASYNC_VIEWS = os.getenv("ASYNC_VIEWS", "false").lower() == "true"
+
+# gzip/brotli for JSON responses at least this many bytes (base.middleware)
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+
+# Catalog responses: private cache lifetime, and how long a process trusts
+# its cached catalog version (base for ETags; app.utils.catalog)
+CATALOG_MAX_AGE = int(os.getenv("CATALOG_MAX_AGE", 60))
+CATALOG_VERSION_TTL = int(os.getenv("CATALOG_VERSION_TTL", 5))
+
+# Shared cache (app.utils.cache): "redis" (REDIS_URL), "file" (CACHE_DIR, shared by
+# the workers of one machine) or "locmem" (per process; the local-only fallback)
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "redis" if os.getenv("REDIS_URL") else "locmem")
+CACHE_TIMEOUT = int(os.getenv("CACHE_TIMEOUT", 300))
+
+if CACHE_BACKEND == "redis":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0"),
+            "TIMEOUT": CACHE_TIMEOUT,
+            "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "hitansh"),
+        }
+    }
+elif CACHE_BACKEND == "file":
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / ".cache")),
+            "TIMEOUT": CACHE_TIMEOUT,
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", 10000))},
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "hitansh",
+            "TIMEOUT": CACHE_TIMEOUT,
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", 10000))},
+        }
+    }
+
+# Per-request instrumentation (base.instrumentation): requests at or over either
+# threshold log their SQL; /api/ops/metrics/ accepts "Authorization: Bearer <METRICS_TOKEN>"
+SLOW_REQUEST_MS = int(os.getenv("SLOW_REQUEST_MS", 500))
+SLOW_REQUEST_QUERIES = int(os.getenv("SLOW_REQUEST_QUERIES", 20))
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        # One JSON line per request (INFO), slow requests with their SQL (WARNING)
+        "base.instrumentation": {
+            "handlers": ["console"],
+            "level": os.getenv("REQUEST_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
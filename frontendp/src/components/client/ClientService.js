@@ -23,7 +23,19 @@ const ClientService = {
       },
     }),
 
-  getMyRecordings: () => appApiClient.get("/api/recordings/"),
+  // Cursor-paginated, newest first; pass the previous page's cursor
+  getMyRecordings: (cursor) =>
+    appApiClient.get("/api/recordings/", { params: cursor ? { cursor } : {} }),
+
+  // Server-side mixdown of an uploaded recording over the backing track
+  mixRecording: ({ recordingId, songId, vocalGain, backingGain, offset }) =>
+    appApiClient.post("/api/recordings/mix/", {
+      recording: recordingId,
+      song: songId,
+      vocal_gain: vocalGain,
+      backing_gain: backingGain,
+      offset,
+    }),
 };
 
 export default ClientService;
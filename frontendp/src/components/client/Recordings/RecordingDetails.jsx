@@ -6,6 +6,17 @@ import CustomAudioPlayer from "../SongPlayer/CustomAudioPlayer";
 import ClientService from "../ClientService";
 import MixingModal from "../Mixing/MixingModal";
 
+// Below this the detected offset is a guess (e.g. a repeated chorus matched
+// almost as well). Same value as Recording.ALIGNMENT_MIN_CONFIDENCE in
+// backend/app/models.py.
+const ALIGNMENT_MIN_CONFIDENCE = 0.3;
+
+const startOffset = (recording) =>
+  recording.alignment_offset != null &&
+  (recording.alignment_confidence ?? 0) >= ALIGNMENT_MIN_CONFIDENCE
+    ? recording.alignment_offset
+    : 0;
+
 const RecordingDetails = ({ recording }) => {
   const [audioUrl, setAudioUrl] = useState(null);
   const [karaokeUrl, setKaraokeUrl] = useState(null);
@@ -90,6 +101,7 @@ const RecordingDetails = ({ recording }) => {
           karaokeUrl={karaokeUrl}
           songTitle={recording.song_title}
           recordingDuration={recording.duration}
+          recordingStartTime={startOffset(recording)}
         />
       )}
 
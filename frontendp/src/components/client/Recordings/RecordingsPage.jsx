@@ -7,19 +7,42 @@ import RecordingCard from "./RecordingCard";
 
 const RecordingsPage = () => {
   const [recordings, setRecordings] = useState([]);
+  const [recordingCount, setRecordingCount] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [error, setError] = useState(null);
   const navigate = useNavigate();
 
+  // The API returns the next page as a URL; keep just its cursor
+  const cursorFrom = (next) =>
+    next ? new URL(next).searchParams.get("cursor") : null;
+
   const fetchRecordings = () => {
     setLoading(true);
     setError(null);
     ClientService.getMyRecordings()
-      .then((res) => setRecordings(res.data || []))
+      .then((res) => {
+        setRecordings(res.data?.results || []);
+        setRecordingCount(res.data?.recording_count ?? null);
+        setNextCursor(cursorFrom(res.data?.next));
+      })
       .catch((err) => setError("Failed to load recordings"))
       .finally(() => setLoading(false));
   };
 
+  const fetchMore = () => {
+    if (!nextCursor || loadingMore) return;
+    setLoadingMore(true);
+    ClientService.getMyRecordings(nextCursor)
+      .then((res) => {
+        setRecordings((prev) => [...prev, ...(res.data?.results || [])]);
+        setNextCursor(cursorFrom(res.data?.next));
+      })
+      .catch((err) => setError("Failed to load recordings"))
+      .finally(() => setLoadingMore(false));
+  };
+
   useEffect(() => {
     fetchRecordings();
   }, []);
@@ -49,7 +72,9 @@ const RecordingsPage = () => {
               <span className="text-gradient">My Recordings</span>
             </h1>
             <p className="text-muted-foreground">
-              Your karaoke performances
+              {recordingCount
+                ? `${recordingCount} karaoke performance${recordingCount === 1 ? "" : "s"}`
+                : "Your karaoke performances"}
             </p>
           </div>
         </motion.div>
@@ -105,6 +130,18 @@ const RecordingsPage = () => {
             {recordings.map((rec) => (
               <RecordingCard key={rec.id} recording={rec} />
             ))}
+
+            {nextCursor && (
+              <div className="text-center pt-4">
+                <button
+                  onClick={fetchMore}
+                  disabled={loadingMore}
+                  className="btn-gradient px-6 py-2 rounded-lg disabled:opacity-60"
+                >
+                  {loadingMore ? "Loading..." : "Load More"}
+                </button>
+              </div>
+            )}
           </div>
         )}
       </div>